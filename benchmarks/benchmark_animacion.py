@@ -0,0 +1,94 @@
+"""
+Benchmark del coste por frame de generar_video_rotacion: escena reconstruida con
+ax.clear() y una línea por arista (versión anterior) frente a artistas persistentes
+que solo actualizan sus coordenadas y colores.
+
+Uso:
+    python -m benchmarks.benchmark_animacion [semilla] [tipo] [frames]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+import numpy as np
+
+from domo.domo import *
+
+def preparar_escena_antigua(domo, elevacion=30, alpha_caras=0.8):
+    """
+    Copia de la versión anterior de dibujar_escena: borra los ejes y vuelve a crear
+    límites, título, una línea por arista y la colección de caras en cada frame.
+    """
+    fig = plt.figure(figsize=(10, 8), facecolor='#1F1F1F')
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_facecolor('#1F1F1F')
+
+    coords = domo.malla.vertices
+    x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+    max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
+    mid_x = np.mean([np.max(x), np.min(x)])
+    mid_y = np.mean([np.max(y), np.min(y)])
+    mid_z = np.mean([np.max(z), np.min(z)])
+
+    def actualizar_escena(puntos_rotados, colores):
+        ax.clear()
+        ax.set_box_aspect([1, 1, 1])
+        ax.set_xlim(mid_x - max_range, mid_x + max_range)
+        ax.set_ylim(mid_y - max_range, mid_y + max_range)
+        ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        ax.axis('off')
+
+        semilla = " ".join(p.capitalize() for p in domo.semilla.split())
+        particion_str = " ".join(particion[domo.tipo].split("_"))
+        titulo = f"{semilla}\nPartición {particion_str}\nFrecuencia {domo.frecuencia}"
+        ax.set_title(titulo, color="#F1F1F1")
+
+        for v1, v2 in puntos_rotados[domo.malla.aristas]:
+            ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
+                    color='#3E6576', linestyle='-', linewidth=1)
+
+        coleccion = Poly3DCollection(
+            puntos_rotados[domo.malla.caras],
+            facecolors=colores,
+            alpha=alpha_caras,
+            edgecolor='#3E6576',
+            linewidth=0.5
+        )
+        ax.add_collection3d(coleccion)
+        ax.view_init(elev=elevacion, azim=0)
+
+    return fig, actualizar_escena
+
+def segundos_por_frame(fig, actualizar_escena, rotaciones, colores):
+    """
+    Actualiza y rasteriza cada frame como hace el writer de la animación.
+    """
+    inicio = time.perf_counter()
+    for frame in range(len(rotaciones)):
+        actualizar_escena(rotaciones[frame], colores[frame])
+        fig.canvas.draw()
+    segundos = (time.perf_counter() - inicio) / len(rotaciones)
+    plt.close(fig)
+    return segundos
+
+def medir(semilla="icosaedro", tipo=0, frames=6):
+    print(f"{semilla}, partición {particion[tipo]}, {frames} frames")
+    print(f"{'frecuencia':>10}{'aristas':>9}{'caras':>7}{'antiguo (s/frame)':>20}{'nuevo (s/frame)':>18}{'x':>8}")
+    for frecuencia in range(2, 9):
+        domo = Domo(semilla, frecuencia, tipo, 1)
+        rotaciones = domo.generar_rotaciones(frames)
+        colores = domo.calcular_colores_rotacion_rigida(domo.generar_matrices_rotacion(frames), np.array([20, -30, 40]), "#73C0E2")
+
+        antiguo = segundos_por_frame(*preparar_escena_antigua(domo), rotaciones, colores)
+        nuevo = segundos_por_frame(*domo.preparar_escena(), rotaciones, colores)
+        print(f"{frecuencia:>10}{len(domo.malla.aristas):>9}{len(domo.malla.caras):>7}"
+              f"{antiguo:>20.4f}{nuevo:>18.4f}{antiguo / nuevo:>8.1f}")
+
+if __name__ == "__main__":
+    semilla = sys.argv[1] if len(sys.argv) > 1 else "icosaedro"
+    tipo = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    frames = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    medir(semilla, tipo, frames)
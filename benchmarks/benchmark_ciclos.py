@@ -0,0 +1,62 @@
+"""
+Microbenchmark de la eliminación de ciclos duplicados: comparación por pares con
+set(...) == set(...) (versión anterior de __limpiar_ciclos) frente a deduplicar_ciclos.
+
+Uso:
+    python -m benchmarks.benchmark_ciclos
+"""
+import random
+import time
+
+from domo.utils import *
+
+def limpiar_ciclos_antiguo(ciclos):
+    """
+    Copia de la versión cuadrática que tenían Poliedro, Domo y Zomo.
+    """
+    ciclos_limpios = []
+    for ciclo_1 in range(len(ciclos)):
+        iguales = False
+        for ciclo_2 in range(ciclo_1 + 1, len(ciclos)):
+            if set(ciclos[ciclo_1]) == set(ciclos[ciclo_2]):
+                iguales = True
+                break
+        if not iguales:
+            ciclos_limpios.append(ciclos[ciclo_1])
+    return ciclos_limpios
+
+def generar_ciclos(n_distintos, repeticiones=4, longitud=4, semilla=0):
+    """
+    Genera n_distintos ciclos y los repite girados e invertidos, como los devuelve la
+    búsqueda en profundidad partiendo de cada nodo.
+    """
+    generador = random.Random(semilla)
+    ciclos = []
+    for k in range(n_distintos):
+        base = [f"{k}_{i}" for i in range(longitud)]
+        for _ in range(repeticiones):
+            giro = generador.randrange(longitud)
+            ciclo = base[giro:] + base[:giro]
+            if generador.random() < 0.5:
+                ciclo.reverse()
+            ciclos.append(ciclo)
+    generador.shuffle(ciclos)
+    return ciclos
+
+def medir():
+    print(f"{'ciclos':>8}{'antiguo (s)':>14}{'nuevo (s)':>12}{'x':>10}  igual")
+    for n_distintos in [50, 100, 200, 400, 800, 1600]:
+        ciclos = generar_ciclos(n_distintos)
+
+        inicio = time.perf_counter()
+        antiguo = limpiar_ciclos_antiguo(ciclos)
+        t_antiguo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        nuevo = deduplicar_ciclos(ciclos, conservar_ultimo=True)
+        t_nuevo = time.perf_counter() - inicio
+
+        print(f"{len(ciclos):>8}{t_antiguo:>14.4f}{t_nuevo:>12.5f}{t_antiguo / t_nuevo:>10.0f}  {antiguo == nuevo}")
+
+if __name__ == "__main__":
+    medir()
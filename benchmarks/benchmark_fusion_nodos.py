@@ -0,0 +1,119 @@
+"""
+Compara la fusión de caras antigua (combinar_nodos sobre diccionarios de ids de texto)
+con la fusión union-find de Domo para las 20 semillas de poliedro_id.
+
+Uso:
+    python -m benchmarks.benchmark_fusion_nodos [frecuencia] [tipo]
+"""
+import copy
+import sys
+import time
+
+import numpy as np
+
+from domo.domo import *
+
+def preparar_domo(semilla, frecuencia, tipo, radio=4):
+    """
+    Crea un Domo sin ejecutar el constructor y lo deja justo antes de coser las caras.
+    """
+    domo = Domo.__new__(Domo)
+    domo.semilla = semilla
+    domo.tipo = tipo
+    domo.frecuencia = frecuencia
+    domo.radio = radio
+    domo.poliedro = Poliedro(semilla)
+    domo.vertices_aristas = {}
+    domo._Domo__generar_caras_trianguladas()
+    domo._Domo__generar_info_aristas()
+    return domo
+
+def a_diccionarios_antiguos(domo):
+    """
+    Traduce el estado previo a la fusión al formato antiguo de ids de texto.
+    """
+    ids = [f"{cara}_{domo.ids_locales[len(domo.poliedro.caras[cara])][local]}" for cara, local in domo.origen.tolist()]
+    puntos = {id: tuple(coords) for id, coords in zip(ids, domo.coordenadas.tolist())}
+    aristas = {id: [] for id in ids}
+    for a, b in domo.pares.tolist():
+        aristas[ids[a]].append(ids[b])
+    vertices_aristas = {(f"{a[0]}_{a[1]}", f"{b[0]}_{b[1]}"): [ids[k] for k in lista.tolist()] for (a, b), lista in domo.vertices_aristas.items()}
+    conexiones = [[f"{c}_{p}" for c, p in info] for info in domo.conexiones_aristas]
+    return puntos, aristas, vertices_aristas, conexiones
+
+def fusionar_caras_antiguo(puntos, aristas, vertices_aristas, conexiones):
+    """
+    Copia de la fusión anterior: O(V·E) por cada arista compartida del poliedro.
+    """
+    def combinar_nodos(lista1, lista2):
+        for nodo_destino, nodo_origen in zip(lista1, lista2):
+            for conexion in aristas[nodo_origen]:
+                if conexion != nodo_destino and conexion not in aristas[nodo_destino]:
+                    aristas[nodo_destino].append(conexion)
+            for nodo, conexiones_nodo in aristas.items():
+                if nodo == nodo_origen or nodo == nodo_destino:
+                    continue
+                if nodo_origen != nodo_destino and nodo_origen in conexiones_nodo:
+                    conexiones_nodo.remove(nodo_origen)
+                    if nodo_destino not in conexiones_nodo:
+                        conexiones_nodo.append(nodo_destino)
+            if nodo_origen != nodo_destino and nodo_origen in aristas:
+                del aristas[nodo_origen]
+                del puntos[nodo_origen]
+
+    for i in conexiones:
+        if (i[0], i[2]) in vertices_aristas:
+            lista_1 = vertices_aristas[(i[0], i[2])]
+        else:
+            lista_1 = vertices_aristas[(i[2], i[0])]
+            lista_1.reverse()
+        if (i[1], i[3]) in vertices_aristas:
+            lista_2 = vertices_aristas[(i[1], i[3])]
+        else:
+            lista_2 = vertices_aristas[(i[3], i[1])]
+            lista_2.reverse()
+
+        id_viejo_1, id_viejo_2 = lista_2[0], lista_2[-1]
+        id_nuevo_1, id_nuevo_2 = lista_1[0], lista_1[-1]
+        combinar_nodos(lista_1, lista_2)
+
+        for lista in vertices_aristas.values():
+            if lista[0] == id_viejo_1:
+                lista[0] = id_nuevo_1
+            if lista[-1] == id_viejo_1:
+                lista[-1] = id_nuevo_1
+            if lista[0] == id_viejo_2:
+                lista[0] = id_nuevo_2
+            if lista[-1] == id_viejo_2:
+                lista[-1] = id_nuevo_2
+    return puntos, aristas
+
+def medir(frecuencia=3, tipo=0):
+    print(f"frecuencia={frecuencia} tipo={particion[tipo]}")
+    print(f"{'semilla':<28}{'puntos':>8}{'antiguo (s)':>14}{'union-find (s)':>16}{'x':>8}  igual")
+    for semilla in poliedro_id:
+        domo = preparar_domo(semilla, frecuencia, tipo)
+        puntos, aristas, vertices_aristas, conexiones = a_diccionarios_antiguos(domo)
+
+        inicio = time.perf_counter()
+        puntos, aristas = fusionar_caras_antiguo(puntos, aristas, copy.deepcopy(vertices_aristas), conexiones)
+        t_antiguo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        domo._Domo__fusionar_caras()
+        t_nuevo = time.perf_counter() - inicio
+
+        ids = [f"{cara}_{domo.ids_locales[len(domo.poliedro.caras[cara])][local]}" for cara, local in domo.malla.origen.tolist()]
+        _, aristas_nuevas, _ = domo.malla.a_diccionarios(ids)
+        # La malla guarda las aristas sin dirección, así que se compara con la adyacencia simétrica
+        simetricas = {id: set(vecinos) for id, vecinos in aristas.items()}
+        for id, vecinos in aristas.items():
+            for vecino in vecinos:
+                simetricas[vecino].add(id)
+        igual = list(puntos) == ids and all(simetricas[id] == set(aristas_nuevas[id]) for id in ids)
+
+        print(f"{semilla:<28}{len(ids):>8}{t_antiguo:>14.4f}{t_nuevo:>16.4f}{t_antiguo / t_nuevo:>8.1f}  {igual}")
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:]]
+    medir(*argumentos)
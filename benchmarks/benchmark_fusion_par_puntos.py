@@ -0,0 +1,90 @@
+"""
+Compara la fusión de puntos antigua de fusionar_triangulos_base, que recorría todas
+las listas de aristas en cada fusión para quitar el punto eliminado, con la actual,
+que solo toca los vecinos y los puntos que apuntan al eliminado (entrantes).
+
+Se mide solo el tiempo dentro de fusionar_par_puntos, para cada número de lados del
+polígono y cada frecuencia.
+
+Uso:
+    python -m benchmarks.benchmark_fusion_par_puntos [tipo] [frecuencia_maxima]
+"""
+import sys
+import time
+
+import domo.fusion_triangulos as fusion_triangulos
+from domo.fusion_triangulos import *
+from domo.domo import particion
+
+def fusionar_par_puntos_antiguo(puntos, vertices, aristas, id_derecha, id_izquierda):
+    """
+    Copia de la fusión anterior: O(N) por fusión al buscar id_izquierda en todas las listas.
+    """
+    aristas[id_derecha] += aristas[id_izquierda]
+    aristas[id_derecha] = list(set(aristas[id_derecha]))
+
+    for k in aristas[id_izquierda]:
+        aristas[k].append(id_derecha)
+        aristas[k] = list(set(aristas[k]))
+
+    del aristas[id_izquierda]
+
+    if id_izquierda in vertices:
+        vertices.remove(id_izquierda)
+
+    del puntos[id_izquierda]
+
+    for k in aristas.keys():
+        if id_izquierda in aristas[k]:
+            aristas[k].remove(id_izquierda)
+
+    return puntos, vertices, aristas
+
+def fusionar_cronometrado(frecuencia, lados, tipo, fusion):
+    """
+    Ejecuta fusionar_triangulos_base con la función de fusión dada y devuelve
+    (resultado, número de fusiones, segundos dentro de la fusión).
+    """
+    medida = {"fusiones": 0, "segundos": 0.0}
+
+    def cronometrada(puntos, vertices, aristas, id_derecha, id_izquierda, entrantes=None):
+        inicio = time.perf_counter()
+        if fusion is fusionar_par_puntos_antiguo:
+            resultado = fusion(puntos, vertices, aristas, id_derecha, id_izquierda)
+        else:
+            resultado = fusion(puntos, vertices, aristas, id_derecha, id_izquierda, entrantes)
+        medida["segundos"] += time.perf_counter() - inicio
+        medida["fusiones"] += 1
+        return resultado
+
+    fusion_triangulos.fusionar_par_puntos = cronometrada
+    try:
+        resultado = fusionar_triangulos_base(frecuencia, lados, tipo)
+    finally:
+        fusion_triangulos.fusionar_par_puntos = fusionar_par_puntos
+    return resultado, medida["fusiones"], medida["segundos"]
+
+def mismo_resultado(a, b):
+    """
+    La versión antigua ordenaba las listas de vecinos con set(), así que se comparan como conjuntos.
+    """
+    puntos_a, vertices_a, aristas_a, vertices_aristas_a, caras_a = a
+    puntos_b, vertices_b, aristas_b, vertices_aristas_b, caras_b = b
+    return (puntos_a == puntos_b and vertices_a == vertices_b and vertices_aristas_a == vertices_aristas_b
+            and caras_a == caras_b and aristas_a.keys() == aristas_b.keys()
+            and all(set(aristas_a[id]) == set(aristas_b[id]) for id in aristas_a))
+
+def medir(tipo=0, frecuencia_maxima=12):
+    print(f"tipo={particion[tipo]}")
+    print(f"{'lados':>6}{'frecuencia':>12}{'puntos':>9}{'fusiones':>10}{'antiguo (s)':>14}{'entrantes (s)':>15}{'x':>8}  igual")
+    for lados in range(3, 11):
+        for frecuencia in range(2, frecuencia_maxima + 1):
+            antiguo, fusiones, t_antiguo = fusionar_cronometrado(frecuencia, lados, tipo, fusionar_par_puntos_antiguo)
+            nuevo, _, t_nuevo = fusionar_cronometrado(frecuencia, lados, tipo, fusionar_par_puntos)
+            igual = mismo_resultado(antiguo, nuevo)
+            x = t_antiguo / t_nuevo if t_nuevo > 0 else float("nan")
+            print(f"{lados:>6}{frecuencia:>12}{len(nuevo[0]):>9}{fusiones:>10}{t_antiguo:>14.4f}{t_nuevo:>15.4f}{x:>8.1f}  {igual}")
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:]]
+    medir(*argumentos)
@@ -0,0 +1,56 @@
+"""
+Benchmark del arranque en frío de un script que solo usa geometría: cada medida es
+un intérprete nuevo que importa el módulo (y opcionalmente calcula las longitudes de
+las barras de un domo). Se compara con el mismo script cargando además matplotlib
+como antes hacían domo.domo, domo.poliedro y domo.zomo al importarse.
+
+Uso:
+    python -m benchmarks.benchmark_importacion [repeticiones]
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GEOMETRIA = """
+domo = Domo("icosaedro", 4, 0, 1)
+longitudes = np.linalg.norm(np.diff(domo.malla.vertices[domo.malla.aristas], axis=1), axis=-1)
+"""
+
+def segundos_arranque(modulo, geometria=False, con_matplotlib=False):
+    """
+    Ejecuta un intérprete nuevo y devuelve (segundos, matplotlib_cargado) medidos dentro
+    de él, desde antes del primer import hasta el final del script.
+    """
+    codigo = "import time, sys\ninicio = time.perf_counter()\n"
+    codigo += f"from {modulo} import *\n"
+    if con_matplotlib:
+        codigo += "from domo.renderizado import importar_pyplot\nimportar_pyplot()\n"
+    if geometria:
+        codigo += "import numpy as np\n" + GEOMETRIA
+    codigo += "print(time.perf_counter() - inicio, 'matplotlib' in sys.modules)\n"
+
+    entorno = dict(os.environ, PYTHONPATH=RAIZ, MPLBACKEND="Agg")
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=entorno,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(salida[0]), salida[1] == "True"
+
+def medir(repeticiones=5):
+    casos = [("domo.poliedro", False), ("domo.zomo", False), ("domo.domo", False), ("domo.domo", True)]
+    print(f"mediana de {repeticiones} arranques en frío")
+    print(f"{'script':>28}{'solo geometría (s)':>20}{'matplotlib':>12}{'con matplotlib (s)':>20}{'x':>7}")
+    for modulo, geometria in casos:
+        sin_mpl = [segundos_arranque(modulo, geometria) for _ in range(repeticiones)]
+        con_mpl = [segundos_arranque(modulo, geometria, con_matplotlib=True)[0] for _ in range(repeticiones)]
+        segundos = np.median([s for s, _ in sin_mpl])
+        segundos_mpl = np.median(con_mpl)
+        cargado = "sí" if any(c for _, c in sin_mpl) else "no"
+        nombre = f"import {modulo}" + (" + barras" if geometria else "")
+        print(f"{nombre:>28}{segundos:>20.3f}{cargado:>12}{segundos_mpl:>20.3f}{segundos_mpl / segundos:>7.2f}")
+
+if __name__ == "__main__":
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    medir(repeticiones)
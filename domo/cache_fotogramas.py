@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+# Cambiar al modificar la geometría, las rotaciones o la iluminación para invalidar los ficheros en disco
+VERSION_FOTOGRAMAS = 2
+
+def clave_contenido(*partes):
+    """
+    Hash sha256 (32 caracteres hexadecimales) de las partes, que deben ser serializables
+    a JSON; los arrays de NumPy se convierten a listas.
+    """
+    def a_json(valor):
+        if isinstance(valor, (np.ndarray, np.generic)):
+            return valor.tolist()
+        raise TypeError(f"No se puede usar {type(valor).__name__} en una clave")
+
+    texto = json.dumps([VERSION_FOTOGRAMAS, *partes], default=a_json, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+
+class CacheFotogramas():
+    """
+    Caché en disco de los arrays por fotograma de los videos de rotación (puntos rotados,
+    normales, colores), cada uno en un .npy con nombre <nombre>_<clave>.npy.
+
+    Los arrays se devuelven como np.memmap de solo lectura, así que leer un fotograma solo
+    trae a memoria sus páginas. Al generarlos se escriben fila a fila sobre un memmap, sin
+    tener nunca el array entero en memoria.
+
+    Las estadísticas (aciertos, fallos) indican cuánto se reutiliza.
+    """
+    def __init__(self, directorio="cache_fotogramas"):
+        self.directorio = directorio
+        self.__candado = threading.Lock()
+        self.__poner_estadisticas_a_cero()
+
+    def obtener(self, clave, nombre, forma, dtype, generar_filas):
+        """
+        Devuelve el array (nombre, clave) desde disco, o lo genera si no existe o no
+        tiene la forma y el tipo esperados.
+
+        Args:
+            clave: Hash del contenido, por ejemplo de clave_contenido
+            nombre: Qué array es ("rotaciones", "colores", ...)
+            forma: Forma del array
+            dtype: Tipo del array
+            generar_filas: Función sin argumentos que devuelve un iterable con las filas
+                (forma[1:]) en orden; solo se llama si hay que generar el array
+
+        Returns:
+            np.memmap de solo lectura
+        """
+        forma, dtype = tuple(forma), np.dtype(dtype)
+        ruta = os.path.join(self.directorio, f"{nombre}_{clave}.npy")
+        array = self.__cargar(ruta, forma, dtype)
+        with self.__candado:
+            if array is not None:
+                self.aciertos += 1
+                return array
+            self.fallos += 1
+
+        # Se escribe a un temporal y se renombra para que otro proceso nunca lea un fichero a medias
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        destino = np.lib.format.open_memmap(temporal, mode="w+", dtype=dtype, shape=forma)
+        filas = 0
+        for filas, fila in enumerate(generar_filas(), start=1):
+            destino[filas - 1] = fila
+        destino.flush()
+        del destino
+        if filas != forma[0]:
+            os.remove(temporal)
+            raise ValueError(f"Se generaron {filas} filas de {nombre} y se esperaban {forma[0]}")
+        os.replace(temporal, ruta)
+        return np.load(ruta, mmap_mode="r")
+
+    def __cargar(self, ruta, forma, dtype):
+        if not os.path.exists(ruta):
+            return None
+        try:
+            array = np.load(ruta, mmap_mode="r")
+        except (OSError, ValueError):
+            # Fichero corrupto: se regenera
+            return None
+        if array.shape != forma or array.dtype != dtype:
+            return None
+        return array
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con aciertos y fallos.
+        """
+        with self.__candado:
+            return {"aciertos": self.aciertos, "fallos": self.fallos}
+
+    def reiniciar_estadisticas(self):
+        with self.__candado:
+            self.__poner_estadisticas_a_cero()
+
+    def __poner_estadisticas_a_cero(self):
+        self.aciertos = 0
+        self.fallos = 0
@@ -0,0 +1,236 @@
+import os
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+import numpy as np
+
+from domo.fusion_triangulos import *
+
+# Cambiar al modificar los generadores de triángulos para invalidar las plantillas en disco
+VERSION_PLANTILLAS = 5
+
+def array_solo_lectura(array, dtype):
+    """
+    Copia el array con el tipo indicado y lo marca como no modificable.
+    """
+    array = np.array(array, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+def orientar_caras(coords_2d, caras):
+    """
+    Devuelve los triángulos reordenados para que todos giren en sentido antihorario en el plano.
+    """
+    caras = np.array(caras, dtype=np.int32).reshape(-1, 3)
+    a, b, c = coords_2d[caras[:, 0]], coords_2d[caras[:, 1]], coords_2d[caras[:, 2]]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    horarias = area < 0
+    caras[horarias] = caras[horarias][:, [0, 2, 1]]
+    return caras
+
+class PlantillaCara():
+    """
+    Plantilla inmutable de una cara triangulada para un (frecuencia, lados, tipo).
+
+    Atributos (todos los arrays son de solo lectura):
+        - ids: tupla con el id de texto de cada punto, su posición es el índice local
+        - coords_2d: array float64 (P, 2) con las coordenadas en el plano
+        - indices_vertices: array int32 (lados,) con los vértices del polígono
+        - pares: array int32 (E, 2) con las aristas
+        - vertices_aristas: mapping {(a, b): array int32} con los puntos de cada lado
+        - caras: array int32 (F, 3) con los triángulos, orientados en sentido antihorario
+        - pesos: array float64 (P, lados) de pesos baricéntricos para llevar la cara a 3D
+    """
+    def __init__(self, ids, coords_2d, indices_vertices, pares, vertices_aristas, caras, pesos=None):
+        self.ids = tuple(ids)
+        self.coords_2d = array_solo_lectura(coords_2d, np.float64).reshape(-1, 2)
+        self.indices_vertices = array_solo_lectura(indices_vertices, np.int32)
+        self.pares = array_solo_lectura(pares, np.int32).reshape(-1, 2)
+        self.vertices_aristas = MappingProxyType({tuple(lado): array_solo_lectura(lista, np.int32) for lado, lista in vertices_aristas.items()})
+        self.caras = array_solo_lectura(orientar_caras(self.coords_2d, caras), np.int32)
+        if pesos is None:
+            pesos = calcular_pesos_baricentricos(self.coords_2d, self.coords_2d[self.indices_vertices], self.indices_vertices)
+        self.pesos = array_solo_lectura(pesos, np.float64)
+
+    @classmethod
+    def desde_triangulacion(cls, puntos, vertices, aristas, vertices_aristas, caras):
+        """
+        Crea la plantilla a partir de la salida con ids de texto de fusionar_triangulos_base.
+        """
+        ids, indices_vertices, pares, indices_vertices_aristas, indices_caras = indexar_triangulacion(puntos, vertices, aristas, vertices_aristas, caras)
+        coords_2d = np.array([puntos[id] for id in ids], dtype=np.float64)
+        return cls(ids, coords_2d, indices_vertices, pares, indices_vertices_aristas, indices_caras)
+
+    @classmethod
+    def desde_arrays(cls, triangulo):
+        """
+        Crea la plantilla a partir de un TrianguloBase (construir_plantilla_poligono),
+        sin pasar por los ids de texto.
+        """
+        return cls(triangulo.ids, triangulo.coords, triangulo.vertices, triangulo.aristas,
+                   triangulo.vertices_aristas, triangulo.caras)
+
+    def guardar(self, ruta):
+        """
+        Guarda la plantilla en un .npz. Se escribe a un temporal y se renombra para que
+        otro proceso nunca lea un fichero a medias.
+        """
+        lados = list(self.vertices_aristas.keys())
+        listas = [self.vertices_aristas[lado] for lado in lados]
+        temporal = f"{ruta}.{os.getpid()}.tmp.npz"
+        np.savez(temporal,
+                 ids=np.array(self.ids, dtype=str),
+                 coords_2d=self.coords_2d,
+                 indices_vertices=self.indices_vertices,
+                 pares=self.pares,
+                 lados=np.array(lados, dtype=np.int32).reshape(-1, 2),
+                 longitudes=np.array([len(lista) for lista in listas], dtype=np.int32),
+                 listas=np.concatenate(listas) if listas else np.empty(0, dtype=np.int32),
+                 caras=self.caras,
+                 pesos=self.pesos)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Lee una plantilla guardada con guardar().
+        """
+        with np.load(ruta, allow_pickle=False) as datos:
+            cortes = np.cumsum(datos["longitudes"])[:-1]
+            listas = np.split(datos["listas"], cortes) if len(datos["longitudes"]) else []
+            vertices_aristas = {tuple(lado): lista for lado, lista in zip(datos["lados"].tolist(), listas)}
+            return cls(datos["ids"].tolist(), datos["coords_2d"], datos["indices_vertices"],
+                       datos["pares"], vertices_aristas, datos["caras"], datos["pesos"])
+
+class CachePlantillas():
+    """
+    Caché LRU de plantillas de caras compartida por todo el proceso, con clave
+    (frecuencia, lados, tipo) y un nivel opcional en disco para arrancar en caliente.
+
+    Las estadísticas (aciertos, fallos, desalojos, aciertos_disco) sirven para
+    dimensionar la capacidad.
+    """
+    def __init__(self, capacidad=64, directorio=None):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        self.capacidad = capacidad
+        self.directorio = directorio
+        self.__plantillas = OrderedDict()
+        self.__candado = threading.Lock()
+        self.__poner_estadisticas_a_cero()
+
+    def obtener(self, frecuencia, lados, tipo):
+        """
+        Devuelve la plantilla de (frecuencia, lados, tipo), generándola solo si no está
+        ni en memoria ni en disco.
+        """
+        clave = (frecuencia, lados, tipo)
+        with self.__candado:
+            if clave in self.__plantillas:
+                self.__plantillas.move_to_end(clave)
+                self.aciertos += 1
+                return self.__plantillas[clave]
+            self.fallos += 1
+
+        plantilla = self.__cargar_de_disco(clave)
+        if plantilla is None:
+            plantilla = PlantillaCara.desde_arrays(construir_plantilla_poligono(frecuencia, lados, tipo))
+            self.__guardar_en_disco(clave, plantilla)
+
+        with self.__candado:
+            self.__plantillas[clave] = plantilla
+            self.__plantillas.move_to_end(clave)
+            self.__desalojar()
+        return plantilla
+
+    def cambiar_capacidad(self, capacidad):
+        """
+        Cambia la capacidad y, si baja, desaloja ya las plantillas menos usadas.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        with self.__candado:
+            self.capacidad = capacidad
+            self.__desalojar()
+
+    def __desalojar(self):
+        # Llamar con el candado tomado
+        while len(self.__plantillas) > self.capacidad:
+            self.__plantillas.popitem(last=False)
+            self.desalojos += 1
+
+    def __ruta(self, clave):
+        frecuencia, lados, tipo = clave
+        return os.path.join(self.directorio, f"plantilla_v{VERSION_PLANTILLAS}_f{frecuencia}_l{lados}_t{tipo}.npz")
+
+    def __cargar_de_disco(self, clave):
+        if self.directorio is None:
+            return None
+        ruta = self.__ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+        try:
+            plantilla = PlantillaCara.cargar(ruta)
+        except (OSError, ValueError, KeyError):
+            # Fichero corrupto o de otra versión: se regenera
+            return None
+        with self.__candado:
+            self.aciertos_disco += 1
+        return plantilla
+
+    def __guardar_en_disco(self, clave, plantilla):
+        if self.directorio is None:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        plantilla.guardar(self.__ruta(clave))
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con aciertos, fallos, desalojos, aciertos en disco,
+        tamaño actual y capacidad.
+        """
+        with self.__candado:
+            return {"aciertos": self.aciertos,
+                    "fallos": self.fallos,
+                    "desalojos": self.desalojos,
+                    "aciertos_disco": self.aciertos_disco,
+                    "tamano": len(self.__plantillas),
+                    "capacidad": self.capacidad}
+
+    def reiniciar_estadisticas(self):
+        with self.__candado:
+            self.__poner_estadisticas_a_cero()
+
+    def __poner_estadisticas_a_cero(self):
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.aciertos_disco = 0
+
+    def vaciar(self):
+        """
+        Elimina las plantillas en memoria (el nivel en disco se conserva).
+        """
+        with self.__candado:
+            self.__plantillas.clear()
+
+# Caché por defecto del proceso
+cache_plantillas = CachePlantillas()
+
+def obtener_plantilla(frecuencia, lados, tipo):
+    """
+    Devuelve la plantilla de (frecuencia, lados, tipo) desde la caché del proceso.
+    """
+    return cache_plantillas.obtener(frecuencia, lados, tipo)
+
+def configurar_cache_plantillas(capacidad=None, directorio=None):
+    """
+    Cambia la capacidad y/o el directorio del nivel en disco de la caché del proceso.
+    Si la capacidad baja, se desalojan en el momento las plantillas menos usadas.
+    """
+    if capacidad is not None:
+        cache_plantillas.cambiar_capacidad(capacidad)
+    if directorio is not None:
+        cache_plantillas.directorio = directorio
+    return cache_plantillas
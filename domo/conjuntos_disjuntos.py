@@ -0,0 +1,65 @@
+import numpy as np
+
+class ConjuntosDisjuntos():
+    """
+    Estructura union-find sobre los índices 0..n-1.
+
+    La raíz de cada conjunto es siempre el nodo que sobrevive a la fusión: al unir
+    (destino, origen) la raíz del origen pasa a colgar de la raíz del destino, igual
+    que cuando se fusionaban los nodos de uno en uno. Por eso no se usa unión por
+    rango, solo compresión de caminos, que basta para un coste casi lineal.
+    """
+    def __init__(self, n):
+        self.padre = list(range(n))
+
+    def encontrar(self, i):
+        """
+        Devuelve la raíz del conjunto de i, comprimiendo el camino a la mitad.
+        """
+        padre = self.padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    def unir(self, destino, origen):
+        """
+        Fusiona el conjunto de origen dentro del conjunto de destino.
+        """
+        raiz_destino = self.encontrar(destino)
+        raiz_origen = self.encontrar(origen)
+        if raiz_destino != raiz_origen:
+            self.padre[raiz_origen] = raiz_destino
+
+    def unir_pares(self, destinos, origenes):
+        """
+        Aplica en orden todas las identificaciones (destinos[k], origenes[k]).
+        """
+        for destino, origen in zip(np.asarray(destinos).tolist(), np.asarray(origenes).tolist()):
+            self.unir(destino, origen)
+
+    def raices(self):
+        """
+        Devuelve un array (n,) con la raíz de cada nodo, resolviendo los punteros a la vez.
+        """
+        raices = np.array(self.padre, dtype=np.int64)
+        while True:
+            siguientes = raices[raices]
+            if np.array_equal(siguientes, raices):
+                return raices
+            raices = siguientes
+
+    def reindexar(self):
+        """
+        Calcula la renumeración compacta tras las fusiones.
+
+        Returns:
+            Tupla (mapa, supervivientes):
+            - mapa: array (n,) con el nuevo índice de cada nodo original
+            - supervivientes: índices originales de las raíces, en su orden original
+        """
+        raices = self.raices()
+        supervivientes = np.flatnonzero(raices == np.arange(len(raices)))
+        nuevo_indice = np.full(len(raices), -1, dtype=np.int64)
+        nuevo_indice[supervivientes] = np.arange(len(supervivientes))
+        return nuevo_indice[raices], supervivientes
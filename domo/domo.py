@@ -1,106 +1,93 @@
 
-from scipy.spatial import Delaunay
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from matplotlib.animation import FuncAnimation, FFMpegWriter, PillowWriter
-import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.colors as mcolors
 
+from domo.utils import *
 from domo.poliedro import *
 from domo.fusion_triangulos import *
+from domo.malla import *
+from domo.conjuntos_disjuntos import *
+from domo.indice_espacial import *
+from domo.cache_plantillas import *
+from domo.iluminacion import *
+from domo.rotaciones import *
+from domo.cache_fotogramas import *
 
 particion = ["alternado","punto_medio","triacon"]
 
 class Domo():
-    def __init__(self, semilla, frecuencia, tipo, radio):
+    def __init__(self, semilla, frecuencia, tipo, radio, precision=np.float64):
         self.semilla = semilla
         self.tipo = tipo
         self.frecuencia = frecuencia
         self.radio = radio
+        # float32 reduce a la mitad la memoria de los puntos en frecuencias muy altas
+        self.precision = np.dtype(precision)
         self.poliedro = Poliedro(semilla)
-        self.puntos = {}
-        self.vertices = []
-        self.aristas = {}
         self.vertices_aristas = {}
         self.__generar_caras_trianguladas()
         self.__generar_info_aristas()
         self.__fusionar_caras()
-        self.__proyectar_puntos_a_esfera()
-        self.__encontrar_ciclos()
-        del self.vertices
+        del self.coordenadas
+        del self.pares
+        del self.caras
+        del self.origen
+        del self.borde
         del self.vertices_aristas
         del self.conexiones_aristas
+        self.__proyectar_puntos_a_esfera()
 
     def actualizar_puntos_a_3d(self, puntos, vertices, vertices_3d):
-        # Extraer las coordenadas 2D de los vértices
-        coords_2d_vertices = np.array([puntos[v] for v in vertices])
-        
-        # Convertir las coordenadas 3D de los vértices a un array numpy
-        coords_3d_vertices = np.array(vertices_3d)
-        
-        # Crear una triangulación Delaunay con los vértices 2D
-        triangulacion = Delaunay(coords_2d_vertices)
-        
-        # Inicializar el diccionario de puntos actualizados
-        puntos_actualizados = {}
-        
-        # Para cada punto en el diccionario original
-        for id_punto, coord_2d in puntos.items():
-            # Si el punto es un vértice, simplemente usar sus coordenadas 3D
-            if id_punto in vertices:
-                idx = vertices.index(id_punto)
-                puntos_actualizados[id_punto] = tuple(coords_3d_vertices[idx])
-            else:
-                # Encontrar en qué triángulo se encuentra el punto
-                coord_2d_array = np.array([coord_2d])
-                simplex = triangulacion.find_simplex(coord_2d_array)[0]
-                
-                if simplex == -1:
-                    # El punto está fuera de la triangulación, usar el triángulo más cercano
-                    dist = np.sum((coords_2d_vertices - coord_2d)**2, axis=1)
-                    indices = np.argsort(dist)[:3]  # Usar los 3 vértices más cercanos
-                    
-                    # Calcular las coordenadas baricéntricas para los vértices más cercanos
-                    total_dist = np.sum(1.0 / dist[indices])
-                    pesos = (1.0 / dist[indices]) / total_dist
-                    
-                    # Interpolar la coordenada 3D
-                    coord_3d = np.zeros(3)
-                    for i, idx in enumerate(indices):
-                        coord_3d += pesos[i] * coords_3d_vertices[idx]
-                    
-                    puntos_actualizados[id_punto] = tuple(coord_3d)
-                else:
-                    # Obtener las coordenadas baricéntricas
-                    b = triangulacion.transform[simplex, :2].dot(np.transpose(coord_2d_array - triangulacion.transform[simplex, 2]))
-                    b = np.append(b, 1 - np.sum(b))
-                    
-                    # Obtener los vértices del triángulo
-                    vertices_triangulo = triangulacion.simplices[simplex]
-                    
-                    # Interpolar la coordenada 3D usando las coordenadas baricéntricas
-                    coord_3d = np.zeros(3)
-                    for i, v_idx in enumerate(vertices_triangulo):
-                        coord_3d += b[i] * coords_3d_vertices[v_idx]
-                    
-                    puntos_actualizados[id_punto] = tuple(coord_3d)
-        
-        return puntos_actualizados
+        """
+        Lleva los puntos 2D de una cara triangulada a 3D interpolando con coordenadas
+        baricéntricas respecto a los vértices de la cara. Todos los puntos se calculan
+        a la vez con calcular_pesos_baricentricos y un único producto de matrices.
+        """
+        ids = list(puntos.keys())
+        id_a_indice = {id_punto: i for i, id_punto in enumerate(ids)}
+        coords_2d = np.array([puntos[id_punto] for id_punto in ids])
+        indices_vertices = [id_a_indice[v] for v in vertices]
+
+        pesos = calcular_pesos_baricentricos(coords_2d, coords_2d[indices_vertices], indices_vertices)
+        coords_3d = pesos @ np.asarray(vertices_3d, dtype=np.float64)
+
+        return {id_punto: tuple(coords) for id_punto, coords in zip(ids, coords_3d.tolist())}
 
     def __generar_caras_trianguladas(self):
-        caras_trianguladas = {longitud_ciclo:fusionar_triangulos_base(self.frecuencia, longitud_ciclo, self.tipo) for longitud_ciclo in self.poliedro.longitud_ciclos}
+        # Las plantillas de cada tamaño de cara salen de la caché compartida por el proceso
+        plantillas = {longitud_ciclo: obtener_plantilla(self.frecuencia, longitud_ciclo, self.tipo) for longitud_ciclo in self.poliedro.longitud_ciclos}
+        # Orden de los ids locales de cada plantilla, para reconstruir ids bajo demanda
+        self.ids_locales = {longitud_ciclo: plantillas[longitud_ciclo].ids for longitud_ciclo in plantillas}
+        # Puntos que pueden estar en el borde de cada plantilla: los que solo dependen de
+        # 2 vértices del polígono (incluye alguno de las diagonales interiores)
+        bordes = {longitud_ciclo: np.flatnonzero(np.count_nonzero(np.abs(plantilla.pesos) > 1e-9, axis=1) <= 2)
+                  for longitud_ciclo, plantilla in plantillas.items()}
+
+        # Todas las caras se apilan en arrays globales, los índices de cada cara van desplazados
+        coordenadas = []
+        pares = []
+        caras = []
+        origen = []
+        borde = []
+        desplazamiento = 0
         for i in range(len(self.poliedro.caras)):
-            puntos_cara, vertices_cara, aristas_cara, vertices_aristas_cara = caras_trianguladas[len(self.poliedro.caras[i])]
-            vertices_3d = [self.poliedro.vertices[j] for j in self.poliedro.caras[i]]
-            puntos_cara = self.actualizar_puntos_a_3d(puntos_cara, vertices_cara, vertices_3d)
-            puntos_cara = renombrar_puntos(puntos_cara, i)
-            self.puntos = self.puntos | puntos_cara
-            vertices_cara = renombrar_vertices(vertices_cara, i)
-            self.vertices += vertices_cara
-            aristas_cara = renombrar_aristas(aristas_cara, i)
-            self.aristas = self.aristas | aristas_cara
-            for j in vertices_aristas_cara.keys():
-                self.vertices_aristas[(str(i) + "_" + str(j[0]), str(i) + "_" + str(j[1]))] = [str(i) + "_" + id for id in vertices_aristas_cara[j]]
+            plantilla = plantillas[len(self.poliedro.caras[i])]
+            n_puntos = len(plantilla.ids)
+            vertices_3d = np.array([self.poliedro.vertices[j] for j in self.poliedro.caras[i]], dtype=np.float64)
+            # Toda la cara se lleva a 3D con un solo producto (P, lados) @ (lados, 3)
+            coordenadas.append(plantilla.pesos @ vertices_3d)
+            pares.append(plantilla.pares + desplazamiento)
+            caras.append(plantilla.caras + desplazamiento)
+            origen.append(np.column_stack([np.full(n_puntos, i), np.arange(n_puntos)]))
+            borde.append(bordes[len(self.poliedro.caras[i])] + desplazamiento)
+            for j in plantilla.vertices_aristas.keys():
+                self.vertices_aristas[((i, j[0]), (i, j[1]))] = plantilla.vertices_aristas[j] + desplazamiento
+            desplazamiento += n_puntos
+
+        self.coordenadas = np.concatenate(coordenadas).astype(np.float64)
+        self.pares = np.concatenate(pares)
+        self.caras = np.concatenate(caras)
+        self.origen = np.concatenate(origen)
+        self.borde = np.concatenate(borde)
 
     def __generar_info_aristas(self):
         """
@@ -110,9 +97,9 @@ class Domo():
         - caras: lista de listas donde cada lista contiene los IDs de vértices de una cara en orden
         
         Retorna:
-        - lista de listas, cada una con 4 elementos:
-        [id_cara1 + "_" + id_local_v1, id_cara2 + "_" + id_local_v2, 
-        id_cara1 + "_" + id_local_v1_next, id_cara2 + "_" + id_local_v2_next]
+        - lista de listas, cada una con 4 tuplas:
+        [(id_cara1, id_local_v1), (id_cara2, id_local_v2), 
+        (id_cara1, id_local_v1_next), (id_cara2, id_local_v2_next)]
         donde:
         - id_cara1, id_cara2: IDs de las caras que comparten la arista
         - id_local_v1, id_local_v2: Posiciones locales del primer vértice en cada cara
@@ -172,271 +159,150 @@ class Domo():
                 
                 # Crear entrada en el formato requerido
                 info_arista = [
-                    f"{id_cara1}_{pos_v1_cara1}",
-                    f"{id_cara2}_{pos_v1_cara2}",
-                    f"{id_cara1}_{pos_v2_cara1}",
-                    f"{id_cara2}_{pos_v2_cara2}"
+                    (id_cara1, pos_v1_cara1),
+                    (id_cara2, pos_v1_cara2),
+                    (id_cara1, pos_v2_cara1),
+                    (id_cara2, pos_v2_cara2)
                 ]
                 self.conexiones_aristas.append(info_arista)
 
-    def combinar_nodos(self, lista1, lista2):
+    def __fusionar_caras(self):
         """
-        Combina pares de nodos correspondientes entre dos listas, unificando sus conexiones.
-        
-        Parámetros:
-        - lista1: lista de IDs de nodos (primera ruta)
-        - lista2: lista de IDs de nodos (segunda ruta)
-        - aristas: diccionario donde las claves son IDs de nodos y los valores son listas de IDs 
-                de nodos adyacentes
-        
-        Efecto:
-        - Añade todas las uniones del nodo de lista2 al nodo correspondiente de lista1
-        - Elimina cualquier referencia a los nodos de lista2 de las listas de adyacencia
-        - Modifica el diccionario aristas in-place
-        
-        Retorna:
-        - Diccionario aristas actualizado
+        Cose las caras por las aristas compartidas del poliedro.
+
+        Primero se registran todas las identificaciones de nodos de las costuras
+        (el nodo de la segunda cara se fusiona con el de la primera) y después se
+        resuelven de una vez con una estructura union-find. Además, los puntos de
+        borde de las caras que coinciden en el espacio se unen con un índice espacial,
+        así que una lista de lado incompleta no deja puntos duplicados en la costura.
+        Al final se renumeran puntos, aristas, caras y origen quedándose solo con los
+        nodos supervivientes. Las caras vienen ya de las plantillas, no hace falta
+        buscarlas en el grafo.
         """
-
-        if len(lista1) != len(lista2):
-            raise ValueError("Las listas deben tener el mismo número de elementos")
-        
-        # print(lista1)
-        # print(lista2)
-        # print(self.aristas)
-        
-        # Iterar sobre los pares de nodos correspondientes
-        for i in range(len(lista1)):
-            nodo_destino = lista1[i]  # Nodo que mantendremos
-            nodo_origen = lista2[i]   # Nodo que "fusionaremos" con el destino
-            
-            # 1. Añadir todas las conexiones del nodo_origen al nodo_destino
-            # Excluir la autoconexión que se crearía si nodo_origen está conectado a nodo_destino
-            for conexion in self.aristas[nodo_origen]:
-                if conexion != nodo_destino and conexion not in self.aristas[nodo_destino]:
-                    self.aristas[nodo_destino].append(conexion)
-            
-            # 2. Para cada nodo en el diccionario, reemplazar las referencias a nodo_origen por nodo_destino
-            for nodo, conexiones in self.aristas.items():
-                # Saltamos el nodo origen y destino para evitar autoconexiones
-                if nodo == nodo_origen or nodo == nodo_destino:
-                    continue
-                    
-                # Si el nodo está conectado al nodo_origen
-                if nodo_origen != nodo_destino and nodo_origen in conexiones:
-                    # Eliminar la conexión al nodo_origen
-                    conexiones.remove(nodo_origen)
-                    
-                    # Añadir conexión al nodo_destino si no existe ya
-                    if nodo_destino not in conexiones:
-                        conexiones.append(nodo_destino)
-            
-            # 3. Eliminar el nodo_origen del diccionario (opcional, depende de tus requisitos)
-            # Si quieres mantener el nodo pero sin conexiones, comenta esta línea
-            # Si necesitas mantener este nodo por alguna razón, comenta esta línea
-            if nodo_origen != nodo_destino and nodo_origen in self.aristas:
-                del self.aristas[nodo_origen]
-                del self.puntos[nodo_origen]
-
-    def __fusionar_caras(self):
+        destinos = []
+        origenes = []
         for i in self.conexiones_aristas:
             extremos_lista_1 = (i[0], i[2])
             extremos_lista_2 = (i[1], i[3])
             if extremos_lista_1 in self.vertices_aristas:
                 lista_1 = self.vertices_aristas[extremos_lista_1]
             else:
-                lista_1 = self.vertices_aristas[(i[2], i[0])]
-                lista_1.reverse()
+                lista_1 = self.vertices_aristas[(i[2], i[0])][::-1]
             if extremos_lista_2 in self.vertices_aristas:
                 lista_2 = self.vertices_aristas[extremos_lista_2]
             else:
-                lista_2 = self.vertices_aristas[(i[3], i[1])]
-                lista_2.reverse()
-
-            id_viejo_1 = lista_2[0]
-            id_viejo_2 = lista_2[-1]
-            id_nuevo_1 = lista_1[0]
-            id_nuevo_2 = lista_1[-1]
-
-            self.combinar_nodos(lista_1, lista_2)
-
-            for lista in self.vertices_aristas.values():
-                if lista[0] == id_viejo_1:
-                    lista[0] = id_nuevo_1
-                if lista[-1] == id_viejo_1:
-                    lista[-1] = id_nuevo_1
-                if lista[0] == id_viejo_2:
-                    lista[0] = id_nuevo_2
-                if lista[-1] == id_viejo_2:
-                    lista[-1] = id_nuevo_2
+                lista_2 = self.vertices_aristas[(i[3], i[1])][::-1]
+
+            if len(lista_1) != len(lista_2):
+                raise ValueError("Las listas deben tener el mismo número de elementos")
+            destinos.append(lista_1)
+            origenes.append(lista_2)
+
+        conjuntos = ConjuntosDisjuntos(len(self.coordenadas))
+        if destinos:
+            conjuntos.unir_pares(np.concatenate(destinos), np.concatenate(origenes))
+
+        # Con listas completas cada grupo de puntos coincidentes ya es un solo conjunto
+        # y estas uniones no cambian nada
+        tolerancia = 1e-9 * max(1.0, float(np.abs(self.coordenadas).max()))
+        puntos_borde = zip(self.borde.tolist(), self.coordenadas[self.borde].tolist())
+        for grupo in agrupar_coincidentes(puntos_borde, tolerancia):
+            for origen in grupo[1:]:
+                conjuntos.unir(grupo[0], origen)
+        mapa, supervivientes = conjuntos.reindexar()
+
+        self.malla = Malla(self.coordenadas[supervivientes],
+                           mapa[self.pares],
+                           mapa[self.caras],
+                           self.origen[supervivientes])
+
+    def obtener_ids(self):
+        """
+        Genera bajo demanda los ids de texto "cara_id" de cada punto de la malla, en orden de índice.
+        Solo se usan para depuración y para las etiquetas de los dibujos.
+        """
+        return [f"{cara}_{self.ids_locales[len(self.poliedro.caras[cara])][local]}" for cara, local in self.malla.origen.tolist()]
+
+    def a_diccionarios(self):
+        """
+        Devuelve la malla con el formato antiguo de diccionarios con ids de texto.
+
+        Retorna:
+        --------
+        Tupla (puntos, aristas, caras) con puntos {id: (x, y, z)}, aristas {id: [ids]}
+        y caras como lista de listas de ids.
+        """
+        return self.malla.a_diccionarios(self.obtener_ids())
 
     def __proyectar_puntos_a_esfera(self):
-        puntos_proyectados = {}
-        for id_punto, coords in self.puntos.items():
-            # Convertir las coordenadas a un array numpy
-            punto = np.array(coords)
-            
-            # Calcular la distancia desde el origen al punto
-            distancia = np.linalg.norm(punto)
-            
-            # Evitar división por cero
-            if distancia < 1e-10:  # Si el punto está muy cerca del origen
-                # Asignar una dirección aleatoria
-                direccion = np.random.randn(3)
-                direccion = direccion / np.linalg.norm(direccion)
-                punto_proyectado = self.radio * direccion
-            else:
-                # Normalizar el vector (obtener el vector unitario en la dirección del punto)
-                vector_unitario = punto / distancia
-                
-                # Escalar el vector unitario por el radio deseado
-                punto_proyectado = self.radio * vector_unitario
-            
-            # Guardar el punto proyectado en el diccionario resultado
-            puntos_proyectados[id_punto] = tuple(punto_proyectado)
-        self.puntos = puntos_proyectados
-
-    # Método privado para realizar una búsqueda en profundidad buscando ciclos de una longitud específica
-    def __busqueda_en_profundidad(self, camino, inicio, profundidad):
-        if profundidad == 0 and inicio == camino[-1]:
-            # Si alcanza profundidad 0 y vuelve al inicio, se encontró un ciclo
-            self.ciclos.append(camino[:-1])  # Guarda el ciclo encontrado
-            return
-        
-        if profundidad < 0:
-            return  # Fin de la rama de búsqueda
-
-        # Explora los vecinos conectados al último nodo del camino
-        for vecino in self.aristas[camino[-1]]:
-            if vecino not in camino or (vecino == inicio and profundidad == 1):
-                # Solo avanza si no ha visitado el vecino o si puede cerrar el ciclo
-                self.__busqueda_en_profundidad(camino + [vecino], inicio, profundidad - 1)
-
-    # Método privado para limpiar ciclos duplicados y no coplanarios
-    def __limpiar_ciclos(self):
-        ciclos_limpios = []
-        for ciclo_1 in range(len(self.ciclos)):
-            iguales = False
-            for ciclo_2 in range(ciclo_1 + 1, len(self.ciclos)):
-                # Compara si dos ciclos tienen los mismos vértices (sin importar el orden)
-                if set(self.ciclos[ciclo_1]) == set(self.ciclos[ciclo_2]):
-                    iguales = True
-                    break
-            if not iguales:
-                ciclos_limpios.append(self.ciclos[ciclo_1])
-
-        self.ciclos = ciclos_limpios  # Mantiene solo un ciclo único por conjunto de vértices
-
-    # Método privado para encontrar todas las caras del poliedro
-    def __encontrar_ciclos(self):
-        # Inicializa el diccionario de caras separadas por su longitud
-        self.caras = []
-
-        # Para cada posible longitud de cara
-        for nodo in self.aristas:
-            self.ciclos = []
-            # Busca ciclos partiendo de cada nodo
-            self.__busqueda_en_profundidad([nodo], nodo, 3)
-            # Limpia los ciclos encontrados
-            self.__limpiar_ciclos()
-            self.caras += self.ciclos
-
-        del self.ciclos
+        if self.malla.vertices.dtype != self.precision:
+            self.malla.vertices = np.ascontiguousarray(self.malla.vertices, dtype=self.precision)
+        # Se normalizan todos los puntos a la vez, en el sitio
+        proyectar_a_esfera(self.malla.vertices, self.radio)
 
     # Método para dibujar el poliedro
     def dibujar(self, ids = False, alpha_caras = 0.8):
-        # Crear figura y ejes 3D
-        fig = plt.figure(figsize=(10, 8))
-        ax = fig.add_subplot(111, projection='3d')
-
-        # Extraer coordenadas x, y, z de todos los vértices
-        x = [self.puntos[v][0] for v in self.puntos]
-        y = [self.puntos[v][1] for v in self.puntos]
-        z = [self.puntos[v][2] for v in self.puntos]
-
-        # Dibujar las aristas si se proporcionan
-        if self.aristas:
-            for vertice_id, conexiones in self.aristas.items():
-                v1 = self.puntos[vertice_id]
-                for vecino_id in conexiones:
-                    if vertice_id < vecino_id:
-                        v2 = self.puntos[vecino_id]
-                        ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
-                                color='#2F5F8A', linestyle='-', linewidth=1)
-
-        # Añadir etiquetas de identificadores si ids es True
-        if ids:
-            for idx, (xi, yi, zi) in enumerate(self.puntos):
-                ax.text(xi, yi, zi, str(idx), color='black', fontsize=20, ha='left', va='bottom')
-    
-        # Dibujar caras
-        poly3d = []
-        for cara in self.caras:
-            # Obtener coordenadas de vértices para esta cara
-            vertices_cara = [self.puntos[id_v] for id_v in cara]
-            poly3d.append(vertices_cara)
-        
-        # Crear colección de polígonos 3D y añadirla a los ejes
-        cara_collection = Poly3DCollection(poly3d, 
-                                        facecolors=["#0F52BA" for _ in range(len(self.caras))], 
-                                        alpha=alpha_caras,
-                                        edgecolor='black',
-                                        linewidth=0.5)
-        ax.add_collection3d(cara_collection)
-
-        # Configurar aspecto del gráfico
-        ax.set_box_aspect([1, 1, 1])
-        titulo = self.semilla
-        titulo = titulo.split()
-        titulo = [palabra.capitalize() for palabra in titulo]
-        ax.set_title(" ".join(titulo))
-        ax.set_axis_off()
-
-        # Establecer límites de ejes en un cubo para mejor visualización
-        max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
-        mid_x = np.mean([np.max(x), np.min(x)])
-        mid_y = np.mean([np.max(y), np.min(y)])
-        mid_z = np.mean([np.max(z), np.min(z)])
-
-        ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        # matplotlib solo se carga al dibujar
+        from domo.renderizado import dibujar_poliedro
 
-        plt.tight_layout()
-        plt.show()
+        titulo = " ".join(palabra.capitalize() for palabra in self.semilla.split())
+        etiquetas = self.obtener_ids() if ids else None
+        dibujar_poliedro(self.malla.vertices, self.malla.aristas, self.malla.caras, titulo, etiquetas, alpha_caras)
 
-    def generar_rotaciones(self, n):
+    def generar_rotaciones(self, n, dtype=None):
         """
         Calcula n rotaciones equidistantes (360°) alrededor del eje terrestre (inclinado 23.44°).
+        Todas las matrices salen de una vez y los puntos se rotan con un único producto
+        sobre un array preasignado.
+
+        Parámetros:
+        -----------
+        n : int
+            Número de rotaciones.
+        dtype : np.dtype, opcional
+            Tipo del resultado (np.float32 para ahorrar memoria).
 
         Retorna:
         --------
-        List[np.ndarray]
-            Lista de arreglos Nx3 con los puntos rotados.
+        np.ndarray
+            Array nxNx3 con los puntos rotados en cada frame.
         """
-        ids = list(self.puntos.keys())
-        coords = np.array([self.puntos[i] for i in ids])
-
-        inclinacion = np.radians(23.44)
-        eje_tierra = np.array([np.sin(inclinacion), 0, np.cos(inclinacion)])
+        coords = self.malla.vertices
+        return rotar_puntos(coords, self.generar_matrices_rotacion(n), dtype)
 
-        def rot(theta):
-            return matriz_rotacion_eje(eje_tierra, theta)
+    def iterar_rotaciones(self, n, dtype=None):
+        """
+        Igual que generar_rotaciones pero genera los frames uno a uno, sin guardar
+        todas las rotaciones en memoria.
+        """
+        coords = self.malla.vertices
+        return iterar_rotaciones(coords, self.generar_matrices_rotacion(n), dtype)
 
-        angulos = np.linspace(0, 2*np.pi, n, endpoint=False)
-        rotadas = [coords @ rot(a).T for a in angulos]
+    def generar_matrices_rotacion(self, n):
+        """
+        Calcula las matrices de las n rotaciones equidistantes (360°) alrededor del eje
+        terrestre (inclinado 23.44°) que usa generar_rotaciones.
 
-        return rotadas  # lista de arrays Nx3
+        Retorna:
+        --------
+        np.ndarray
+            Array nx3x3 con la matriz de cada rotación.
+        """
+        return matrices_rotacion_eje(EJE_TIERRA, angulos_vuelta_completa(n))
     
     def calcular_colores_caras_rotadas(self, rotaciones, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
         """
         Calcula el color iluminado de cada cara en cada rotación del poliedro, 
         ajustando la intensidad por distancia a la fuente de luz.
 
+        Cada fotograma se procesa de una vez: se toma el tensor (F, 3, 3) con los
+        vértices de todas las caras y normales, centroides e intensidades se calculan
+        en bloque.
+
         Parámetros:
         -----------
-        rotaciones : list[np.ndarray]
-            Lista de matrices Nx3 con coordenadas rotadas por frame.
+        rotaciones : list[np.ndarray] or np.ndarray
+            Lista de matrices Nx3 (o array TxNx3) con coordenadas rotadas por frame.
         fuente_luz : np.ndarray
             Posición fija de la fuente de luz.
         color_base_rgb : np.ndarray or str
@@ -445,184 +311,332 @@ class Domo():
             Intensidad mínima.
         factor_distancia : float
             Ponderador para cuánto afecta la distancia al brillo.
+
+        Retorna:
+        --------
+        np.ndarray
+            Array TxFx3 con el color RGB de cada cara en cada frame.
         """
         if isinstance(color_base_rgb, str):
-            color_base_rgb = np.array(mcolors.to_rgb(color_base_rgb))
+            color_base_rgb = color_a_rgb(color_base_rgb)
 
-        colores_por_rotacion = []
-        puntos_ids = list(self.puntos.keys())
-        id_to_index = {pid: i for i, pid in enumerate(puntos_ids)}
+        colores_por_rotacion = np.empty((len(rotaciones), len(self.malla.caras), 3))
+        for frame, coords in enumerate(rotaciones):
+            normales, centroides = normales_y_centroides(coords[self.malla.caras])
+            colores_por_rotacion[frame] = iluminar_caras(normales, centroides, fuente_luz, color_base_rgb,
+                                                         min_intensidad, factor_distancia)
 
-        for coords in rotaciones:
-            intensidades = []
-            distancias = []
-            colores_cara = []
+        return colores_por_rotacion
 
-            for cara in self.caras:
-                vertices = [coords[id_to_index[vid]] for vid in cara]
+    def calcular_colores_rotacion_rigida(self, matrices, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+        """
+        Igual que calcular_colores_caras_rotadas pero para una rotación rígida dada por sus
+        matrices: normales y centroides se calculan una sola vez sobre la malla sin rotar y
+        en cada frame solo se rota la fuente de luz al sistema del domo.
 
-                # Normal e iluminación base (como tu versión original)
-                v1, v2, v3 = np.array(vertices[0]), np.array(vertices[1]), np.array(vertices[2])
-                normal = np.cross(v2 - v1, v3 - v1)
-                normal = normal / np.linalg.norm(normal)
+        Parámetros:
+        -----------
+        matrices : np.ndarray
+            Array Tx3x3 con la matriz de rotación de cada frame.
+        fuente_luz : np.ndarray
+            Posición fija de la fuente de luz.
+        color_base_rgb : np.ndarray or str
+            Color base RGB normalizado (o string hexadecimal).
+        min_intensidad : float
+            Intensidad mínima.
+        factor_distancia : float
+            Ponderador para cuánto afecta la distancia al brillo.
 
-                centroide = np.mean([v1, v2, v3], axis=0)
-                vector_luz = fuente_luz - centroide
+        Retorna:
+        --------
+        np.ndarray
+            Array TxFx3 con el color RGB de cada cara en cada frame.
+        """
+        if isinstance(color_base_rgb, str):
+            color_base_rgb = color_a_rgb(color_base_rgb)
 
-                if np.dot(normal, vector_luz) < 0:
-                    normal = -normal  # Inversión como hacías antes
+        normales, centroides = normales_y_centroides(self.malla.vertices[self.malla.caras].astype(np.float64))
+        return iluminar_caras_rotacion_rigida(normales, centroides, matrices, fuente_luz, color_base_rgb,
+                                              min_intensidad, factor_distancia)
 
-                vector_luz = vector_luz / np.linalg.norm(vector_luz)
-                intensidad_base = np.clip(np.dot(normal, vector_luz), min_intensidad, 1.0)
+    def iterar_colores_rotacion_rigida(self, matrices, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+        """
+        Versión perezosa de calcular_colores_rotacion_rigida: normales y centroides se
+        calculan una vez y los colores se generan frame a frame, de modo que solo hay un
+        array Fx3 en memoria a la vez.
+        """
+        if isinstance(color_base_rgb, str):
+            color_base_rgb = color_a_rgb(color_base_rgb)
 
-                # Calcular distancia
-                distancia = np.linalg.norm(fuente_luz - centroide)
+        normales, centroides = normales_y_centroides(self.malla.vertices[self.malla.caras].astype(np.float64))
+        for matriz in matrices:
+            yield iluminar_caras_rotacion_rigida(normales, centroides, matriz[None], fuente_luz, color_base_rgb,
+                                                 min_intensidad, factor_distancia)[0]
 
-                intensidades.append(intensidad_base)
-                distancias.append(distancia)
+    def __titulo_video(self):
+        semilla = " ".join(p.capitalize() for p in self.semilla.split())
+        particion_str = " ".join(particion[self.tipo].split("_"))
+        return f"{semilla}\nPartición {particion_str}\nFrecuencia {self.frecuencia}"
 
-            # Normalizar distancias para ajustar brillo
-            distancias = np.array(distancias)
-            d_min, d_max = np.min(distancias), np.max(distancias)
-            d_norm = (distancias - d_min) / (d_max - d_min + 1e-8)  # evitar división por cero
+    def __encuadre(self):
+        """
+        Centro y semilado del cubo que contiene al domo sin rotar, como los límites de los ejes.
+        """
+        coords = self.malla.vertices
+        x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+        max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
+        centro = np.array([np.mean([np.max(x), np.min(x)]),
+                           np.mean([np.max(y), np.min(y)]),
+                           np.mean([np.max(z), np.min(z)])])
+        return centro, max_range
 
-            # Aplicar corrección de intensidad por distancia
-            for i in range(len(self.caras)):
-                ajuste = 1.0 - factor_distancia * d_norm[i]
-                intensidad_final = intensidades[i] * ajuste
-                intensidad_final = np.clip(intensidad_final, min_intensidad, 1.0)
+    def preparar_rasterizador(self, elevacion=30, alpha_caras=0.8, proyeccion="perspectiva"):
+        """
+        Crea el rasterizador NumPy con la misma cámara, encuadre y título que preparar_escena.
 
-                color = intensidad_final * color_base_rgb
-                colores_cara.append(color)
+        Parámetros:
+        -----------
+        elevacion : float
+            Ángulo de cámara vertical.
+        alpha_caras : float
+            Transparencia de las caras.
+        proyeccion : str
+            "perspectiva" u "ortografica".
 
-            colores_por_rotacion.append(colores_cara)
+        Retorna:
+        --------
+        Rasterizador
+        """
+        from domo.rasterizador import Rasterizador
 
-        return colores_por_rotacion
+        centro, max_range = self.__encuadre()
+        return Rasterizador(self.malla.aristas, self.malla.caras, centro, max_range,
+                            elevacion=elevacion, azimut=0, alpha_caras=alpha_caras,
+                            titulo=self.__titulo_video(), proyeccion=proyeccion)
 
-    def generar_video_rotacion(self, pasos=120, elevacion=30, ids=False, alpha_caras=0.8, nombre_salida = "poliedro.gif"):
+    def preparar_escena(self, elevacion=30, ids=False, alpha_caras=0.8):
         """
-        Genera un video animado del domo geodésico rotando con sombreado dinámico.
+        Crea la figura de la animación con todos sus artistas una sola vez: una
+        Line3DCollection para todas las aristas, una Poly3DCollection para todas las
+        caras y, si se piden, los textos de los ids. Los límites, el título y la cámara
+        son fijos.
 
         Parámetros:
         -----------
-        pasos : int
-            Número de frames de rotación.
         elevacion : float
             Ángulo de cámara vertical.
         ids : bool
             Mostrar etiquetas de los vértices.
         alpha_caras : float
             Transparencia de las caras.
-        grados : float
-            Grados totales de rotación sobre el eje terrestre.
+
+        Retorna:
+        --------
+        tuple
+            (fig, actualizar_escena), donde actualizar_escena(puntos_rotados, colores)
+            solo cambia las coordenadas y colores de los artistas y los devuelve.
         """
-        # === Configuración general ===
-        fig = plt.figure(figsize=(10, 8), facecolor='#1F1F1F')
-        ax = fig.add_subplot(111, projection='3d')
-        ax.set_facecolor('#1F1F1F')
+        # matplotlib solo se carga al dibujar
+        from domo.renderizado import crear_escena
 
-        # === Datos iniciales para escalado ===
-        coords = np.array(list(self.puntos.values()))
-        x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+        etiquetas = self.obtener_ids() if ids else None
+        return crear_escena(self.malla.vertices, self.malla.aristas, self.malla.caras, self.__titulo_video(),
+                            etiquetas, elevacion, alpha_caras)
 
-        max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
-        mid_x = np.mean([np.max(x), np.min(x)])
-        mid_y = np.mean([np.max(y), np.min(y)])
-        mid_z = np.mean([np.max(z), np.min(z)])
-
-        # === Generar rotaciones e iluminación ===
-        rotaciones = self.generar_rotaciones(pasos)
-        fuente_luz = np.array([20, -30, 40])
-        color_base = "#73C0E2"
-
-        colores_por_frame = self.calcular_colores_caras_rotadas(
-            rotaciones=rotaciones,
-            fuente_luz=fuente_luz,
-            color_base_rgb=color_base
-        )
-
-        puntos_ids = list(self.puntos.keys())
-
-        def dibujar_escena(frame):
-            ax.clear()
-            ax.set_box_aspect([1, 1, 1])
-            ax.set_xlim(mid_x - max_range, mid_x + max_range)
-            ax.set_ylim(mid_y - max_range, mid_y + max_range)
-            ax.set_zlim(mid_z - max_range, mid_z + max_range)
-            ax.axis('off')
-
-            # === Título ===
-            semilla = " ".join(p.capitalize() for p in self.semilla.split())
-            particion_str = " ".join(particion[self.tipo].split("_"))
-            titulo = f"{semilla}\nPartición {particion_str}\nFrecuencia {self.frecuencia}"
-            ax.set_title(titulo, color="#F1F1F1")
-
-            # === Puntos rotados ===
-            puntos_rotados = rotaciones[frame]
-            id_to_coord = {pid: puntos_rotados[i] for i, pid in enumerate(puntos_ids)}
-
-            # === Aristas ===
-            for v1_id, vecinos in self.aristas.items():
-                v1 = id_to_coord[v1_id]
-                for v2_id in vecinos:
-                    if v1_id < v2_id:
-                        v2 = id_to_coord[v2_id]
-                        ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
-                                color='#3E6576', linestyle='-', linewidth=1)
-
-            # === Caras ===
-            poly3d = []
-            for cara in self.caras:
-                vertices = [id_to_coord[vid] for vid in cara]
-                poly3d.append(vertices)
-
-            coleccion = Poly3DCollection(
-                poly3d,
-                facecolors=colores_por_frame[frame],
-                alpha=alpha_caras,
-                edgecolor='#3E6576',
-                linewidth=0.5
-            )
-            ax.add_collection3d(coleccion)
+    def preparar_renderizado(self, backend="matplotlib", elevacion=30, ids=False, alpha_caras=0.8, proyeccion="perspectiva"):
+        """
+        Prepara la escena del backend elegido y devuelve una función que renderiza un
+        fotograma a un array RGB, sin animación ni escritor de por medio.
+
+        Parámetros:
+        -----------
+        backend : str
+            "matplotlib" o "numpy".
+        elevacion : float
+            Ángulo de cámara vertical.
+        ids : bool
+            Mostrar etiquetas de los vértices.
+        alpha_caras : float
+            Transparencia de las caras.
+        proyeccion : str
+            Proyección del backend numpy, "perspectiva" u "ortografica".
 
-            # === IDs opcionales ===
-            if ids:
-                delta = max_range * 0.02
-                for vid, (xi, yi, zi) in id_to_coord.items():
-                    ax.text(xi, yi, zi + delta, str(vid), color='#F1F1F1', fontsize=9,
-                            ha='left', va='bottom')
+        Retorna:
+        --------
+        function
+            renderizar(puntos_rotados, colores) -> array uint8 (alto, ancho, 3).
+        """
+        if backend == "numpy":
+            rasterizador = self.preparar_rasterizador(elevacion, alpha_caras, proyeccion)
+            puntos_ids = self.obtener_ids() if ids else None
+            _, max_range = self.__encuadre()
 
-            ax.view_init(elev=elevacion, azim=0)  # cámara fija
+            def renderizar(puntos_rotados, colores):
+                fotograma = rasterizador.renderizar(puntos_rotados, colores)
+                if ids:
+                    fotograma = rasterizador.dibujar_etiquetas(fotograma, puntos_rotados, puntos_ids, max_range * 0.02)
+                return fotograma
 
-        # === Animación ===
-        anim = FuncAnimation(fig, dibujar_escena, frames=pasos, interval=100)
+            return renderizar
 
-        try:
-            if nombre_salida.endswith(".mp4"):
-                writer = FFMpegWriter(fps=30)
-            elif nombre_salida.endswith(".gif"):
-                writer = PillowWriter(fps=15)
+        from domo.renderizado import renderizador_agg
+
+        return renderizador_agg(*self.preparar_escena(elevacion, ids, alpha_caras))
+
+    def iterar_fotogramas(self, pasos=120, fuente_luz=np.array([20, -30, 40]), color_base="#73C0E2", **opciones):
+        """
+        Genera los fotogramas RGB de la rotación de uno en uno: rota los puntos, ilumina
+        las caras y renderiza cada frame justo cuando se pide, así que la memoria es
+        proporcional al tamaño de la malla y no al número de frames.
+
+        Parámetros:
+        -----------
+        pasos : int
+            Número de frames de rotación.
+        fuente_luz : np.ndarray
+            Posición fija de la fuente de luz.
+        color_base : str
+            Color base de las caras.
+        **opciones
+            Argumentos de preparar_renderizado (backend, elevacion, ids, alpha_caras, proyeccion).
+
+        Retorna:
+        --------
+        generator
+            Arrays uint8 (alto, ancho, 3), uno por frame.
+        """
+        renderizar = self.preparar_renderizado(**opciones)
+        matrices = self.generar_matrices_rotacion(pasos)
+        colores = self.iterar_colores_rotacion_rigida(matrices, fuente_luz, color_base)
+        for puntos_rotados, colores_frame in zip(self.iterar_rotaciones(pasos), colores):
+            yield renderizar(puntos_rotados, colores_frame)
+
+    def obtener_fotogramas_cacheados(self, cache, pasos, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+        """
+        Puntos rotados y colores de cada frame desde una CacheFotogramas, calculándolos
+        solo si no están. La geometría (puntos rotados, normales y centroides) se guarda
+        con el hash de (semilla, frecuencia, tipo, radio, pasos, precisión) y los colores
+        aparte, con el hash de la geometría y de los parámetros de la luz, así que cambiar
+        la luz o el color base solo recalcula la iluminación.
+
+        Parámetros:
+        -----------
+        cache : CacheFotogramas
+            Caché en disco.
+        pasos : int
+            Número de frames de rotación.
+        fuente_luz : np.ndarray
+            Posición fija de la fuente de luz.
+        color_base_rgb : np.ndarray or str
+            Color base RGB normalizado (o string hexadecimal).
+        min_intensidad : float
+            Intensidad mínima.
+        factor_distancia : float
+            Ponderador para cuánto afecta la distancia al brillo.
+
+        Retorna:
+        --------
+        tuple
+            (rotaciones, colores): memmaps de solo lectura TxNx3 y TxFx3.
+        """
+        if isinstance(color_base_rgb, str):
+            color_base_rgb = color_a_rgb(color_base_rgb)
+        fuente_luz = np.asarray(fuente_luz, dtype=np.float64)
+
+        vertices, caras = self.malla.vertices, self.malla.caras
+        matrices = self.generar_matrices_rotacion(pasos)
+        clave_geometria = clave_contenido(self.semilla, self.frecuencia, self.tipo, self.radio, pasos, self.precision.str)
+
+        rotaciones = cache.obtener(clave_geometria, "rotaciones", (pasos, len(vertices), 3), vertices.dtype,
+                                   lambda: iterar_rotaciones(vertices, matrices))
+        # Normales y centroides de la malla sin rotar, apilados en un array 2xFx3
+        normales_centroides = cache.obtener(clave_geometria, "normales", (2, len(caras), 3), np.float64,
+                                            lambda: normales_y_centroides(vertices[caras].astype(np.float64)))
+
+        clave_luz = clave_contenido(clave_geometria, fuente_luz, color_base_rgb, min_intensidad, factor_distancia)
+        normales, centroides = np.asarray(normales_centroides[0]), np.asarray(normales_centroides[1])
+        colores = cache.obtener(clave_luz, "colores", (pasos, len(caras), 3), np.float64,
+                                lambda: (iluminar_caras_rotacion_rigida(normales, centroides, matriz[None], fuente_luz, color_base_rgb,
+                                                                        min_intensidad, factor_distancia)[0]
+                                         for matriz in matrices))
+        return rotaciones, colores
+
+    def generar_video_rotacion(self, pasos=120, elevacion=30, ids=False, alpha_caras=0.8, nombre_salida = "poliedro.gif",
+                               backend="matplotlib", proyeccion="perspectiva", procesos=1, anticipacion=2,
+                               fuente_luz=np.array([20, -30, 40]), color_base="#73C0E2", cache=None):
+        """
+        Genera un video animado del domo geodésico rotando con sombreado dinámico.
+
+        Los frames se generan y se pasan al escritor de GIF/MP4 de uno en uno (rotar,
+        iluminar, renderizar y descartar), con el codificador en otro hilo. Con
+        backend="matplotlib" la escena se construye una vez y en cada frame solo se
+        actualizan las coordenadas y colores de sus artistas. Con backend="numpy" los
+        frames se rasterizan directamente en arrays RGB (sin matplotlib ni pantalla). Con
+        procesos distinto de 1 los frames de cualquiera de los dos backends se reparten
+        entre varios procesos; en ese caso rotaciones y colores se calculan de antemano
+        para compartirlos. Con una CacheFotogramas, rotaciones, normales y colores se leen
+        de disco si ya se calcularon, y al cambiar solo el estilo (alpha_caras, elevacion,
+        backend...) únicamente se rasteriza y se codifica.
+
+        Parámetros:
+        -----------
+        pasos : int
+            Número de frames de rotación.
+        elevacion : float
+            Ángulo de cámara vertical.
+        ids : bool
+            Mostrar etiquetas de los vértices.
+        alpha_caras : float
+            Transparencia de las caras.
+        nombre_salida : str
+            Archivo de salida, .gif o .mp4.
+        backend : str
+            "matplotlib" o "numpy".
+        proyeccion : str
+            Proyección del backend numpy, "perspectiva" u "ortografica".
+        procesos : int o None
+            Procesos que renderizan en paralelo; None usa todos los núcleos.
+        anticipacion : int
+            Frames que el render puede adelantarse al codificador; 0 codifica en el mismo hilo.
+        fuente_luz : np.ndarray
+            Posición fija de la fuente de luz.
+        color_base : str
+            Color base de las caras.
+        cache : CacheFotogramas o None
+            Caché en disco de rotaciones, normales y colores.
+        """
+        if backend not in ("matplotlib", "numpy"):
+            raise ValueError("El backend debe ser 'matplotlib' o 'numpy'")
+        from domo.escritura_video import guardar_video, paleta_sombreado
+        from domo.render_paralelo import renderizar_en_paralelo
+
+        opciones = dict(backend=backend, elevacion=elevacion, ids=ids, alpha_caras=alpha_caras, proyeccion=proyeccion)
+
+        if cache is not None:
+            rotaciones, colores_por_frame = self.obtener_fotogramas_cacheados(cache, pasos, fuente_luz, color_base)
+            if procesos == 1:
+                renderizar = self.preparar_renderizado(**opciones)
+                fotogramas = (renderizar(rotaciones[frame], colores_por_frame[frame]) for frame in range(pasos))
             else:
-                raise ValueError("El archivo debe terminar en .mp4 o .gif")
+                fotogramas = renderizar_en_paralelo(self, rotaciones, colores_por_frame, procesos, **opciones)
+        elif procesos == 1:
+            fotogramas = self.iterar_fotogramas(pasos, fuente_luz, color_base, **opciones)
+        else:
+            # === Generar rotaciones e iluminación ===
+            matrices = self.generar_matrices_rotacion(pasos)
+            rotaciones = rotar_puntos(self.malla.vertices, matrices)
+            colores_por_frame = self.calcular_colores_rotacion_rigida(
+                matrices=matrices,
+                fuente_luz=fuente_luz,
+                color_base_rgb=color_base
+            )
+            fotogramas = renderizar_en_paralelo(self, rotaciones, colores_por_frame, procesos, **opciones)
 
-            anim.save(nombre_salida, writer=writer)
+        try:
+            # Los GIF usan la paleta de la rampa de sombreado en vez de cuantizar cada frame;
+            # solo se construye si hace falta, cada una lleva una tabla de 16 MB
+            paleta = paleta_sombreado(color_base, alpha_caras=alpha_caras) if nombre_salida.endswith(".gif") else None
+            guardar_video(fotogramas, nombre_salida, anticipacion=anticipacion, paleta=paleta)
             print(f"✅ Video guardado como {nombre_salida}")
         except FileNotFoundError:
-            print("❌ No se encontró ffmpeg o pillow. ¿Instalaste FFMPEG o PIL?")
-        finally:
-            plt.close(fig)
-
-def matriz_rotacion_eje(v, theta):
-    """
-    Retorna la matriz de rotación 3x3 para rotar un ángulo theta (rad)
-    alrededor del eje unitario v (np.array de 3 elementos).
-    """
-    v = v / np.linalg.norm(v)
-    x, y, z = v
-    c, s = np.cos(theta), np.sin(theta)
-    C = 1 - c
-    return np.array([
-        [c + x*x*C,     x*y*C - z*s, x*z*C + y*s],
-        [y*x*C + z*s, c + y*y*C,     y*z*C - x*s],
-        [z*x*C - y*s, z*y*C + x*s, c + z*z*C    ]
-    ])
\ No newline at end of file
+            print("❌ No se encontró ffmpeg o pillow. ¿Instalaste FFMPEG o PIL?")
\ No newline at end of file
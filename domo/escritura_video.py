@@ -0,0 +1,276 @@
+"""
+Escritura de fotogramas RGB ya renderizados a GIF (Pillow) o MP4 (ffmpeg), sin pasar
+por matplotlib.animation. Los fotogramas se consumen de uno en uno según llegan, así
+que la memoria no depende de la duración del video.
+
+Para los GIF de los domos hay además un codificador con paleta global fija: las caras
+se sombrean escalando un único color base y se mezclan con un fondo, unas aristas y un
+texto conocidos, así que la paleta sale de esa rampa en vez de cuantizar cada fotograma.
+"""
+import queue
+import struct
+import subprocess
+import threading
+from functools import lru_cache
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+from scipy.spatial import cKDTree
+
+from domo.iluminacion import *
+from domo.rasterizador import *
+
+# Los mismos fps que usaban PillowWriter y FFMpegWriter en generar_video_rotacion
+FPS_GIF = 15
+FPS_MP4 = 30
+
+# Índice de la paleta global reservado a los píxeles que no cambian respecto al fotograma anterior
+INDICE_TRANSPARENTE = 255
+
+def caja_cambios(fotograma, anterior):
+    """
+    Rectángulo (x0, y0, x1, y1) que contiene todos los píxeles distintos entre dos
+    fotogramas, o None si son iguales.
+    """
+    cambios = ((fotograma[..., 0] != anterior[..., 0]) | (fotograma[..., 1] != anterior[..., 1])
+               | (fotograma[..., 2] != anterior[..., 2]))
+    filas = np.flatnonzero(cambios.any(axis=1))
+    if not filas.size:
+        return None
+    columnas = np.flatnonzero(cambios.any(axis=0))
+    return columnas[0], filas[0], columnas[-1] + 1, filas[-1] + 1
+
+def guardar_gif(fotogramas, nombre_salida, fps=FPS_GIF):
+    """
+    Guarda una secuencia de arrays uint8 (alto, ancho, 3) como GIF animado en bucle.
+
+    Cada fotograma se cuantiza y se escribe en cuanto llega (Image.save con save_all
+    acumula todos antes de escribir). Como hace Pillow, de cada fotograma solo se guarda
+    el rectángulo que cambia respecto al anterior, con su propia paleta.
+    """
+    duracion = int(1000 / fps)
+    anterior = None
+    with open(nombre_salida, "wb") as archivo:
+        for fotograma in fotogramas:
+            fotograma = np.asarray(fotograma, dtype=np.uint8)[..., :3]
+            if anterior is None:
+                caja = (0, 0, fotograma.shape[1], fotograma.shape[0])
+            else:
+                # Un fotograma repetido se escribe como un píxel sin cambios
+                caja = caja_cambios(fotograma, anterior) or (0, 0, 1, 1)
+            x0, y0, x1, y1 = caja
+            imagen = Image.fromarray(np.ascontiguousarray(fotograma[y0:y1, x0:x1])).convert("P", palette=Image.Palette.ADAPTIVE)
+            if anterior is None:
+                cabecera, _ = GifImagePlugin.getheader(imagen, info={"loop": 0, "duration": duracion})
+                archivo.write(b"".join(cabecera))
+            for bloque in GifImagePlugin.getdata(imagen, offset=(x0, y0), duration=duracion, include_color_table=True):
+                archivo.write(bloque)
+            anterior = fotograma.copy()
+        archivo.write(b";")
+    if anterior is None:
+        raise ValueError("No hay fotogramas que guardar")
+
+class PaletaGif():
+    """
+    Paleta global de hasta 255 colores con una tabla RGB -> índice de 2^24 entradas.
+    La tabla se rellena bajo demanda: cada color nuevo se busca una sola vez en un
+    KD-tree de la paleta y a partir de ahí convertir un fotograma es una sola indexación.
+    """
+    def __init__(self, colores):
+        self.colores = np.asarray(colores, dtype=np.uint8).reshape(-1, 3)
+        if len(self.colores) > INDICE_TRANSPARENTE:
+            raise ValueError(f"La paleta admite como mucho {INDICE_TRANSPARENTE} colores")
+        self.__arbol = cKDTree(self.colores.astype(np.float64))
+        # INDICE_TRANSPARENTE marca los colores aún no buscados
+        self.__tabla = np.full(1 << 24, INDICE_TRANSPARENTE, dtype=np.uint8)
+
+    def indices(self, fotograma):
+        """
+        Índice del color de la paleta más cercano a cada píxel de un array uint8 (..., 3).
+        """
+        fotograma = np.asarray(fotograma, dtype=np.uint8)
+        claves = (fotograma[..., 0].astype(np.uint32) << 16) | (fotograma[..., 1].astype(np.uint32) << 8) | fotograma[..., 2]
+        indices = self.__tabla[claves]
+        nuevos = indices == INDICE_TRANSPARENTE
+        if nuevos.any():
+            claves_nuevas = np.unique(claves[nuevos])
+            rgb = np.stack([claves_nuevas >> 16, (claves_nuevas >> 8) & 255, claves_nuevas & 255], axis=1)
+            self.__tabla[claves_nuevas] = self.__arbol.query(rgb.astype(np.float64))[1]
+            indices[nuevos] = self.__tabla[claves[nuevos]]
+        return indices
+
+    def cabecera_gif(self, ancho, alto, bucle=0):
+        """
+        Cabecera GIF89a con la paleta como tabla de color global y la extensión de bucle.
+        """
+        tabla = np.zeros((256, 3), dtype=np.uint8)
+        tabla[:len(self.colores)] = self.colores
+        return (b"GIF89a" + struct.pack("<HHBBB", ancho, alto, 0xF7, 0, 0) + tabla.tobytes()
+                + b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", bucle) + b"\x00")
+
+@lru_cache(maxsize=1)
+def paleta_sombreado(color_base="#73C0E2", color_fondo="#1F1F1F", color_aristas="#3E6576", color_texto="#F1F1F1",
+                     alpha_caras=0.8, niveles_intensidad=72):
+    """
+    Paleta global de los videos de rotación a partir de sus colores conocidos.
+
+    Los colores exactos del fondo, las aristas, el texto y la base van primero. Después
+    se añaden las mezclas de texto y aristas sobre el fondo y la rampa de sombreado: la
+    base escalada por la intensidad sobre lo que deja pasar una, dos o tres capas de
+    caras con transparencia alpha_caras. Solo se guarda en caché la última paleta, que
+    reutilizan los videos seguidos con los mismos colores: cada una lleva una tabla
+    RGB -> índice de 16 MB.
+
+    Args:
+        color_base: Color base de las caras
+        color_fondo: Color del fondo
+        color_aristas: Color de las aristas
+        color_texto: Color del título y las etiquetas
+        alpha_caras: Opacidad de las caras
+        niveles_intensidad: Niveles de la rampa de sombreado por cada número de capas
+
+    Returns:
+        PaletaGif con 255 colores como mucho
+    """
+    base, fondo, aristas, texto = (color_a_rgb(color) for color in (color_base, color_fondo, color_aristas, color_texto))
+    t = np.linspace(0, 1, 24)[1:-1, None]
+    textos = t * texto + (1 - t) * fondo
+    t = np.linspace(0, 1, 10)[1:-1, None]
+    lineas = t * aristas + (1 - t) * fondo
+    fondo_filtrado = fondo * (1 - alpha_caras) ** np.arange(1, 4)[:, None]
+    intensidades = np.linspace(0, 1, niveles_intensidad)
+    rampa = (intensidades[:, None, None] * base + fondo_filtrado).reshape(-1, 3)
+
+    colores = np.vstack([fondo, aristas, texto, base, textos, lineas, rampa])
+    colores = np.clip(np.round(colores * 255), 0, 255).astype(np.uint8)
+    # Sin repetidos y conservando el orden, para que el fondo sea el índice 0
+    _, primeros = np.unique(colores, axis=0, return_index=True)
+    return PaletaGif(colores[np.sort(primeros)][:INDICE_TRANSPARENTE])
+
+def guardar_gif_paleta(fotogramas, nombre_salida, paleta, fps=FPS_GIF):
+    """
+    Guarda fotogramas uint8 (alto, ancho, 3) como GIF en bucle con una paleta global.
+
+    Cada fotograma se convierte a índices con la tabla de la paleta y solo se escribe el
+    rectángulo que cambia respecto al anterior; dentro de él los píxeles iguales usan el
+    índice transparente, lo que deja series largas que LZW comprime muy bien.
+    """
+    duracion = int(1000 / fps)
+    anterior = None
+    with open(nombre_salida, "wb") as archivo:
+        for fotograma in fotogramas:
+            fotograma = np.asarray(fotograma, dtype=np.uint8)[..., :3]
+            if anterior is None:
+                archivo.write(paleta.cabecera_gif(fotograma.shape[1], fotograma.shape[0]))
+                x0, y0, x1, y1 = 0, 0, fotograma.shape[1], fotograma.shape[0]
+                iguales = None
+            else:
+                # Canal a canal: np.all(..., axis=-1) sobre un eje de 3 es varias veces más lento
+                iguales = ((fotograma[..., 0] == anterior[..., 0]) & (fotograma[..., 1] == anterior[..., 1])
+                           & (fotograma[..., 2] == anterior[..., 2]))
+                filas = np.flatnonzero(~iguales.all(axis=1))
+                if filas.size:
+                    columnas = np.flatnonzero(~iguales.all(axis=0))
+                    x0, y0, x1, y1 = columnas[0], filas[0], columnas[-1] + 1, filas[-1] + 1
+                else:
+                    # Un fotograma repetido se escribe como un píxel transparente
+                    x0, y0, x1, y1 = 0, 0, 1, 1
+
+            indices = paleta.indices(fotograma[y0:y1, x0:x1])
+            if iguales is not None:
+                indices[iguales[y0:y1, x0:x1]] = INDICE_TRANSPARENTE
+            imagen = Image.frombytes("P", (int(x1 - x0), int(y1 - y0)), np.ascontiguousarray(indices).tobytes())
+            for bloque in GifImagePlugin.getdata(imagen, offset=(int(x0), int(y0)), duration=duracion,
+                                                 transparency=INDICE_TRANSPARENTE, disposal=1):
+                archivo.write(bloque)
+            anterior = fotograma.copy()
+        archivo.write(b";")
+    if anterior is None:
+        raise ValueError("No hay fotogramas que guardar")
+
+def guardar_mp4(fotogramas, nombre_salida, fps=FPS_MP4):
+    """
+    Envía una secuencia de arrays uint8 (alto, ancho, 3) a ffmpeg por la entrada estándar.
+
+    Raises:
+        FileNotFoundError: si ffmpeg no está instalado
+        RuntimeError: si ffmpeg termina con error
+    """
+    fotogramas = iter(fotogramas)
+    primero = np.ascontiguousarray(next(fotogramas), dtype=np.uint8)
+    alto, ancho = primero.shape[:2]
+    comando = ["ffmpeg", "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-vcodec", "rawvideo", "-s", f"{ancho}x{alto}", "-pix_fmt", "rgb24",
+               "-r", str(fps), "-i", "-",
+               "-vcodec", "h264", "-pix_fmt", "yuv420p", nombre_salida]
+    proceso = subprocess.Popen(comando, stdin=subprocess.PIPE)
+    try:
+        proceso.stdin.write(primero.tobytes())
+        for fotograma in fotogramas:
+            proceso.stdin.write(np.ascontiguousarray(fotograma, dtype=np.uint8).tobytes())
+    finally:
+        proceso.stdin.close()
+        codigo = proceso.wait()
+    if codigo != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {codigo}")
+
+def codificar_en_segundo_plano(escribir, fotogramas, anticipacion):
+    """
+    Llama a escribir(fotogramas) en un hilo aparte mientras este hilo sigue produciendo
+    fotogramas, con una cola de como mucho `anticipacion` fotogramas entre ambos.
+    Las excepciones del codificador se relanzan aquí.
+    """
+    cola = queue.Queue(maxsize=anticipacion)
+    fin = object()
+    errores = []
+
+    def consumir():
+        while (fotograma := cola.get()) is not fin:
+            yield fotograma
+
+    def codificar():
+        try:
+            escribir(consumir())
+        except BaseException as error:
+            errores.append(error)
+            # Vaciar la cola para no dejar bloqueado al productor
+            while cola.get() is not fin:
+                pass
+
+    hilo = threading.Thread(target=codificar, name="codificador-video", daemon=True)
+    hilo.start()
+    try:
+        for fotograma in fotogramas:
+            if errores:
+                break
+            cola.put(fotograma)
+    finally:
+        cola.put(fin)
+        hilo.join()
+    if errores:
+        raise errores[0]
+
+def guardar_video(fotogramas, nombre_salida, fps=None, anticipacion=0, paleta=None):
+    """
+    Guarda los fotogramas según la extensión de nombre_salida (.gif o .mp4). Si se da
+    una PaletaGif, los GIF se codifican con ella en vez de cuantizar cada fotograma.
+
+    Con anticipacion > 0 el codificador trabaja en otro hilo y el productor de
+    fotogramas puede adelantarse como mucho ese número de fotogramas.
+    """
+    if nombre_salida.endswith(".mp4"):
+        def escribir(fotogramas):
+            guardar_mp4(fotogramas, nombre_salida, fps or FPS_MP4)
+    elif nombre_salida.endswith(".gif"):
+        def escribir(fotogramas):
+            if paleta is None:
+                guardar_gif(fotogramas, nombre_salida, fps or FPS_GIF)
+            else:
+                guardar_gif_paleta(fotogramas, nombre_salida, paleta, fps or FPS_GIF)
+    else:
+        raise ValueError("El archivo debe terminar en .mp4 o .gif")
+
+    if anticipacion > 0:
+        codificar_en_segundo_plano(escribir, fotogramas, anticipacion)
+    else:
+        escribir(fotogramas)
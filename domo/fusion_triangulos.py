@@ -1,5 +1,8 @@
+import numpy as np
+
 from domo.utils import *
 from domo.triangulos_base import *
+from domo.indice_espacial import *
 
 def renombrar_puntos(puntos, cara):
     """
@@ -50,99 +53,69 @@ generar_triangulo_base = [generar_triangulo_base_alternado,
                           generar_triangulo_base_punto_medio,
                           generar_triangulo_base_triacon]
 
-def obtener_fila_izquierda_alternado(frecuencia, lado):
-    """
-    Genera una fila para el lado izquierdo en un patrón alternado.
-
-    Cada elemento tiene el formato: "lado_i_(frecuencia-i)",
-    recorriendo i desde 0 hasta frecuencia-1.
-
-    Ejemplo para frecuencia=3, lado='A':
-    -> ['A_0_3', 'A_1_2', 'A_2_1']
-    """
-    return [str(lado) + "_" + str(i) + "_" + str(frecuencia - i) for i in range(frecuencia)]
-
-def obtener_fila_derecha_alternado(frecuencia, lado):
-    """
-    Genera una fila para el lado derecho en un patrón alternado.
-
-    Cada elemento tiene el formato: "lado_i_0",
-    donde i recorre de 0 a frecuencia-1.
-
-    Ejemplo para frecuencia=3, lado='A':
-    -> ['A_0_0', 'A_1_0', 'A_2_0']
-    """
-    return [str(lado) + "_" + str(i) + "_0" for i in range(frecuencia)]
-
-def obtener_fila_izquierda_punto_medio(frecuencia, lado):
-    """
-    Genera una fila para el lado izquierdo con un único punto medio.
-
-    Devuelve una lista con un solo elemento: "lado_1".
+generar_malla_triangulo_base = [generar_malla_triangulo_alternado,
+                                generar_malla_triangulo_punto_medio,
+                                generar_malla_triangulo_triacon]
 
-    Ejemplo para lado='A':
-    -> ['A_1']
+def calcular_entrantes(aristas):
     """
-    return [str(lado) + "_1"]
-
-def obtener_fila_derecha_punto_medio(frecuencia, lado):
-    """
-    Genera una fila para el lado derecho con un único punto medio.
-
-    Devuelve una lista con un solo elemento: "lado_0".
-
-    Ejemplo para lado='A':
-    -> ['A_0']
-    """
-    return [str(lado) + "_0"]
-
-def obtener_fila_izquierda_triacon(frecuencia, lado):
-    """
-    Genera una fila para el lado izquierdo en un patrón tipo triacontaedro.
-
-    Comienza con "lado_1" seguido de "lado_1_i" donde i recorre de 0 a (2^(frecuencia - 1) - 1).
-
-    Ejemplo para frecuencia=2, lado='A':
-    -> ['A_1', 'A_1_0', 'A_1_1', 'A_1_2', 'A_1_3']
+    Calcula para cada punto qué puntos lo tienen en su lista de vecinos. Las listas de
+    aristas no tienen por qué ser simétricas, así que no basta con los propios vecinos.
+    
+    Args:
+        aristas: Diccionario {id: [ids adyacentes]}
+        
+    Returns:
+        Diccionario {id: set de ids cuya lista contiene a id}
     """
-    return [str(lado) + "_1"] + [str(lado) + "_1_" + str(i) for i in range(2**(frecuencia-1)-1)]
+    entrantes = {}
+    for id, vecinos in aristas.items():
+        for vecino in vecinos:
+            entrantes.setdefault(vecino, set()).add(id)
+    return entrantes
 
-def obtener_fila_derecha_triacon(frecuencia, lado):
+def fusionar_par_puntos(puntos, vertices, aristas, id_derecha, id_izquierda, entrantes=None):
     """
-    Genera una fila para el lado derecho en un patrón tipo triacontaedro.
-
-    Comienza con "lado_0" seguido de "lado_2_i" donde i recorre de (2^(frecuencia - 1) - 2) a 0.
-
-    Ejemplo para frecuencia=2, lado='A':
-    -> ['A_0', 'A_2_2', 'A_2_1', 'A_2_0']
+    Fusiona el punto id_izquierda en id_derecha: id_derecha hereda sus vecinos, sus
+    vecinos pasan a apuntar a id_derecha e id_izquierda desaparece de puntos, vértices
+    y de todas las listas de vecinos.
+    
+    Solo se recorren los vecinos de los dos puntos y los puntos que apuntan a
+    id_izquierda, que se leen de entrantes. Para varias fusiones seguidas conviene
+    calcular entrantes una vez con calcular_entrantes y pasarlo en cada llamada, que lo
+    mantiene al día; si no se pasa, se calcula recorriendo todas las aristas.
+    
+    Args:
+        puntos: Diccionario {id: (x, y)}
+        vertices: Lista de ids de los vértices del polígono
+        aristas: Diccionario {id: [ids adyacentes]}
+        id_derecha: Id del punto que sobrevive
+        id_izquierda: Id del punto que desaparece
+        entrantes: Diccionario opcional de calcular_entrantes sobre aristas
+        
+    Returns:
+        Tupla (puntos, vertices, aristas) actualizada
     """
-    return [str(lado) + "_0"] + [str(lado) + "_2_" + str(i) for i in range(2**(frecuencia-1)-2, -1, -1)]
-
-generar_fila_derecha = [obtener_fila_derecha_alternado,
-                        obtener_fila_derecha_punto_medio,
-                        obtener_fila_derecha_triacon]
+    if entrantes is None:
+        entrantes = calcular_entrantes(aristas)
 
-generar_fila_izquierda = [obtener_fila_izquierda_alternado,
-                          obtener_fila_izquierda_punto_medio,
-                          obtener_fila_izquierda_triacon]
+    def reemplazar_lista(id, nueva):
+        # Cambia la lista de id manteniendo entrantes al día
+        for vecino in set(aristas[id]).difference(nueva):
+            entrantes[vecino].discard(id)
+        for vecino in nueva:
+            entrantes.setdefault(vecino, set()).add(id)
+        aristas[id] = nueva
 
-def fusionar_par_puntos(puntos, vertices, aristas, id_derecha, id_izquierda):
-    """    
-    print("puntos: " + str(puntos))
-    print("vertices: " + str(vertices))
-    print("aristas: " + str(aristas))
-    print("id_derecha: " + str(id_derecha))
-    print("id_izquierda: " + str(id_izquierda))
-    """
-    aristas[id_derecha] += aristas[id_izquierda]
-    aristas[id_derecha] = list(set(aristas[id_derecha]))
+    vecinos_izquierda = aristas[id_izquierda]
+    reemplazar_lista(id_derecha, list(dict.fromkeys(aristas[id_derecha] + vecinos_izquierda)))
 
     # Conectar todas esas aristas al punto de la derecha
-    for k in aristas[id_izquierda]:
-        aristas[k].append(id_derecha)
-        aristas[k] = list(set(aristas[k]))
+    for k in vecinos_izquierda:
+        reemplazar_lista(k, list(dict.fromkeys(aristas[k] + [id_derecha])))
 
     # Eliminar la conexión de las aristas al punto de la izquierda
+    reemplazar_lista(id_izquierda, [])
     del aristas[id_izquierda]
 
     # Eliminar de los vértices del polígono al punto de la izquierda
@@ -153,41 +126,47 @@ def fusionar_par_puntos(puntos, vertices, aristas, id_derecha, id_izquierda):
     del puntos[id_izquierda]
     
     # Eliminar cualquier posible conexión de un nodo al punto de la izquierda
-    for k in aristas.keys():
+    for k in list(entrantes.pop(id_izquierda, ())):
+        aristas[k].remove(id_izquierda)
+        # Una lista con el id repetido lo sigue teniendo
         if id_izquierda in aristas[k]:
-            aristas[k].remove(id_izquierda)
+            entrantes.setdefault(id_izquierda, set()).add(k)
     
     return puntos, vertices, aristas
 
 def fusionar_triangulos_base(frecuencia, lados, tipo):
     """
     Genera una estructura geométrica formada por la unión de múltiples triángulos base,
-    organizados en un polígono de N lados.
+    organizados en un polígono de N lados. construir_plantilla_poligono da la misma
+    triangulación con arrays, sin diccionarios intermedios.
     
     Args:
         frecuencia: Determina la densidad de puntos en cada triángulo base
         lados: Número de lados del polígono (número de triángulos base a fusionar)
         
     Returns:
-        Tupla con tres elementos:
+        Tupla con cinco elementos:
         - puntos: Diccionario de puntos con sus coordenadas
         - vertices: Lista de identificadores de los vértices principales
         - aristas: Diccionario que define las conexiones entre puntos
+        - vertices_aristas: Diccionario {(a, b): [ids]} con los puntos de cada lado del polígono
+        - caras: Lista de triángulos, cada uno como lista de 3 ids
     """
     # Genera la triangulación del polígono de N lados
     subcaras_base = generar_triangulacion_poligono(lados)
     
     # Genera el triángulo base con la frecuencia indicada
-    puntos_base, vertices_base, aristas_base, vertices_aristas = generar_triangulo_base[tipo](frecuencia)
+    puntos_base, vertices_base, aristas_base, vertices_aristas, caras_base = generar_triangulo_base[tipo](frecuencia)
     
     # Si solo se pide un triángulo, devuelve directamente el triángulo base
     if lados == 3:
-        return puntos_base, vertices_base, aristas_base, vertices_aristas
+        return puntos_base, vertices_base, aristas_base, vertices_aristas, caras_base
 
     # Transformar y renombrar elementos por caras
     puntos = {}
     vertices = []
     aristas = {}
+    caras = []
     nuevo_vertices_aristas = {}
     for i in range(len(subcaras_base)):
         # Transformar los puntos del triángulo base según las coordenadas baricéntricas
@@ -200,11 +179,12 @@ def fusionar_triangulos_base(frecuencia, lados, tipo):
         
         # Renombrar puntos, vértices y aristas con el prefijo de la cara actual
         subpuntos_base = renombrar_puntos(subpuntos_base, i)
-        puntos = puntos | subpuntos_base
+        puntos.update(subpuntos_base)
         subvertices_base = renombrar_vertices(vertices_base, i)
         vertices += subvertices_base
         subaristas_base = renombrar_aristas(aristas_base, i)
-        aristas = aristas | subaristas_base
+        aristas.update(subaristas_base)
+        caras += [renombrar_vertices(cara, i) for cara in caras_base]
         
         nuevo_vertices_aristas[(i, (i + 1) % lados)] =  [str(i) + "_" + id for id in vertices_aristas[(0,1)]]
 
@@ -213,38 +193,132 @@ def fusionar_triangulos_base(frecuencia, lados, tipo):
 
     vertices_aristas = nuevo_vertices_aristas
 
-    # Conectar todos los puntos a un solo punto central
-    tipos_id_punto_central = ["0_" + str(frecuencia) + "_0", "0_2", "0_2"]
-    id_punto_central = tipos_id_punto_central[tipo]
+    # Ids que desaparecen al fusionar y el id que los sustituye, para renombrar las caras
+    renombrados = {}
+    # Quién apunta a cada punto, para que cada fusión solo toque los vecinos
+    entrantes = calcular_entrantes(aristas)
+
+    # Los puntos que coinciden en el plano se fusionan en uno: el centro, común a todos
+    # los triángulos, y los de cada costura, compartidos por dos triángulos consecutivos
+    for grupo in agrupar_coincidentes(puntos.items()):
+        if len(grupo) == 1:
+            continue
+        if len(grupo) == lados:
+            # Sobrevive el centro del primer triángulo, que deja de ser vértice del polígono
+            id_derecha = grupo[0]
+            vertices.remove(id_derecha)
+        elif len(grupo) == 2:
+            # En la costura entre los triángulos i-1 e i sobrevive el punto del triángulo i
+            # (el triángulo 0 en la costura con el último)
+            cara_a, cara_b = (int(id.split("_", 1)[0]) for id in grupo)
+            id_derecha = grupo[1] if cara_b == (cara_a + 1) % lados else grupo[0]
+        else:
+            raise ValueError(f"{len(grupo)} puntos coinciden en {grupo[0]}, solo pueden coincidir 2 o {lados}")
+
+        # Traspasar todas las posibles aristas de cada punto al punto que sobrevive
+        for id_izquierda in grupo:
+            if id_izquierda != id_derecha:
+                puntos, vertices, aristas = fusionar_par_puntos(puntos, vertices, aristas, id_derecha, id_izquierda, entrantes)
+                renombrados[id_izquierda] = id_derecha
+
+    caras = [[renombrados.get(id, id) for id in cara] for cara in caras]
+    
+    return puntos, vertices, aristas, vertices_aristas, caras
 
+def construir_plantilla_poligono(frecuencia, lados, tipo):
+    """
+    Versión con arrays de fusionar_triangulos_base: mismos ids, puntos, vértices, lados
+    y caras, sin diccionarios intermedios.
 
-    # Eliminar de los vértices del polígono al punto central
-    vertices.remove(id_punto_central)
-    for i in range(1, lados):
+    Los puntos del triángulo base se pasan a coordenadas baricéntricas una sola vez y
+    los lados triángulos del abanico salen de un único producto (lados, P, 3) @ (lados, 3, 2).
+    Las fusiones del centro y de las costuras se calculan una vez sobre los lados del
+    triángulo base y se aplican como una reasignación de índices.
 
-        # Traspasar todas las posibles aristas del siguiente punto al punto central
-        tipos_id_siguiente_punto_central = [str(i) + "_" + str(frecuencia) + "_0", str(i) + "_2", str(i) + "_2"]
-        sig_centro = tipos_id_siguiente_punto_central[tipo]
-        puntos, vertices, aristas = fusionar_par_puntos(puntos, vertices, aristas, id_punto_central, sig_centro)
+    Args:
+        frecuencia: Determina la densidad de puntos en cada triángulo base
+        lados: Número de lados del polígono
+        tipo: Índice del tipo de triángulo base
 
-    # Coser las aristas de un triángulo y el siguiente
-    for i in range(lados):
-        # id cara actual
-        id = i
-        # id cara anterior (vuelve a la última asi la actual es la primera)
-        id_anterior = (i - 1) % lados
+    Returns:
+        TrianguloBase del polígono
+    """
+    base = generar_malla_triangulo_base[tipo](frecuencia)
+    if lados == 3:
+        return base
+    n_base = len(base.ids)
+
+    # Coordenadas baricéntricas de los puntos respecto a los vértices del triángulo base
+    matriz_origen = np.vstack([base.coords[base.vertices].T, np.ones(3)])
+    lambdas = np.column_stack([base.coords, np.ones(n_base)]) @ np.linalg.inv(matriz_origen).T
+
+    # Cada subtriángulo es (vértice i, vértice i+1, centro) del polígono
+    subcaras = np.array(generar_triangulacion_poligono(lados), dtype=np.float64)
+    coords = (lambdas[None] @ subcaras).reshape(-1, 2)
+
+    # Índice global de cada punto antes de fusionar: cara * n_base + índice local
+    desplazamientos = np.arange(lados)[:, None] * n_base
+    destino = np.arange(lados * n_base)
+
+    # El centro (vértice 2 del triángulo base) de todas las caras se fusiona con el de la cara 0
+    centro = base.vertices[2]
+    destino[desplazamientos[1:, 0] + centro] = centro
+
+    # El lado (1, 2) de la cara i coincide con el lado (2, 0) de la cara i+1 recorrido al revés,
+    # sobrevive el punto de la cara i+1; el centro ya está fusionado
+    lado_12 = base.vertices_aristas[(1,2)][:-1]
+    lado_02 = base.vertices_aristas[(2,0)][::-1][:-1]
+    siguientes = np.roll(desplazamientos, -1, axis=0)
+    destino[(desplazamientos + lado_12).ravel()] = (siguientes + lado_02).ravel()
+
+    # Renumeración compacta de los puntos que sobreviven, en su orden
+    supervivientes = np.flatnonzero(destino == np.arange(lados * n_base))
+    nuevo_indice = np.full(lados * n_base, -1, dtype=np.int64)
+    nuevo_indice[supervivientes] = np.arange(len(supervivientes))
+    mapa = nuevo_indice[destino]
+
+    caras_ids = np.repeat(np.arange(lados), n_base)[supervivientes]
+    locales = (supervivientes % n_base).tolist()
+    ids = [f"{cara}_{base.ids[local]}" for cara, local in zip(caras_ids.tolist(), locales)]
+
+    # Los vértices del polígono son los vértices 0 de cada cara: el 1 se fusiona con el 0
+    # de la cara siguiente y el 2 es el centro
+    vertices = mapa[desplazamientos[:, 0] + base.vertices[0]]
+    aristas = mapa[(desplazamientos[:, :, None] + base.aristas).reshape(-1, 2)]
+    caras = mapa[(desplazamientos[:, :, None] + base.caras).reshape(-1, 3)]
+
+    # El lado (i, i+1) del polígono es el lado (0, 1) de la cara i
+    lado_01 = base.vertices_aristas[(0,1)]
+    vertices_aristas = {(i, (i + 1) % lados): mapa[desplazamientos[i, 0] + lado_01] for i in range(lados)}
+
+    return TrianguloBase(ids, coords[supervivientes], vertices, aristas, vertices_aristas, caras)
+
+def indexar_triangulacion(puntos, vertices, aristas, vertices_aristas, caras):
+    """
+    Pasa una triangulación con ids de texto a índices enteros locales, en el orden de puntos.
+    
+    Args:
+        puntos: Diccionario {id: (x, y)} de la triangulación
+        vertices: Lista de ids de los vértices del polígono
+        aristas: Diccionario {id: [ids adyacentes]}
+        vertices_aristas: Diccionario {(a, b): [ids]} con los puntos de cada lado del polígono
+        caras: Lista de triángulos como listas de 3 ids
+        
+    Returns:
+        Tupla con cinco elementos:
+        - ids: Lista de ids, la posición de cada id es su índice local
+        - indices_vertices: Array (lados,) con el índice de cada vértice del polígono
+        - pares: Array int32 (E, 2) con las aristas como pares de índices
+        - indices_vertices_aristas: Diccionario {(a, b): array de índices}
+        - indices_caras: Array int32 (F, 3) con los triángulos
+    """
+    ids = list(puntos.keys())
+    id_a_indice = {id: i for i, id in enumerate(ids)}
 
-        # Obtener las dos listas de ids a fusionar, la izquierda desaparece y la derecha le sustituye
-        ids_nodos_izquierda = generar_fila_izquierda[tipo](frecuencia, id_anterior)
-        ids_nodos_derecha = generar_fila_derecha[tipo](frecuencia, id)
+    indices_vertices = np.array([id_a_indice[id] for id in vertices], dtype=np.int32)
+    pares = np.array([(id_a_indice[id], id_a_indice[vecino]) for id in aristas for vecino in aristas[id]], dtype=np.int32).reshape(-1, 2)
+    indices_vertices_aristas = {lado: np.array([id_a_indice[id] for id in vertices_aristas[lado]], dtype=np.int32) for lado in vertices_aristas}
 
-        # Por cada unión entre triangulos
-        for j in range(len(ids_nodos_derecha)):
+    indices_caras = np.array([[id_a_indice[id] for id in cara] for cara in caras], dtype=np.int32).reshape(-1, 3)
 
-            # Traspasar todas las posibles aristas del punto al punto equivalente de la derecha
-            id_izquierda = ids_nodos_izquierda[j]
-            id_derecha = ids_nodos_derecha[j]
-            # j == len(ids_nodos_derecha)-1
-            puntos, vertices, aristas = fusionar_par_puntos(puntos, vertices, aristas, id_derecha, id_izquierda)
-    
-    return puntos, vertices, aristas, vertices_aristas
\ No newline at end of file
+    return ids, indices_vertices, pares, indices_vertices_aristas, indices_caras
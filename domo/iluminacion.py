@@ -0,0 +1,119 @@
+import numpy as np
+
+def color_a_rgb(color):
+    """
+    Convierte un color en un array RGB normalizado (3,). Los "#RRGGBB" se leen
+    directamente; cualquier otro formato (nombres, "C0", ...) se delega en matplotlib,
+    que solo se importa en ese caso.
+    """
+    if isinstance(color, str) and len(color) == 7 and color.startswith("#"):
+        return np.array([int(color[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float64) / 255
+    import matplotlib.colors as mcolors
+    return np.array(mcolors.to_rgb(color))
+
+def normales_y_centroides(vertices_caras):
+    """
+    Calcula a la vez la normal unitaria y el centroide de todos los triángulos.
+
+    Args:
+        vertices_caras: Array (..., F, 3, 3) con los 3 vértices de cada triángulo
+
+    Returns:
+        Tupla (normales, centroides) de arrays (..., F, 3)
+    """
+    v1, v2, v3 = vertices_caras[..., 0, :], vertices_caras[..., 1, :], vertices_caras[..., 2, :]
+    normales = np.cross(v2 - v1, v3 - v1)
+    normales /= np.linalg.norm(normales, axis=-1, keepdims=True)
+    centroides = vertices_caras.mean(axis=-2)
+    return normales, centroides
+
+def normales_y_centroides_cuadrilateros(vertices_caras, tolerancia=1e-8):
+    """
+    Normal y centroide de caras de 4 vértices, promediando las normales de los
+    triángulos (v0, v1, v2) y (v0, v2, v3) cuando no coinciden.
+
+    Args:
+        vertices_caras: Array (F, 4, 3) con los vértices de cada cara
+        tolerancia: Norma mínima para considerar una normal válida
+
+    Returns:
+        Tupla (normales, centroides, validas): arrays (F, 3) y máscara (F,) que marca
+        las caras no degeneradas, las únicas que se iluminan
+    """
+    v0, v1, v2, v3 = (vertices_caras[:, i, :] for i in range(4))
+    normales_1 = np.cross(v1 - v0, v2 - v0)
+    normales_2 = np.cross(v2 - v0, v3 - v0)
+    normas_1 = np.linalg.norm(normales_1, axis=1)
+    normas_2 = np.linalg.norm(normales_2, axis=1)
+    validas = (normas_1 >= tolerancia) & (normas_2 >= tolerancia)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normales_1 /= normas_1[:, None]
+        normales_2 /= normas_2[:, None]
+
+        # Promedio si las normales no son casi iguales
+        iguales = np.linalg.norm(normales_1 - normales_2, axis=1) < 1e-6
+        normales = np.where(iguales[:, None], normales_1, normales_1 + normales_2)
+        normas = np.linalg.norm(normales, axis=1)
+        validas &= normas >= tolerancia
+        normales /= normas[:, None]
+
+    centroides = vertices_caras.mean(axis=1)
+    return normales, centroides, validas
+
+def iluminar_caras(normales, centroides, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+    """
+    Color iluminado de cada cara a partir de su normal y su centroide.
+
+    La intensidad es el coseno entre la normal (orientada hacia la luz) y la dirección a
+    la fuente, atenuado según la distancia normalizada entre la cara más cercana y la más
+    lejana de cada fotograma.
+
+    Args:
+        normales: Array (..., F, 3) de normales unitarias
+        centroides: Array (..., F, 3) de centroides
+        fuente_luz: Posición (3,) de la fuente de luz, o (..., 1, 3) con una posición por fotograma
+        color_base_rgb: Color base RGB normalizado (3,)
+        min_intensidad: Intensidad mínima
+        factor_distancia: Ponderador para cuánto afecta la distancia al brillo
+
+    Returns:
+        Array (..., F, 3) de colores RGB
+    """
+    vectores_luz = np.asarray(fuente_luz, dtype=np.float64) - centroides
+    distancias = np.linalg.norm(vectores_luz, axis=-1)
+
+    # Dar la vuelta a las normales que miran en sentido contrario a la luz equivale al valor absoluto
+    intensidades = np.abs(np.einsum('...i,...i->...', normales, vectores_luz)) / distancias
+    np.clip(intensidades, min_intensidad, 1.0, out=intensidades)
+
+    # Normalizar distancias para ajustar brillo, cara a cara dentro de cada fotograma
+    d_min = distancias.min(axis=-1, keepdims=True)
+    d_max = distancias.max(axis=-1, keepdims=True)
+    d_norm = (distancias - d_min) / (d_max - d_min + 1e-8)  # evitar división por cero
+
+    intensidades *= 1.0 - factor_distancia * d_norm
+    np.clip(intensidades, min_intensidad, 1.0, out=intensidades)
+    return intensidades[..., None] * np.asarray(color_base_rgb, dtype=np.float64)
+
+def iluminar_caras_rotacion_rigida(normales, centroides, matrices, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+    """
+    Colores de las caras en cada fotograma de una rotación rígida sin recalcular geometría.
+
+    Una rotación conserva ángulos y distancias, así que iluminar la cara rotada con la luz
+    fija es lo mismo que iluminar la cara original con la luz rotada en sentido inverso.
+    Las normales y centroides se calculan una sola vez y por fotograma solo se rota la
+    posición de la luz.
+
+    Args:
+        normales: Array (F, 3) de normales unitarias de la malla sin rotar
+        centroides: Array (F, 3) de centroides de la malla sin rotar
+        matrices: Array (T, 3, 3) con la matriz de rotación de cada fotograma
+        fuente_luz: Posición (3,) fija de la fuente de luz
+
+    Returns:
+        Array (T, F, 3) de colores RGB
+    """
+    # R^T · luz para cada fotograma
+    luces = np.einsum('tji,j->ti', np.asarray(matrices, dtype=np.float64), np.asarray(fuente_luz, dtype=np.float64))
+    return iluminar_caras(normales, centroides, luces[:, None, :], color_base_rgb, min_intensidad, factor_distancia)
@@ -0,0 +1,141 @@
+"""
+Índice espacial de rejilla para puntos 2D y 3D.
+
+Los puntos se guardan en un diccionario cuya clave es la celda de la rejilla que los
+contiene, de modo que buscar si un punto ya existe solo mira las celdas que toca su
+bola de tolerancia, sin recorrer todos los puntos.
+"""
+import itertools
+import math
+
+class IndiceEspacial():
+    """
+    Rejilla hash sobre puntos de cualquier dimensión, cada uno con un valor asociado.
+
+    Dos puntos coinciden si su distancia es como mucho la tolerancia. Las consultas
+    devuelven los valores en el orden en que se insertaron los puntos.
+
+    El lado de la celda por defecto es el doble de la tolerancia, lo justo para que
+    buscar un punto mire como mucho 2 celdas por eje. Para consultas por caja o radio
+    conviene un lado del orden de la separación entre puntos.
+    """
+    def __init__(self, tolerancia=1e-9, lado_celda=None):
+        if tolerancia <= 0:
+            raise ValueError("La tolerancia debe ser positiva")
+        self.tolerancia = tolerancia
+        self.lado_celda = lado_celda if lado_celda is not None else 2 * tolerancia
+        if self.lado_celda < tolerancia:
+            raise ValueError("El lado de la celda no puede ser menor que la tolerancia")
+        # {celda: [(orden, punto, valor), ...]}
+        self.__celdas = {}
+        self.__n_puntos = 0
+
+    def __len__(self):
+        return self.__n_puntos
+
+    def __contains__(self, punto):
+        return self.buscar(punto) is not None
+
+    def __celda(self, punto):
+        return tuple(math.floor(c / self.lado_celda) for c in punto)
+
+    def __celdas_en_caja(self, minimo, maximo):
+        """
+        Itera las entradas de las celdas que cortan la caja [minimo, maximo]. Si la caja
+        abarca más celdas que las ocupadas, recorre las ocupadas.
+        """
+        rangos = [range(math.floor(a / self.lado_celda), math.floor(b / self.lado_celda) + 1)
+                  for a, b in zip(minimo, maximo)]
+        if math.prod(len(r) for r in rangos) > len(self.__celdas):
+            for celda, entradas in self.__celdas.items():
+                if all(c in r for c, r in zip(celda, rangos)):
+                    yield from entradas
+            return
+
+        for celda in itertools.product(*rangos):
+            entradas = self.__celdas.get(celda)
+            if entradas:
+                yield from entradas
+
+    def cerca(self, punto, radio=None):
+        """
+        Devuelve los valores de los puntos a distancia menor o igual que radio.
+
+        Args:
+            punto: Coordenadas del punto
+            radio: Radio de la consulta, por defecto la tolerancia
+
+        Returns:
+            Lista de valores en orden de inserción
+        """
+        radio = self.tolerancia if radio is None else radio
+        minimo = [c - radio for c in punto]
+        maximo = [c + radio for c in punto]
+        encontrados = [(orden, valor) for orden, otro, valor in self.__celdas_en_caja(minimo, maximo)
+                       if math.dist(punto, otro) <= radio]
+        encontrados.sort(key=lambda x: x[0])
+        return [valor for _, valor in encontrados]
+
+    def en_caja(self, minimo, maximo):
+        """
+        Devuelve los valores de los puntos dentro de la caja [minimo, maximo], ampliada
+        con la tolerancia.
+
+        Returns:
+            Lista de valores en orden de inserción
+        """
+        minimo = [c - self.tolerancia for c in minimo]
+        maximo = [c + self.tolerancia for c in maximo]
+        encontrados = [(orden, valor) for orden, otro, valor in self.__celdas_en_caja(minimo, maximo)
+                       if all(a <= c <= b for a, c, b in zip(minimo, otro, maximo))]
+        encontrados.sort(key=lambda x: x[0])
+        return [valor for _, valor in encontrados]
+
+    def buscar(self, punto):
+        """
+        Devuelve el valor del primer punto insertado que coincide con punto, o None.
+        """
+        mejor = None
+        for orden, otro, valor in self.__celdas_en_caja([c - self.tolerancia for c in punto],
+                                                          [c + self.tolerancia for c in punto]):
+            if (mejor is None or orden < mejor[0]) and math.dist(punto, otro) <= self.tolerancia:
+                mejor = (orden, valor)
+        return None if mejor is None else mejor[1]
+
+    def insertar(self, punto, valor):
+        """
+        Inserta el punto si no coincide con ninguno existente. El valor no puede ser None.
+
+        Returns:
+            El valor del punto existente que coincide, o valor si se ha insertado
+        """
+        if valor is None:
+            raise ValueError("El valor de un punto no puede ser None")
+        existente = self.buscar(punto)
+        if existente is not None:
+            return existente
+        punto = tuple(float(c) for c in punto)
+        self.__celdas.setdefault(self.__celda(punto), []).append((self.__n_puntos, punto, valor))
+        self.__n_puntos += 1
+        return valor
+
+def agrupar_coincidentes(puntos, tolerancia=1e-9):
+    """
+    Agrupa los puntos que coinciden, es decir, a distancia menor o igual que la
+    tolerancia del primer punto de su grupo.
+
+    Args:
+        puntos: Iterable de pares (clave, coordenadas)
+        tolerancia: Distancia máxima entre puntos coincidentes
+
+    Returns:
+        Lista de grupos en orden de aparición, cada uno una lista de claves en orden
+    """
+    indice = IndiceEspacial(tolerancia)
+    grupos = []
+    for clave, coordenadas in puntos:
+        grupo = indice.insertar(coordenadas, [])
+        if not grupo:
+            grupos.append(grupo)
+        grupo.append(clave)
+    return grupos
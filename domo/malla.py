@@ -0,0 +1,177 @@
+import numpy as np
+
+class Malla():
+    """
+    Malla triangular compacta indexada por enteros.
+
+    Guarda la geometría en arrays contiguos de NumPy en lugar de diccionarios
+    con identificadores de texto:
+        - vertices: array (N, 3) con las coordenadas de cada punto, float64 salvo que
+          se pase ya en float32 para ahorrar memoria
+        - aristas: array int32 (E, 2) con cada arista una sola vez, (menor, mayor)
+        - caras: array int32 (F, 3) con los índices de los vértices de cada triángulo
+        - indptr, indices: adyacencia en formato CSR, los vecinos del vértice i
+          son indices[indptr[i]:indptr[i + 1]] ordenados de menor a mayor
+        - origen: array int32 (N, 2) opcional con (cara del poliedro, índice local)
+          de cada punto, usado para reconstruir los identificadores de texto
+    """
+    def __init__(self, vertices, aristas, caras, origen=None):
+        vertices = np.asarray(vertices)
+        dtype = np.float32 if vertices.dtype == np.float32 else np.float64
+        self.vertices = np.ascontiguousarray(vertices, dtype=dtype).reshape(-1, 3)
+        self.aristas = normalizar_aristas(aristas)
+        self.caras = np.ascontiguousarray(caras, dtype=np.int32).reshape(-1, 3)
+        self.origen = None if origen is None else np.ascontiguousarray(origen, dtype=np.int32).reshape(-1, 2)
+        self.__construir_adyacencia()
+
+    @classmethod
+    def desde_diccionarios(cls, puntos, aristas, caras=None, origen=None):
+        """
+        Construye una malla a partir de la representación con identificadores de texto.
+
+        Args:
+            puntos: Diccionario {id: (x, y, z)}
+            aristas: Diccionario {id: [id1, id2, ...]} con las adyacencias
+            caras: Lista de caras, cada una como lista de 3 ids. Si no se da, se
+                   toman como caras todos los triángulos del grafo
+            origen: Array opcional (N, 2) en el mismo orden que puntos
+
+        Returns:
+            Tupla (malla, ids) donde ids es la lista de identificadores en el orden
+            de los índices de la malla
+        """
+        ids = list(puntos.keys())
+        id_a_indice = {pid: i for i, pid in enumerate(ids)}
+
+        vertices = np.array([puntos[pid] for pid in ids], dtype=np.float64).reshape(-1, 3)
+        pares = [(id_a_indice[a], id_a_indice[b]) for a, vecinos in aristas.items() for b in vecinos]
+        if caras is None:
+            indices_caras = enumerar_triangulos(pares)
+        else:
+            indices_caras = [[id_a_indice[pid] for pid in cara] for cara in caras]
+
+        return cls(vertices, pares, indices_caras, origen), ids
+
+    def __construir_adyacencia(self):
+        self.indptr, self.indices = adyacencia_csr(self.aristas, len(self.vertices))
+
+    def vecinos(self, i):
+        """
+        Devuelve los índices de los vértices adyacentes a i (vista sobre el CSR).
+        """
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def grados(self):
+        """
+        Devuelve el número de vecinos de cada vértice.
+        """
+        return np.diff(self.indptr)
+
+    def enumerar_triangulos(self):
+        """
+        Devuelve todos los triángulos del grafo de aristas, para mallas sin caras.
+        """
+        return enumerar_triangulos(self.aristas)
+
+    def ids(self):
+        """
+        Genera bajo demanda los identificadores "cara_indice" de cada punto.
+        Si la malla no tiene origen se usa el propio índice.
+        """
+        if self.origen is None:
+            return [str(i) for i in range(len(self.vertices))]
+        return [f"{cara}_{local}" for cara, local in self.origen.tolist()]
+
+    def a_diccionarios(self, ids=None):
+        """
+        Convierte la malla a la representación con identificadores de texto.
+        Pensado para depuración, la malla no se guarda así.
+
+        Args:
+            ids: Lista opcional de identificadores, por defecto Malla.ids()
+
+        Returns:
+            Tupla (puntos, aristas, caras) con el formato de diccionarios original
+        """
+        if ids is None:
+            ids = self.ids()
+        puntos = {pid: tuple(coords) for pid, coords in zip(ids, self.vertices.tolist())}
+        aristas = {pid: [ids[j] for j in self.vecinos(i).tolist()] for i, pid in enumerate(ids)}
+        caras = [[ids[j] for j in cara] for cara in self.caras.tolist()]
+        return puntos, aristas, caras
+
+def normalizar_aristas(aristas):
+    """
+    Convierte una lista de pares de índices en un array int32 (E, 2) sin duplicados
+    ni autoconexiones, con cada arista ordenada como (menor, mayor).
+    """
+    aristas = np.asarray(aristas, dtype=np.int64).reshape(-1, 2)
+    aristas = np.sort(aristas, axis=1)
+    aristas = aristas[aristas[:, 0] != aristas[:, 1]]
+    if len(aristas) == 0:
+        return np.empty((0, 2), dtype=np.int32)
+    # Cada par se codifica como un entero, mucho más rápido de ordenar que las filas
+    # con np.unique(axis=0) y con el mismo orden lexicográfico
+    base = int(aristas.max()) + 1
+    claves = np.sort(aristas[:, 0] * base + aristas[:, 1])
+    claves = claves[np.concatenate([[True], claves[1:] != claves[:-1]])]
+    aristas = np.column_stack([claves // base, claves % base])
+    return np.ascontiguousarray(aristas, dtype=np.int32)
+
+def adyacencia_csr(aristas, n_vertices):
+    """
+    Construye la adyacencia CSR de un array de aristas normalizado.
+
+    Returns:
+        Tupla (indptr, indices) de arrays int32, con los vecinos de cada vértice ordenados
+    """
+    # Cada arista aparece en las dos direcciones
+    origenes = np.concatenate([aristas[:, 0], aristas[:, 1]])
+    destinos = np.concatenate([aristas[:, 1], aristas[:, 0]])
+    orden = np.lexsort((destinos, origenes))
+
+    indices = np.ascontiguousarray(destinos[orden], dtype=np.int32)
+    indptr = np.zeros(n_vertices + 1, dtype=np.int32)
+    np.cumsum(np.bincount(origenes, minlength=n_vertices), out=indptr[1:])
+    return indptr, indices
+
+def enumerar_triangulos(aristas):
+    """
+    Enumera todos los triángulos (ciclos de 3 aristas) de un grafo sin búsqueda en profundidad.
+    
+    Con las aristas ordenadas como (u, v), u < v, los vecinos mayores de cada u quedan
+    contiguos y ordenados. Para cada arista (u, v) los candidatos w son los vecinos de u
+    posteriores a v, y el triángulo existe si (v, w) también es arista, lo que se comprueba
+    a la vez para todos los candidatos con una búsqueda binaria.
+    
+    Args:
+        aristas: Pares de índices, en cualquier orden y con posibles duplicados
+        
+    Returns:
+        Array int32 (T, 3) con cada triángulo como (u, v, w), u < v < w
+    """
+    aristas = normalizar_aristas(aristas).astype(np.int64)
+    if len(aristas) == 0:
+        return np.empty((0, 3), dtype=np.int32)
+    u, v = aristas[:, 0], aristas[:, 1]
+    n_aristas = len(aristas)
+
+    # Número de vecinos de u posteriores a v para cada arista (u, v)
+    fin_grupo = np.searchsorted(u, u, side="right")
+    cuentas = fin_grupo - np.arange(1, n_aristas + 1)
+
+    # Expandir todos los candidatos (u, v, w)
+    arista_candidato = np.repeat(np.arange(n_aristas), cuentas)
+    inicio_candidatos = np.cumsum(cuentas) - cuentas
+    desplazamiento = np.arange(len(arista_candidato)) - np.repeat(inicio_candidatos, cuentas)
+    w = v[arista_candidato + 1 + desplazamiento]
+    v_candidato = v[arista_candidato]
+
+    # Comprobar que (v, w) es arista comparando claves codificadas y ordenadas
+    n = int(v.max()) + 1
+    claves = u * n + v
+    buscadas = v_candidato * n + w
+    posiciones = np.minimum(np.searchsorted(claves, buscadas), n_aristas - 1)
+    existe = claves[posiciones] == buscadas
+
+    return np.ascontiguousarray(np.column_stack([u[arista_candidato], v_candidato, w])[existe], dtype=np.int32)
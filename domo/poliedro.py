@@ -1,46 +1,75 @@
 import numpy as np
-from scipy.spatial import distance
-from skspatial.objects import Points
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from scipy.spatial import cKDTree
 
 from domo.generacion_vertices_poliedro import *
+from domo.utils import *
+from domo.malla import *
+from domo.tabla_poliedros import *
+
+def encontrar_aristas(vertices, factor=1.1):
+    """
+    Conecta los vértices que están a distancia menor o igual que factor * la distancia
+    mínima no nula entre vértices, usando un árbol KD en lugar de la matriz densa n x n.
+    
+    Args:
+        vertices: Lista o array (n, 3) de coordenadas
+        factor: Margen sobre la distancia mínima para considerar dos vértices adyacentes
+        
+    Returns:
+        Array int32 (E, 2) con cada arista una vez como (i, j), i < j, en orden lexicográfico
+    """
+    puntos = np.asarray(vertices, dtype=np.float64)
+    arbol = cKDTree(puntos)
+
+    # Distancia mínima no nula: k=3 pide el propio punto y sus dos vecinos más cercanos.
+    # El segundo vecino hace falta si el primero coincide con el punto (distancia 0)
+    k = min(len(puntos), 3)
+    distancias, _ = arbol.query(puntos, k=k)
+    distancias = distancias[:, 1:]
+    min_dist = np.min(distancias[distancias > 0])
+
+    pares = arbol.query_pairs(min_dist * factor, output_type="ndarray")
+    return normalizar_aristas(pares)
 
 # Definición de la clase Poliedro
 class Poliedro():
     
     # Constructor: inicializa el poliedro con una semilla
-    def __init__(self, semilla):
+    def __init__(self, semilla, usar_tabla=True):
         self.semilla = semilla  # Nombre o tipo del poliedro (ej: "cubo romo")
+        self.tolerancia = 1e-5  # Tolerancia para considerar coplanaridad
+        topologia = obtener_topologia(semilla) if usar_tabla else None
+        if topologia is not None:
+            # Semilla precalculada: vértices, aristas y caras se leen de la tabla
+            self.__cargar_topologia(topologia)
+            return
         self.vertices = generar_vertices(semilla)  # Genera los vértices basados en la semilla
         self.__encontrar_aristas()  # Encuentra las aristas conectando vértices cercanos
-        self.tolerancia = 1e-5  # Tolerancia para considerar coplanaridad
         self.longitud_ciclos = forma_caras[semilla]  # Tamaños esperados de las caras (ej: 3, 4, 5 lados)
         self.__encontrar_ciclos()  # Encuentra todas las caras posibles
 
+    # Método privado para reconstruir el poliedro desde la tabla precalculada
+    def __cargar_topologia(self, topologia):
+        self.vertices = [tuple(v) for v in topologia["vertices"]]
+        self.__construir_aristas(np.array(topologia["aristas"], dtype=np.int32).reshape(-1, 2))
+        self.longitud_ciclos = list(topologia["longitud_ciclos"])
+        self.caras = [list(cara) for cara in topologia["caras"]]
+
     # Método privado para encontrar las aristas del poliedro
     def __encontrar_aristas(self):
         """
         Calcula un grafo de conexiones entre los vértices basado en la distancia mínima.
         """
-        n = len(self.vertices)  # Número de vértices
-        dist_matrix = np.zeros((n, n))  # Inicializa matriz de distancias
-
-        # Calcula las distancias euclidianas entre todos los pares de vértices
-        for i in range(n):
-            for j in range(i+1, n):
-                dist = distance.euclidean(self.vertices[i], self.vertices[j])
-                dist_matrix[i][j] = dist
-                dist_matrix[j][i] = dist
-        
-        # Encuentra la distancia mínima no nula (la distancia entre vértices adyacentes)
-        min_dist = np.min(dist_matrix[dist_matrix > 0])
-        
-        # Crea el grafo: conecta vértices si están a distancia cercana al mínimo
-        self.aristas = {}
-        for i in range(n):
-            conectados = [j for j in range(n) if i != j and dist_matrix[i][j] <= min_dist * 1.1]
-            self.aristas[i] = conectados
+        self.__construir_aristas(encontrar_aristas(self.vertices))
+
+    # Método privado para guardar las aristas como array y como listas de vecinos
+    def __construir_aristas(self, aristas_array):
+        self.aristas_array = aristas_array
+
+        # Lista de vecinos de cada vértice, en orden creciente como en la matriz densa
+        indptr, indices = adyacencia_csr(self.aristas_array, len(self.vertices))
+        indices = indices.tolist()
+        self.aristas = {i: indices[indptr[i]:indptr[i + 1]] for i in range(len(self.vertices))}
 
     # Método privado para realizar una búsqueda en profundidad buscando ciclos de una longitud específica
     def __busqueda_en_profundidad(self, camino, inicio, profundidad):
@@ -58,120 +87,54 @@ class Poliedro():
                 # Solo avanza si no ha visitado el vecino o si puede cerrar el ciclo
                 self.__busqueda_en_profundidad(camino + [vecino], inicio, profundidad - 1)
 
-    # Método privado para limpiar ciclos duplicados y no coplanarios
+    # Método privado para descartar los ciclos no coplanarios
     def __limpiar_ciclos(self):
-        ciclos_limpios = []
-        for ciclo_1 in range(len(self.ciclos)):
-            iguales = False
-            for ciclo_2 in range(ciclo_1 + 1, len(self.ciclos)):
-                # Compara si dos ciclos tienen los mismos vértices (sin importar el orden)
-                if set(self.ciclos[ciclo_1]) == set(self.ciclos[ciclo_2]):
-                    iguales = True
-                    break
-            if not iguales:
-                ciclos_limpios.append(self.ciclos[ciclo_1])
-
-        self.ciclos = ciclos_limpios  # Mantiene solo un ciclo único por conjunto de vértices
-
-        # Filtra también los ciclos que no sean coplanarios
-        ciclos_limpios = []
-        for ciclo in self.ciclos:
-            puntos = Points(np.array([self.vertices[pid] for pid in ciclo]))
-            if puntos.are_coplanar(tol=self.tolerancia):
-                ciclos_limpios.append(ciclo)
-        self.ciclos = ciclos_limpios
+        if not self.ciclos:
+            return
+        # Todos los ciclos tienen la misma longitud: se apilan en un array (K, L, 3)
+        # y se comprueban con una única SVD por lotes
+        puntos = np.asarray(self.vertices, dtype=np.float64)[np.array(self.ciclos)]
+        coplanarios = son_coplanarios(puntos, self.tolerancia).tolist()
+        self.ciclos = [ciclo for ciclo, coplanario in zip(self.ciclos, coplanarios) if coplanario]
 
     # Método privado para insertar los nuevos ciclos encontrados en la lista de caras
     def __insertar_ciclos(self, profundidad):
-        # Usa conjuntos para evitar duplicar caras
-        conjuntos_destino = [set(lista) for lista in self.caras[profundidad]]
-        
-        for lista_nueva in self.ciclos:
-            conjunto_nuevo = set(lista_nueva)
-            if not any(conjunto_nuevo == conjunto_existente for conjunto_existente in conjuntos_destino):
-                self.caras[profundidad].append(lista_nueva)
-                conjuntos_destino.append(conjunto_nuevo)
+        # Usa las claves de las caras ya insertadas para evitar duplicarlas
+        self.caras[profundidad] += deduplicar_ciclos(self.ciclos, vistos=self.claves_caras[profundidad])
 
     # Método privado para encontrar todas las caras del poliedro
     def __encontrar_ciclos(self):
         # Inicializa el diccionario de caras separadas por su longitud
         self.caras = {l: [] for l in self.longitud_ciclos}
+        self.claves_caras = {l: set() for l in self.longitud_ciclos}
 
         # Para cada posible longitud de cara
         for i in self.longitud_ciclos:
+            candidatos = []
             for nodo in self.aristas:
                 self.ciclos = []
                 # Busca ciclos partiendo de cada nodo
                 self.__busqueda_en_profundidad([nodo], nodo, i)
-                # Limpia los ciclos encontrados
-                self.__limpiar_ciclos()
-                # Inserta los ciclos válidos
-                self.__insertar_ciclos(i)
+                # Mantiene solo un ciclo por conjunto de vértices (sin importar el orden)
+                candidatos += deduplicar_ciclos(self.ciclos, conservar_ultimo=True)
+            # Descarta a la vez los ciclos no coplanarios de todos los nodos
+            self.ciclos = candidatos
+            self.__limpiar_ciclos()
+            # Inserta los ciclos válidos
+            self.__insertar_ciclos(i)
 
         # Junta todas las caras en una sola lista
         caras = []
         for i in self.longitud_ciclos:
             caras += self.caras[i]
         self.caras = caras
+        del self.claves_caras
 
     # Método para dibujar el poliedro
     def dibujar(self, ids = False, alpha_caras = 0.8):
-        # Crear figura y ejes 3D
-        fig = plt.figure(figsize=(10, 8))
-        ax = fig.add_subplot(111, projection='3d')
-
-        # Extraer coordenadas x, y, z de todos los vértices
-        x = [v[0] for v in self.vertices]
-        y = [v[1] for v in self.vertices]
-        z = [v[2] for v in self.vertices]
-
-        # Dibujar las aristas si se proporcionan
-        if self.aristas:
-            for vertice_id, conexiones in self.aristas.items():
-                v1 = self.vertices[vertice_id]
-                for vecino_id in conexiones:
-                    if vertice_id < vecino_id:
-                        v2 = self.vertices[vecino_id]
-                        ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
-                                color='#2F5F8A', linestyle='-', linewidth=1)
-
-        # Añadir etiquetas de identificadores si ids es True
-        if ids:
-            for idx, (xi, yi, zi) in enumerate(self.vertices):
-                ax.text(xi, yi, zi, str(idx), color='black', fontsize=20, ha='left', va='bottom')
-    
-        # Dibujar caras
-        poly3d = []
-        for cara in self.caras:
-            # Obtener coordenadas de vértices para esta cara
-            vertices_cara = [self.vertices[id_v] for id_v in cara]
-            poly3d.append(vertices_cara)
-        
-        # Crear colección de polígonos 3D y añadirla a los ejes
-        cara_collection = Poly3DCollection(poly3d, 
-                                        facecolors=["#0F52BA" for _ in range(len(self.caras))], 
-                                        alpha=alpha_caras,
-                                        edgecolor='black',
-                                        linewidth=0.5)
-        ax.add_collection3d(cara_collection)
-
-        # Configurar aspecto del gráfico
-        ax.set_box_aspect([1, 1, 1])
-        titulo = self.semilla
-        titulo = titulo.split()
-        titulo = [palabra.capitalize() for palabra in titulo]
-        ax.set_title(" ".join(titulo))
-        ax.set_axis_off()
-
-        # Establecer límites de ejes en un cubo para mejor visualización
-        max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
-        mid_x = np.mean([np.max(x), np.min(x)])
-        mid_y = np.mean([np.max(y), np.min(y)])
-        mid_z = np.mean([np.max(z), np.min(z)])
-
-        ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        ax.set_zlim(mid_z - max_range, mid_z + max_range)
-
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        # matplotlib solo se carga al dibujar
+        from domo.renderizado import dibujar_poliedro
+
+        titulo = " ".join(palabra.capitalize() for palabra in self.semilla.split())
+        etiquetas = range(len(self.vertices)) if ids else None
+        dibujar_poliedro(np.asarray(self.vertices), self.aristas_array, self.caras, titulo, etiquetas, alpha_caras)
@@ -0,0 +1,307 @@
+"""
+Rasterizador por software en NumPy para los videos de rotación.
+
+Sustituye a matplotlib 3D cuando solo hace falta generar fotogramas: proyecta los
+puntos rotados con la misma cámara que view_init(elev, azim), rasteriza todos los
+triángulos a la vez y compone las caras translúcidas por profundidad en cada píxel,
+sin ordenar polígonos en Python ni crear artistas. Las aristas se dibujan con
+antialiasing repartiendo muestras sobre los píxeles vecinos.
+"""
+import importlib.util
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from domo.iluminacion import *
+
+def cargar_fuente(tamano):
+    """
+    Fuente para los textos: DejaVu Sans de matplotlib si está instalado (sin importarlo,
+    solo se busca el fichero) para tener los mismos glifos con tilde; si no, la de Pillow.
+    """
+    especificacion = importlib.util.find_spec("matplotlib")
+    if especificacion is not None and especificacion.submodule_search_locations:
+        for carpeta in especificacion.submodule_search_locations:
+            ruta = os.path.join(carpeta, "mpl-data", "fonts", "ttf", "DejaVuSans.ttf")
+            if os.path.exists(ruta):
+                return ImageFont.truetype(ruta, tamano)
+    return ImageFont.load_default(size=tamano)
+
+def base_camara(elevacion, azimut):
+    """
+    Vectores de la cámara de matplotlib para view_init(elev, azim), en grados.
+
+    Returns:
+        Tupla (direccion, derecha, arriba) de vectores unitarios (3,): direccion apunta
+        del centro de la escena hacia la cámara
+    """
+    elevacion, azimut = np.radians(elevacion), np.radians(azimut)
+    direccion = np.array([np.cos(elevacion) * np.cos(azimut), np.cos(elevacion) * np.sin(azimut), np.sin(elevacion)])
+    derecha = np.array([-np.sin(azimut), np.cos(azimut), 0.0])
+    arriba = np.cross(direccion, derecha)
+    return direccion, derecha, arriba
+
+def expandir_rangos(inicios, cuentas):
+    """
+    Para cada k genera inicios[k], inicios[k] + 1, ..., inicios[k] + cuentas[k] - 1 sin bucles.
+
+    Returns:
+        Tupla (grupo, valor): el índice k de cada elemento generado y su valor
+    """
+    cuentas = np.maximum(cuentas, 0)
+    total = int(cuentas.sum())
+    grupo = np.repeat(np.arange(len(cuentas)), cuentas)
+    # Suma acumulada de incrementos: +1 dentro de cada rango y un salto al empezar el siguiente
+    incrementos = np.ones(total, dtype=np.int64)
+    no_vacios = cuentas > 0
+    primeros = (np.cumsum(cuentas) - cuentas)[no_vacios]
+    inicios = np.asarray(inicios, dtype=np.int64)[no_vacios]
+    if len(primeros):
+        incrementos[primeros[0]] = inicios[0]
+        incrementos[primeros[1:]] = inicios[1:] - (inicios[:-1] + cuentas[no_vacios][:-1] - 1)
+    return grupo, np.cumsum(incrementos)
+
+class Rasterizador():
+    """
+    Genera fotogramas RGB (alto, ancho, 3) uint8 de una malla con caras triangulares.
+
+    La geometría fija (aristas, caras, encuadre, fondo con el título) se prepara una
+    vez; renderizar(puntos_rotados, colores) solo proyecta y rasteriza.
+
+    La composición imita a matplotlib: las aristas se dibujan debajo de las caras, las
+    caras se mezclan con transparencia alpha_caras de atrás hacia delante y los bordes
+    de las caras visibles se repasan encima con esa misma transparencia.
+    """
+    def __init__(self, aristas, caras, centro, max_range, elevacion=30, azimut=0, alpha_caras=0.8,
+                 titulo=None, ancho=1000, alto=800, proyeccion="perspectiva",
+                 color_fondo="#1F1F1F", color_aristas="#3E6576", color_texto="#F1F1F1"):
+        if proyeccion not in ("perspectiva", "ortografica"):
+            raise ValueError("La proyección debe ser 'perspectiva' u 'ortografica'")
+        self.aristas = np.asarray(aristas, dtype=np.int64).reshape(-1, 2)
+        self.caras = np.asarray(caras, dtype=np.int64).reshape(-1, 3)
+        self.centro = np.asarray(centro, dtype=np.float64)
+        self.max_range = float(max_range)
+        self.alpha_caras = alpha_caras
+        self.ancho = ancho
+        self.alto = alto
+        self.proyeccion = proyeccion
+        self.color_aristas = color_a_rgb(color_aristas).astype(np.float32)
+        self.color_texto = color_texto
+
+        self.direccion, self.derecha, self.arriba = base_camara(elevacion, azimut)
+        # Tamaño y posición en pantalla parecidos a los de la figura de matplotlib de 10x8 pulgadas
+        self.escala = 0.23 * alto / self.max_range
+        self.centro_pantalla = (0.5125 * ancho, 0.495 * alto)
+        # Cámara a 10 veces el tamaño de la escena, como la distancia por defecto de mplot3d
+        self.distancia_camara = 10 * self.max_range
+        # Margen de profundidad para decidir si una arista está sobre la cara visible
+        self.tolerancia_profundidad = 0.01 * self.max_range
+
+        self.fondo = self.__generar_fondo(color_a_rgb(color_fondo), titulo)
+        self.fondo_uint8 = np.round(self.fondo * 255).astype(np.uint8)
+        self.fondo = self.fondo.astype(np.float32)
+
+    def __generar_fondo(self, color_fondo, titulo):
+        fondo = np.empty((self.alto, self.ancho, 3))
+        fondo[:] = color_fondo
+        if titulo:
+            imagen = Image.fromarray(np.round(fondo * 255).astype(np.uint8))
+            dibujo = ImageDraw.Draw(imagen)
+            fuente = cargar_fuente(max(10, self.alto // 48))
+            dibujo.multiline_text((self.ancho / 2, self.alto * 0.04), titulo, fill=self.color_texto,
+                                  font=fuente, anchor="ma", align="center")
+            fondo = np.asarray(imagen, dtype=np.float64) / 255
+        return fondo
+
+    def proyectar(self, puntos):
+        """
+        Proyecta puntos (N, 3) a coordenadas de píxel.
+
+        Returns:
+            Tupla (x, y, profundidad) de arrays (N,); la profundidad crece hacia la cámara
+        """
+        relativos = np.asarray(puntos, dtype=np.float64) - self.centro
+        u = relativos @ self.derecha
+        v = relativos @ self.arriba
+        profundidad = relativos @ self.direccion
+        if self.proyeccion == "perspectiva":
+            factor = self.distancia_camara / (self.distancia_camara - profundidad)
+            u = u * factor
+            v = v * factor
+        x = self.centro_pantalla[0] + self.escala * u
+        y = self.centro_pantalla[1] - self.escala * v
+        return x, y, profundidad
+
+    def rasterizar_triangulos(self, x, y, profundidad, ancho, alto):
+        """
+        Muestras de todos los píxeles (centros en i + 0.5) cubiertos por las caras dentro
+        de una ventana de ancho x alto. Se recorre por tramos: para cada fila de cada
+        triángulo se calcula el intervalo de columnas interior cortando sus 3 lados, así
+        que solo se generan píxeles que están dentro.
+
+        Returns:
+            Tupla (pixel, profundidad, cara) de arrays con una entrada por muestra
+        """
+        tri_x, tri_y, tri_z = x[self.caras], y[self.caras], profundidad[self.caras]
+        dx1, dy1, dz1 = tri_x[:, 1] - tri_x[:, 0], tri_y[:, 1] - tri_y[:, 0], tri_z[:, 1] - tri_z[:, 0]
+        dx2, dy2, dz2 = tri_x[:, 2] - tri_x[:, 0], tri_y[:, 2] - tri_y[:, 0], tri_z[:, 2] - tri_z[:, 0]
+        areas = dx1 * dy2 - dy1 * dx2
+        validas = np.abs(areas) > 1e-12
+
+        # Filas cuyo centro cae dentro de la altura de cada triángulo
+        y_min = np.maximum(np.ceil(tri_y.min(axis=1) - 0.5), 0).astype(np.int64)
+        y_max = np.minimum(np.floor(tri_y.max(axis=1) - 0.5), alto - 1).astype(np.int64)
+        filas = np.where(validas, y_max - y_min + 1, 0)
+        tri, fila = expandir_rangos(y_min, filas)
+        yc = fila + 0.5
+
+        # Intervalo [x_izquierda, x_derecha] de cada tramo, cortando los lados que cruzan la fila
+        x_izquierda = np.full(len(tri), np.inf)
+        x_derecha = np.full(len(tri), -np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i, j in ((0, 1), (1, 2), (2, 0)):
+                yi, yj = tri_y[tri, i], tri_y[tri, j]
+                xi, xj = tri_x[tri, i], tri_x[tri, j]
+                cruza = (yc >= np.minimum(yi, yj)) & (yc <= np.maximum(yi, yj)) & (yi != yj)
+                corte = xi + (yc - yi) / (yj - yi) * (xj - xi)
+                x_izquierda = np.where(cruza, np.minimum(x_izquierda, corte), x_izquierda)
+                x_derecha = np.where(cruza, np.maximum(x_derecha, corte), x_derecha)
+        hay_corte = np.isfinite(x_izquierda)
+        x_ini = np.maximum(np.ceil(np.where(hay_corte, x_izquierda, 0) - 0.5), 0).astype(np.int64)
+        x_fin = np.minimum(np.floor(np.where(hay_corte, x_derecha, -1) - 0.5), ancho - 1).astype(np.int64)
+
+        # Profundidad por el plano de cada triángulo: z = z0 + dz/dx·(x - x0) + dz/dy·(y - y0),
+        # evaluada en la columna 0 de cada tramo para que por píxel solo quede una suma
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dz_dx = ((dz1 * dy2 - dz2 * dy1) / areas)[tri]
+            dz_dy = ((dx1 * dz2 - dx2 * dz1) / areas)[tri]
+        z_fila = tri_z[tri, 0] + dz_dx * (0.5 - tri_x[tri, 0]) + dz_dy * (yc - tri_y[tri, 0])
+
+        tramo, px = expandir_rangos(x_ini, np.where(hay_corte, x_fin - x_ini + 1, 0))
+        prof = z_fila[tramo] + dz_dx[tramo] * px
+        py = fila[tramo]
+        return py * ancho + px, prof, tri[tramo]
+
+    def muestrear_aristas(self, x, y, profundidad, espaciado=0.5):
+        """
+        Reparte muestras cada espaciado píxeles a lo largo de todas las aristas.
+
+        Returns:
+            Tupla (x, y, profundidad) de las muestras
+        """
+        ax, ay, az = x[self.aristas], y[self.aristas], profundidad[self.aristas]
+        longitudes = np.hypot(ax[:, 1] - ax[:, 0], ay[:, 1] - ay[:, 0])
+        n_muestras = np.ceil(longitudes / espaciado).astype(np.int64) + 1
+        arista, k = expandir_rangos(np.zeros(len(n_muestras), dtype=np.int64), n_muestras)
+        t = k / np.maximum(n_muestras[arista] - 1, 1)
+        return (ax[arista, 0] + t * (ax[arista, 1] - ax[arista, 0]),
+                ay[arista, 0] + t * (ay[arista, 1] - ay[arista, 0]),
+                az[arista, 0] + t * (az[arista, 1] - az[arista, 0]))
+
+    def cobertura_aristas(self, mx, my, ancho, alto, espaciado=0.5):
+        """
+        Cobertura antialiasing de las muestras de aristas: cada muestra se reparte de forma
+        bilineal entre los 4 píxeles más cercanos.
+
+        Returns:
+            Tupla (pixeles, cobertura) con los píxeles tocados y su cobertura en [0, 1]
+        """
+        fx, fy = mx - 0.5, my - 0.5
+        ix, iy = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+        dx, dy = fx - ix, fy - iy
+        cobertura = np.zeros(ancho * alto)
+        for ox, oy, peso in ((0, 0, (1 - dx) * (1 - dy)), (1, 0, dx * (1 - dy)),
+                             (0, 1, (1 - dx) * dy), (1, 1, dx * dy)):
+            px, py = ix + ox, iy + oy
+            validos = (px >= 0) & (px < ancho) & (py >= 0) & (py < alto)
+            cobertura += np.bincount(py[validos] * ancho + px[validos], weights=peso[validos], minlength=ancho * alto)
+        pixeles = np.flatnonzero(cobertura)
+        return pixeles, np.minimum(cobertura[pixeles] * espaciado, 1.0)
+
+    def __mezclar_aristas(self, imagen, mx, my, ancho, alto, opacidad):
+        pixeles, cobertura = self.cobertura_aristas(mx, my, ancho, alto)
+        cobertura = (cobertura * opacidad).astype(np.float32)[:, None]
+        imagen[pixeles] += cobertura * (self.color_aristas - imagen[pixeles])
+
+    def renderizar(self, puntos_rotados, colores):
+        """
+        Dibuja un fotograma. Todo el trabajo se hace dentro del rectángulo que ocupa la
+        malla en pantalla y el resto del fotograma se copia del fondo.
+
+        Args:
+            puntos_rotados: Array (N, 3) con los puntos del frame
+            colores: Array (F, 3) con el color RGB en [0, 1] de cada cara
+
+        Returns:
+            Array uint8 (alto, ancho, 3)
+        """
+        x, y, profundidad = self.proyectar(puntos_rotados)
+        fotograma = self.fondo_uint8.copy()
+
+        # Ventana con margen para el antialiasing de las aristas
+        x0 = int(np.clip(np.floor(x.min()) - 2, 0, self.ancho))
+        x1 = int(np.clip(np.ceil(x.max()) + 3, 0, self.ancho))
+        y0 = int(np.clip(np.floor(y.min()) - 2, 0, self.alto))
+        y1 = int(np.clip(np.ceil(y.max()) + 3, 0, self.alto))
+        ancho, alto = x1 - x0, y1 - y0
+        if ancho <= 0 or alto <= 0:
+            return fotograma
+        x, y = x - x0, y - y0
+        imagen = self.fondo[y0:y1, x0:x1].reshape(-1, 3).copy()
+        n_pixeles = ancho * alto
+        alpha = self.alpha_caras
+
+        # Aristas por debajo de las caras
+        mx, my, mz = self.muestrear_aristas(x, y, profundidad)
+        self.__mezclar_aristas(imagen, mx, my, ancho, alto, 1.0)
+
+        # Caras: en cada píxel, la capa k-ésima desde delante pesa alpha * (1 - alpha)^k
+        pixel, prof, cara = self.rasterizar_triangulos(x, y, profundidad, ancho, alto)
+        if len(pixel):
+            # Orden por píxel y, dentro de cada píxel, de delante hacia atrás con una sola
+            # clave flotante: pixel + fracción en [0, 0.5] que decrece con la profundidad
+            fraccion = (prof.max() - prof) / (2 * (np.ptp(prof) + 1e-12))
+            orden = np.argsort(pixel + fraccion)
+            pixel, prof, cara = pixel[orden], prof[orden], cara[orden]
+            nuevo_grupo = np.ones(len(pixel), dtype=bool)
+            nuevo_grupo[1:] = pixel[1:] != pixel[:-1]
+            primeros = np.flatnonzero(nuevo_grupo)
+            capas = np.diff(np.append(primeros, len(pixel)))
+            rango = np.arange(len(pixel)) - np.repeat(primeros, capas)
+            potencias = (1 - alpha) ** np.arange(capas.max() + 1)
+
+            colores = np.asarray(colores, dtype=np.float64)
+            grupo = np.cumsum(nuevo_grupo) - 1
+            pesos = alpha * potencias[rango]
+            cubiertos = pixel[primeros]
+            transmitancia = potencias[capas]
+            for canal in range(3):
+                aportes = np.bincount(grupo, weights=pesos * colores[cara, canal], minlength=len(primeros))
+                imagen[cubiertos, canal] = imagen[cubiertos, canal] * transmitancia + aportes
+
+            # Bordes de las caras visibles: aristas a la profundidad de la cara más cercana
+            profundidad_visible = np.full(n_pixeles, -np.inf)
+            profundidad_visible[cubiertos] = prof[primeros]
+            px = np.clip(mx.astype(np.int64), 0, ancho - 1)
+            py = np.clip(my.astype(np.int64), 0, alto - 1)
+            visibles = mz >= profundidad_visible[py * ancho + px] - self.tolerancia_profundidad
+            self.__mezclar_aristas(imagen, mx[visibles], my[visibles], ancho, alto, alpha)
+
+        np.clip(imagen, 0, 1, out=imagen)
+        fotograma[y0:y1, x0:x1] = np.round(imagen * 255).astype(np.uint8).reshape(alto, ancho, 3)
+        return fotograma
+
+    def dibujar_etiquetas(self, fotograma, puntos_rotados, etiquetas, desplazamiento=0.0):
+        """
+        Escribe las etiquetas de los vértices sobre un fotograma ya renderizado.
+        """
+        puntos = np.array(puntos_rotados, dtype=np.float64)
+        puntos[:, 2] += desplazamiento
+        x, y, _ = self.proyectar(puntos)
+        imagen = Image.fromarray(fotograma)
+        dibujo = ImageDraw.Draw(imagen)
+        fuente = cargar_fuente(max(8, self.alto // 64))
+        for etiqueta, xi, yi in zip(etiquetas, x.tolist(), y.tolist()):
+            dibujo.text((xi, yi), str(etiqueta), fill=self.color_texto, font=fuente, anchor="lb")
+        return np.asarray(imagen)
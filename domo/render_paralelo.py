@@ -0,0 +1,111 @@
+"""
+Render en paralelo de los fotogramas de generar_video_rotacion.
+
+Una vez calculadas las rotaciones y los colores, cada fotograma es independiente. Los
+índices de fotograma se reparten en bloques entre procesos de un ProcessPoolExecutor;
+cada proceso crea su propia figura Agg (o rasterizador NumPy) una sola vez y lee los
+puntos y colores de memoria compartida, de modo que por tarea solo viaja el rango de
+fotogramas. Los fotogramas RGB vuelven en orden para un único escritor.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Estado de cada proceso trabajador: función de render y vistas a la memoria compartida
+__trabajador = {}
+
+def compartir_array(array):
+    """
+    Copia un array a un bloque de memoria compartida nuevo.
+
+    Returns:
+        Tupla (memoria, descriptor): el SharedMemory (hay que cerrarlo y liberarlo con
+        unlink) y (nombre, forma, dtype) para abrirlo desde otro proceso
+    """
+    array = np.ascontiguousarray(array)
+    memoria = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memoria.buf)[...] = array
+    return memoria, (memoria.name, array.shape, array.dtype.str)
+
+def abrir_array_compartido(descriptor):
+    """
+    Abre un array creado con compartir_array, sin copiarlo.
+
+    Returns:
+        Tupla (memoria, array): hay que conservar la memoria mientras se use el array
+    """
+    nombre, forma, dtype = descriptor
+    memoria = shared_memory.SharedMemory(name=nombre)
+    return memoria, np.ndarray(forma, dtype=np.dtype(dtype), buffer=memoria.buf)
+
+def iniciar_trabajador(domo, descriptor_rotaciones, descriptor_colores, opciones):
+    """
+    Inicializador de cada proceso: prepara la escena propia y abre las rotaciones y los
+    colores compartidos. El domo llega una sola vez por proceso, no por tarea.
+    """
+    if opciones["backend"] == "matplotlib":
+        import matplotlib.pyplot as plt
+        # Cada trabajador dibuja fuera de pantalla aunque el proceso principal use otra ventana
+        plt.switch_backend("Agg")
+    memoria_rotaciones, __trabajador["rotaciones"] = abrir_array_compartido(descriptor_rotaciones)
+    memoria_colores, __trabajador["colores"] = abrir_array_compartido(descriptor_colores)
+    __trabajador["memorias"] = (memoria_rotaciones, memoria_colores)
+    __trabajador["renderizar"] = domo.preparar_renderizado(**opciones)
+
+def renderizar_bloque(inicio, fin):
+    """
+    Renderiza los fotogramas [inicio, fin) en el proceso trabajador.
+
+    Returns:
+        Lista de arrays uint8 (alto, ancho, 3)
+    """
+    rotaciones, colores = __trabajador["rotaciones"], __trabajador["colores"]
+    renderizar = __trabajador["renderizar"]
+    return [renderizar(rotaciones[frame], colores[frame]) for frame in range(inicio, fin)]
+
+def renderizar_en_paralelo(domo, rotaciones, colores, procesos=None, fotogramas_por_bloque=None, **opciones):
+    """
+    Genera en orden los fotogramas RGB de la animación renderizados por varios procesos.
+
+    Args:
+        domo: Objeto con preparar_renderizado(backend, elevacion, ids, alpha_caras, proyeccion)
+        rotaciones: Array (T, N, 3) de puntos rotados
+        colores: Array (T, F, 3) de colores de las caras
+        procesos: Número de procesos, por defecto os.cpu_count()
+        fotogramas_por_bloque: Fotogramas por tarea, por defecto unos 4 bloques por proceso
+        **opciones: Argumentos de preparar_renderizado
+
+    Returns:
+        Generador de arrays uint8 (alto, ancho, 3). Como mucho hay 2 bloques por proceso
+        renderizados o en curso a la vez, así que la memoria no crece con T.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    pasos = len(rotaciones)
+    if fotogramas_por_bloque is None:
+        fotogramas_por_bloque = max(1, -(-pasos // (4 * procesos)))
+    bloques = [(inicio, min(inicio + fotogramas_por_bloque, pasos)) for inicio in range(0, pasos, fotogramas_por_bloque)]
+
+    memoria_rotaciones, descriptor_rotaciones = compartir_array(rotaciones)
+    memoria_colores, descriptor_colores = compartir_array(colores)
+    try:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_trabajador,
+                                 initargs=(domo, descriptor_rotaciones, descriptor_colores, opciones)) as ejecutor:
+            pendientes = deque()
+            bloques = iter(bloques)
+            for bloque in bloques:
+                pendientes.append(ejecutor.submit(renderizar_bloque, *bloque))
+                if len(pendientes) >= 2 * procesos:
+                    break
+            while pendientes:
+                fotogramas = pendientes.popleft().result()
+                siguiente = next(bloques, None)
+                if siguiente is not None:
+                    pendientes.append(ejecutor.submit(renderizar_bloque, *siguiente))
+                yield from fotogramas
+    finally:
+        for memoria in (memoria_rotaciones, memoria_colores):
+            memoria.close()
+            memoria.unlink()
@@ -0,0 +1,189 @@
+"""
+Dibujo con matplotlib de domos, zomos y poliedros.
+
+Este módulo solo se importa desde los métodos que dibujan, de modo que cargar la
+geometría (Domo, Zomo, Poliedro) no arrastra matplotlib. La primera vez que se importa
+pyplot sin pantalla disponible se fuerza el backend Agg.
+"""
+import os
+import sys
+
+import numpy as np
+
+def hay_pantalla():
+    """
+    Indica si hay un servidor gráfico al que abrir ventanas. En Windows y macOS se
+    asume que sí; en Linux y demás Unix hace falta DISPLAY o WAYLAND_DISPLAY.
+    """
+    if sys.platform.startswith(("win", "darwin")):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+def importar_pyplot():
+    """
+    Importa matplotlib.pyplot y registra la proyección 3D. Si pyplot aún no estaba
+    cargado, no hay pantalla y no se eligió backend con MPLBACKEND, usa Agg para no
+    intentar abrir ninguna ventana.
+    """
+    if "matplotlib.pyplot" not in sys.modules and not hay_pantalla() and "MPLBACKEND" not in os.environ:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import mpl_toolkits.mplot3d  # noqa: F401  registra projection='3d'
+    return plt
+
+def limites_cubo(ax, coords):
+    """
+    Fija los límites de los ejes a un cubo centrado en los puntos, para que no se
+    deformen. Retorna el semilado del cubo.
+    """
+    coords = np.asarray(coords)
+    x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+    max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
+    mid_x = np.mean([np.max(x), np.min(x)])
+    mid_y = np.mean([np.max(y), np.min(y)])
+    mid_z = np.mean([np.max(z), np.min(z)])
+
+    ax.set_xlim(mid_x - max_range, mid_x + max_range)
+    ax.set_ylim(mid_y - max_range, mid_y + max_range)
+    ax.set_zlim(mid_z - max_range, mid_z + max_range)
+    return max_range
+
+def dibujar_poliedro(coords, aristas, caras, titulo, etiquetas=None, alpha_caras=0.8):
+    """
+    Muestra en una ventana las aristas, las caras y opcionalmente las etiquetas de los
+    vértices de un poliedro.
+
+    Args:
+        coords: Array (N, 3) de vértices
+        aristas: Array (A, 2) de índices de vértices
+        caras: Secuencia de caras, cada una con los índices de sus vértices
+        titulo: Título de la figura
+        etiquetas: Texto de cada vértice, o None para no mostrarlas
+        alpha_caras: Opacidad de las caras
+    """
+    plt = importar_pyplot()
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    # Crear figura y ejes 3D
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    coords = np.asarray(coords)
+
+    # Dibujar las aristas (cada arista aparece una sola vez)
+    for v1, v2 in coords[np.asarray(aristas, dtype=np.int64).reshape(-1, 2)]:
+        ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
+                color='#2F5F8A', linestyle='-', linewidth=1)
+
+    # Añadir etiquetas de identificadores si se dan
+    if etiquetas is not None:
+        for etiqueta, (xi, yi, zi) in zip(etiquetas, coords):
+            ax.text(xi, yi, zi, str(etiqueta), color='black', fontsize=20, ha='left', va='bottom')
+
+    # Crear colección de polígonos 3D y añadirla a los ejes
+    poly3d = [coords[list(cara)] for cara in caras]
+    cara_collection = Poly3DCollection(poly3d,
+                                       facecolors=["#0F52BA" for _ in range(len(poly3d))],
+                                       alpha=alpha_caras,
+                                       edgecolor='black',
+                                       linewidth=0.5)
+    ax.add_collection3d(cara_collection)
+
+    # Configurar aspecto del gráfico
+    ax.set_box_aspect([1, 1, 1])
+    ax.set_title(titulo)
+    ax.set_axis_off()
+    limites_cubo(ax, coords)
+
+    plt.tight_layout()
+    plt.show()
+
+def crear_escena(coords, aristas, caras, titulo, etiquetas=None, elevacion=30, alpha_caras=0.8):
+    """
+    Crea la figura de la animación con todos sus artistas una sola vez: una
+    Line3DCollection para todas las aristas, una Poly3DCollection para todas las caras
+    y, si se dan, los textos de las etiquetas. Los límites, el título y la cámara son fijos.
+
+    Args:
+        coords: Array (N, 3) de vértices sin rotar
+        aristas: Array (A, 2) de índices de vértices
+        caras: Array (F, k) de índices de vértices
+        titulo: Título de la figura
+        etiquetas: Texto de cada vértice, o None para no mostrarlas
+        elevacion: Ángulo de cámara vertical
+        alpha_caras: Opacidad de las caras
+
+    Returns:
+        Tupla (fig, actualizar_escena), donde actualizar_escena(puntos_rotados, colores)
+        solo cambia las coordenadas y colores de los artistas y los devuelve
+    """
+    plt = importar_pyplot()
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Line3DCollection
+
+    # === Configuración general ===
+    fig = plt.figure(figsize=(10, 8), facecolor='#1F1F1F')
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_facecolor('#1F1F1F')
+
+    # Orden fijo como al dibujar cada arista por separado: aristas, caras y textos encima
+    ax.computed_zorder = False
+    ax.set_box_aspect([1, 1, 1])
+    max_range = limites_cubo(ax, coords)
+    ax.axis('off')
+
+    # === Título ===
+    ax.set_title(titulo, color="#F1F1F1")
+
+    # === Aristas ===
+    lineas = Line3DCollection(coords[aristas], colors='#3E6576', linestyles='-', linewidths=1, zorder=2)
+    ax.add_collection3d(lineas)
+
+    # === Caras ===
+    coleccion = Poly3DCollection(
+        coords[caras],
+        alpha=alpha_caras,
+        edgecolor='#3E6576',
+        linewidth=0.5,
+        zorder=2.5
+    )
+    ax.add_collection3d(coleccion)
+
+    # === Etiquetas opcionales ===
+    textos = []
+    delta = max_range * 0.02
+    if etiquetas is not None:
+        for etiqueta, (xi, yi, zi) in zip(etiquetas, coords):
+            textos.append(ax.text(xi, yi, zi + delta, str(etiqueta), color='#F1F1F1', fontsize=9,
+                                  ha='left', va='bottom'))
+
+    ax.view_init(elev=elevacion, azim=0)  # cámara fija
+
+    def actualizar_escena(puntos_rotados, colores):
+        lineas.set_segments(puntos_rotados[aristas])
+        coleccion.set_verts(puntos_rotados[caras])
+        coleccion.set_facecolor(colores)
+        for texto, (xi, yi, zi) in zip(textos, puntos_rotados):
+            texto.set_position_3d((xi, yi, zi + delta))
+        return [lineas, coleccion] + textos
+
+    return fig, actualizar_escena
+
+def renderizador_agg(fig, actualizar_escena):
+    """
+    Convierte una escena de crear_escena en una función que dibuja un fotograma en un
+    lienzo Agg y lo devuelve como array uint8 (alto, ancho, 3). La figura deja de estar
+    registrada en pyplot y vive solo mientras viva la función.
+    """
+    plt = importar_pyplot()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Se dibuja siempre en un lienzo Agg, sea cual sea el backend interactivo
+    plt.close(fig)
+    FigureCanvasAgg(fig)
+
+    def renderizar(puntos_rotados, colores):
+        actualizar_escena(puntos_rotados, colores)
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+    return renderizar
@@ -0,0 +1,81 @@
+import numpy as np
+
+# Eje de rotación terrestre, inclinado 23.44° respecto a la vertical
+INCLINACION_TIERRA = np.radians(23.44)
+EJE_TIERRA = np.array([np.sin(INCLINACION_TIERRA), 0, np.cos(INCLINACION_TIERRA)])
+
+def matriz_rotacion_eje(v, theta):
+    """
+    Retorna la matriz de rotación 3x3 para rotar un ángulo theta (rad)
+    alrededor del eje unitario v (np.array de 3 elementos).
+    """
+    v = v / np.linalg.norm(v)
+    x, y, z = v
+    c, s = np.cos(theta), np.sin(theta)
+    C = 1 - c
+    return np.array([
+        [c + x*x*C,     x*y*C - z*s, x*z*C + y*s],
+        [y*x*C + z*s, c + y*y*C,     y*z*C - x*s],
+        [z*x*C - y*s, z*y*C + x*s, c + z*z*C    ]
+    ])
+
+def matrices_rotacion_eje(v, angulos):
+    """
+    Fórmula de Rodrigues vectorizada: todas las matrices de rotación alrededor del eje v
+    de una vez, R = cos·I + sen·[v]x + (1 - cos)·v vᵀ.
+
+    Args:
+        v: Eje de rotación (3,), no hace falta que sea unitario
+        angulos: Array (T,) de ángulos en radianes
+
+    Returns:
+        Array (T, 3, 3) con la matriz de cada ángulo
+    """
+    v = np.asarray(v, dtype=np.float64)
+    v = v / np.linalg.norm(v)
+    angulos = np.asarray(angulos, dtype=np.float64).reshape(-1)
+    c, s = np.cos(angulos), np.sin(angulos)
+
+    x, y, z = v
+    producto_vectorial = np.array([[0, -z, y],
+                                   [z, 0, -x],
+                                   [-y, x, 0]])
+    return (c[:, None, None] * np.eye(3)
+            + s[:, None, None] * producto_vectorial
+            + (1 - c)[:, None, None] * np.outer(v, v))
+
+def angulos_vuelta_completa(n):
+    """
+    Devuelve n ángulos equidistantes en [0, 2π).
+    """
+    return np.linspace(0, 2*np.pi, n, endpoint=False)
+
+def rotar_puntos(coords, matrices, dtype=None):
+    """
+    Aplica todas las rotaciones a los puntos con un único producto por lotes.
+
+    Args:
+        coords: Array (N, 3) de puntos
+        matrices: Array (T, 3, 3) de matrices de rotación
+        dtype: Tipo del resultado, por defecto el de coords (np.float32 reduce la memoria a la mitad)
+
+    Returns:
+        Array (T, N, 3) con los puntos rotados en cada frame
+    """
+    coords = np.asarray(coords)
+    dtype = np.dtype(coords.dtype if dtype is None else dtype)
+    matrices = np.asarray(matrices)
+    rotadas = np.empty((len(matrices), len(coords), 3), dtype=dtype)
+    np.matmul(coords.astype(dtype, copy=False), matrices.transpose(0, 2, 1).astype(dtype, copy=False), out=rotadas)
+    return rotadas
+
+def iterar_rotaciones(coords, matrices, dtype=None):
+    """
+    Versión perezosa de rotar_puntos: genera los puntos rotados frame a frame, de modo
+    que solo hay un array (N, 3) en memoria a la vez.
+    """
+    coords = np.asarray(coords)
+    dtype = np.dtype(coords.dtype if dtype is None else dtype)
+    coords = coords.astype(dtype, copy=False)
+    for matriz in np.asarray(matrices):
+        yield coords @ matriz.T.astype(dtype, copy=False)
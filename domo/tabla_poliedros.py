@@ -0,0 +1,119 @@
+"""
+Tabla precalculada con la topología de los 20 poliedros semilla.
+
+Los poliedros de poliedro_id son fijos, así que sus vértices, aristas y caras ordenadas
+se calculan una vez con la búsqueda en profundidad de Poliedro y se guardan en
+datos/poliedros.json junto con la versión y una suma de comprobación. Poliedro consulta
+la tabla y solo recorre el grafo si la semilla no está.
+
+Regenerar la tabla y comprobarla contra el cálculo en vivo:
+    python -m domo.tabla_poliedros --regenerar
+    python -m domo.tabla_poliedros
+"""
+import hashlib
+import json
+import os
+import sys
+
+# Cambiar al modificar la generación de vértices o la búsqueda de caras
+VERSION_TABLA = 1
+
+RUTA_TABLA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "poliedros.json")
+
+__tabla = None
+
+def calcular_checksum(poliedros):
+    """
+    Suma SHA-256 del contenido de la tabla serializado de forma canónica.
+    """
+    contenido = json.dumps(poliedros, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def cargar_tabla(ruta=RUTA_TABLA):
+    """
+    Lee la tabla y comprueba su versión y su suma de comprobación.
+
+    Returns:
+        Diccionario {semilla: topología}, o None si el fichero no existe
+
+    Raises:
+        ValueError: si la versión no coincide o el contenido está corrupto
+    """
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as fichero:
+        datos = json.load(fichero)
+    if datos.get("version") != VERSION_TABLA:
+        raise ValueError(f"La tabla de poliedros es de la versión {datos.get('version')}, se esperaba la {VERSION_TABLA}. Regenérala con python -m domo.tabla_poliedros --regenerar")
+    if calcular_checksum(datos["poliedros"]) != datos["checksum"]:
+        raise ValueError(f"La suma de comprobación de {ruta} no coincide, el fichero está corrupto")
+    return datos["poliedros"]
+
+def obtener_topologia(semilla):
+    """
+    Devuelve la topología precalculada de una semilla o None si no está en la tabla.
+    La tabla se lee una sola vez por proceso.
+
+    Returns:
+        Diccionario con "vertices", "aristas", "caras" y "longitud_ciclos"
+    """
+    global __tabla
+    if __tabla is None:
+        __tabla = cargar_tabla() or {}
+    return __tabla.get(semilla)
+
+def generar_tabla(ruta=RUTA_TABLA):
+    """
+    Calcula la topología de todas las semillas con la búsqueda en profundidad y la guarda.
+    """
+    from domo.poliedro import Poliedro, poliedro_id
+
+    poliedros = {}
+    for semilla in poliedro_id:
+        poliedro = Poliedro(semilla, usar_tabla=False)
+        poliedros[semilla] = {"vertices": [[float(c) for c in v] for v in poliedro.vertices],
+                              "aristas": poliedro.aristas_array.tolist(),
+                              "caras": [[int(v) for v in cara] for cara in poliedro.caras],
+                              "longitud_ciclos": list(poliedro.longitud_ciclos)}
+
+    datos = {"version": VERSION_TABLA, "checksum": calcular_checksum(poliedros), "poliedros": poliedros}
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as fichero:
+        json.dump(datos, fichero)
+        fichero.write("\n")
+    return poliedros
+
+def verificar_tabla(ruta=RUTA_TABLA):
+    """
+    Autocomprobación: compara cada semilla de la tabla con el cálculo en vivo.
+
+    Returns:
+        Lista con las semillas que no coinciden (vacía si todo está bien)
+    """
+    from domo.poliedro import Poliedro, poliedro_id
+
+    tabla = cargar_tabla(ruta)
+    if tabla is None:
+        return list(poliedro_id)
+
+    distintas = []
+    for semilla in poliedro_id:
+        poliedro = Poliedro(semilla, usar_tabla=False)
+        entrada = tabla.get(semilla)
+        if entrada is None \
+                or entrada["vertices"] != [[float(c) for c in v] for v in poliedro.vertices] \
+                or entrada["aristas"] != poliedro.aristas_array.tolist() \
+                or entrada["caras"] != [[int(v) for v in cara] for cara in poliedro.caras] \
+                or entrada["longitud_ciclos"] != list(poliedro.longitud_ciclos):
+            distintas.append(semilla)
+    return distintas
+
+if __name__ == "__main__":
+    if "--regenerar" in sys.argv[1:]:
+        generar_tabla()
+        print(f"Tabla regenerada en {RUTA_TABLA}")
+    distintas = verificar_tabla()
+    if distintas:
+        print("La tabla no coincide con el cálculo en vivo para: " + ", ".join(distintas))
+        sys.exit(1)
+    print("La tabla de poliedros coincide con el cálculo en vivo")
@@ -1,6 +1,127 @@
 import numpy as np
 
 from domo.utils import *
+from domo.malla import *
+from domo.indice_espacial import *
+
+class TrianguloBase():
+    """
+    Triangulación de un triángulo base, o del polígono formado por varios triángulos
+    base (construir_plantilla_poligono), con arrays de índices enteros.
+
+    Los generadores generar_triangulo_base_* y fusionar_triangulos_base devuelven la
+    misma triangulación con ids de texto, que se obtiene con a_diccionarios().
+
+    Atributos:
+        - ids: lista con el id de texto de cada punto, su posición es el índice local
+        - coords: array float64 (P, 2) con las coordenadas en el plano
+        - vertices: array int32 (lados,) con los vértices del triángulo o polígono
+        - aristas: array int32 (E, 2) con cada arista una sola vez, (menor, mayor)
+        - vertices_aristas: diccionario {(a, b): array int32} con los puntos de cada lado en orden
+        - caras: array int32 (F, 3) con los triángulos
+    """
+    def __init__(self, ids, coords, vertices, aristas, vertices_aristas, caras):
+        self.ids = list(ids)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.vertices = np.asarray(vertices, dtype=np.int32)
+        self.aristas = normalizar_aristas(aristas)
+        self.vertices_aristas = {lado: np.asarray(lista, dtype=np.int32) for lado, lista in vertices_aristas.items()}
+        self.caras = np.asarray(caras, dtype=np.int32).reshape(-1, 3)
+
+    @classmethod
+    def desde_diccionarios(cls, puntos, vertices, aristas, vertices_aristas, caras):
+        """
+        Crea la triangulación a partir de la salida con ids de texto de un generador.
+        """
+        ids = list(puntos.keys())
+        id_a_indice = {id: i for i, id in enumerate(ids)}
+        coords = np.array([puntos[id] for id in ids], dtype=np.float64)
+        pares = [(id_a_indice[id], id_a_indice[vecino]) for id in aristas for vecino in aristas[id]]
+        return cls(ids, coords,
+                   [id_a_indice[id] for id in vertices],
+                   pares,
+                   {lado: [id_a_indice[id] for id in lista] for lado, lista in vertices_aristas.items()},
+                   [[id_a_indice[id] for id in cara] for cara in caras])
+
+    def a_diccionarios(self):
+        """
+        Convierte la triangulación al formato con ids de texto. Los vecinos de cada punto
+        van en sentido antihorario empezando por la derecha.
+
+        Returns:
+            Tupla (puntos, vertices, aristas, vertices_aristas, caras) como la de los
+            generadores generar_triangulo_base_*
+        """
+        ids = self.ids
+        puntos = dict(zip(ids, map(tuple, self.coords.tolist())))
+        vertices = [ids[k] for k in self.vertices.tolist()]
+
+        # Cada arista en las dos direcciones, ordenadas por origen y por ángulo
+        origenes = np.concatenate([self.aristas[:, 0], self.aristas[:, 1]])
+        destinos = np.concatenate([self.aristas[:, 1], self.aristas[:, 0]])
+        diferencias = self.coords[destinos] - self.coords[origenes]
+        angulos = np.arctan2(diferencias[:, 1], diferencias[:, 0]) % (2 * np.pi)
+        orden = np.lexsort((angulos, origenes))
+        cortes = np.cumsum(np.bincount(origenes, minlength=len(ids)))[:-1]
+        vecinos = np.split(destinos[orden], cortes)
+        aristas = {id: [ids[k] for k in lista.tolist()] for id, lista in zip(ids, vecinos)}
+
+        vertices_aristas = {lado: [ids[k] for k in lista.tolist()] for lado, lista in self.vertices_aristas.items()}
+        caras = [[ids[k] for k in cara] for cara in self.caras.tolist()]
+        return puntos, vertices, aristas, vertices_aristas, caras
+
+def generar_malla_triangulo_alternado(frecuencia):
+    """
+    Genera con arrays la triangulación alternada de un triángulo equilátero: los puntos
+    (i, j), con i fila y j posición en la fila, se numeran fila a fila y las aristas y
+    triángulos salen de aritmética de índices.
+
+    Args:
+        frecuencia: La frecuencia de división del triángulo
+
+    Returns:
+        TrianguloBase con ids "i_j"
+    """
+    # Factores de escala
+    factor_x = 1/(2*frecuencia)
+    factor_y = factor_x * np.sqrt(3)
+
+    # La fila i tiene frecuencia + 1 - i puntos y empieza en el índice inicio_fila[i]
+    longitudes = frecuencia + 1 - np.arange(frecuencia + 2)
+    inicio_fila = np.concatenate([[0], np.cumsum(longitudes)])
+    n_puntos = int(inicio_fila[frecuencia + 1])
+    i = np.repeat(np.arange(frecuencia + 1), longitudes[:frecuencia + 1])
+    j = np.arange(n_puntos) - inicio_fila[i]
+    p = np.arange(n_puntos)
+
+    ids = [f"{a}_{b}" for a, b in zip(i.tolist(), j.tolist())]
+    coords = np.column_stack([factor_x * (i + 2 * j), factor_y * i])
+    vertices = [0, frecuencia, n_puntos - 1]
+
+    # Vecinos hacia la derecha y hacia arriba: cada arista sale una sola vez
+    interior = i + j < frecuencia
+    arriba = inicio_fila[i + 1] + j
+    con_izquierda = j > 0
+    aristas = np.concatenate([
+        np.column_stack([p, p + 1])[interior],
+        np.column_stack([p, arriba])[interior],
+        np.column_stack([p, arriba - 1])[con_izquierda]
+    ])
+
+    # Por cada punto, el triángulo que apunta hacia arriba y el que apunta hacia abajo a su derecha
+    hacia_arriba = np.column_stack([p, p + 1, arriba])
+    hacia_abajo = np.column_stack([p + 1, arriba + 1, arriba])
+    existe = np.column_stack([interior, i + j + 1 < frecuencia])
+    caras = np.stack([hacia_arriba, hacia_abajo], axis=1)[existe]
+
+    filas = np.arange(frecuencia + 1)
+    vertices_aristas = {
+        (0,1): filas,
+        (1,2): inicio_fila[filas] + frecuencia - filas,
+        (2,0): inicio_fila[filas[::-1]]
+    }
+
+    return TrianguloBase(ids, coords, vertices, aristas, vertices_aristas, caras)
 
 def generar_triangulo_base_alternado(frecuencia):
     """
@@ -17,88 +138,47 @@ def generar_triangulo_base_alternado(frecuencia):
         - Una lista con los IDs de los vértices exteriores del triángulo completo
         - Un diccionario donde las claves son los ids de los puntos y los valores
           son listas con los ids de los puntos adyacentes
+        - Un diccionario con los ids de los puntos de cada lado del triángulo
+        - Una lista con los triángulos de la subdivisión, cada uno como lista de 3 ids
     """
-    # Factores de escala
-    factor_x = 1/(2*frecuencia)
-    factor_y = factor_x * np.sqrt(3)
-    
-    # Inicializar el diccionario de puntos
-    puntos = {}
-    
-    # Lista para almacenar los IDs de los vértices del triángulo completo
-    vertices = ["0_0", "0_" + str(frecuencia), str(frecuencia) + "_0"]
-    
-    # Diccionario para almacenar las aristas
-    aristas = {}
-    
-    # Generar todos los puntos
-    for i in range(frecuencia + 1):
-        for j in range(frecuencia + 1 - i):
-            # Generar el ID del punto
-            punto_id = str(i) + "_" + str(j)
+    return generar_malla_triangulo_alternado(frecuencia).a_diccionarios()
 
-            # Calcular coordenadas
-            x = factor_x * (i + 2 * j)
-            y = factor_y * i
-            
-            # Almacenar en el diccionario
-            puntos[punto_id] = (x, y)
-
-            # Generar y seleccionar aristas
-            a_derecha = [str(i) + "_" + str(j+1)] * (i+j != frecuencia)
-            a_arriba_derecha = [str(i+1) + "_" + str(j)] * (i+j != frecuencia)
-            a_arriba_izquierda = [str(i+1) + "_" + str(j-1)] * (j != 0)
-            a_izquierda = [str(i) + "_" + str(j-1)] * (j != 0)
-            a_debajo_izquierda = [str(i-1) + "_" + str(j)] * (i != 0)
-            a_debajo_derecha = [str(i-1) + "_" + str(j+1)] * (i != 0)
-            
-            # Inicializar la lista de aristas para este punto
-            aristas[punto_id] = a_derecha + a_arriba_derecha + a_arriba_izquierda + \
-                a_izquierda + a_debajo_izquierda + a_debajo_derecha
-            
-    vertices_aristas = {
-        (0,1): ["0_" + str(i) for i in range(frecuencia+1)],
-        (1,2): [str(i) + "_" + str(frecuencia-i) for i in range(frecuencia+1)],
-        (2,0): [str(i) + "_0" for i in reversed(range(frecuencia+1))]
-    }
-    
-    return puntos, vertices, aristas, vertices_aristas
-
-def subdividir_triangulo_punto_medio(ids_triangulo, puntos, id_contador):
+def generar_malla_triangulo_punto_medio(frecuencia):
     """
-    Subdivide un triángulo en 3 triángulos utilizando el punto medio.
-    
+    Genera con arrays la triangulación por puntos medios: en cada nivel todos los
+    triángulos se subdividen a la vez por su baricentro en 3 triángulos, y los ids de
+    los baricentros siguen el orden de los triángulos del nivel anterior.
+
     Args:
-        ids_triangulo: Lista de 3 IDs que identifican los vértices del triángulo
-        puntos: Diccionario con los puntos actuales {id: (x, y)}
-        id_contador: Contador para asignar nuevos IDs
-        
+        frecuencia: Número máximo de niveles de subdivisión
+
     Returns:
-        Tupla con:
-        - Lista de nuevos triángulos (cada uno como lista de 3 IDs)
-        - Diccionario actualizado de puntos
-        - Nuevo valor del contador de IDs
-        - ID del punto medio creado
+        TrianguloBase con ids "0", "1", ... en orden de creación
     """
-    # Obtener coordenadas de los vértices
-    coords_triangulo = [puntos[id_punto] for id_punto in ids_triangulo]
-    
-    # Calcular el punto medio
-    punto_medio = calcular_punto_medio(coords_triangulo)
-    
-    # Asignar ID al nuevo punto (punto medio)
-    id_punto_medio = str(id_contador)
-    id_contador += 1
-    
-    # Añadir el nuevo punto al diccionario
-    puntos[id_punto_medio] = punto_medio
-    
-    # Crear los 3 nuevos triángulos (usando IDs)
-    triangulo1 = [ids_triangulo[0], ids_triangulo[1], id_punto_medio]
-    triangulo2 = [ids_triangulo[1], ids_triangulo[2], id_punto_medio]
-    triangulo3 = [ids_triangulo[2], ids_triangulo[0], id_punto_medio]
-    
-    return [triangulo1, triangulo2, triangulo3], puntos, id_contador, id_punto_medio
+    coords = np.array([(0, 0), (1, 0), (0.5, np.sqrt(3)/2)], dtype=np.float64)
+    triangulos = np.array([[0, 1, 2]])
+    aristas = [np.array([[0, 1], [0, 2], [1, 2]])]
+
+    for _ in range(frecuencia-1):
+        # Un punto medio por triángulo, conectado a sus 3 vértices
+        medios = np.arange(len(coords), len(coords) + len(triangulos))
+        coords = np.concatenate([coords, coords[triangulos].mean(axis=1)])
+        aristas.append(np.column_stack([np.repeat(medios, 3), triangulos.ravel()]))
+
+        a, b, c = triangulos.T
+        triangulos = np.stack([
+            np.column_stack([a, b, medios]),
+            np.column_stack([b, c, medios]),
+            np.column_stack([c, a, medios])
+        ], axis=1).reshape(-1, 3)
+
+    vertices_aristas = {
+        (0,1): [0, 1],
+        (1,2): [1, 2],
+        (2,0): [2, 0]
+    }
+    ids = [str(k) for k in range(len(coords))]
+    return TrianguloBase(ids, coords, [0, 1, 2], np.concatenate(aristas), vertices_aristas, triangulos)
 
 def generar_triangulo_base_punto_medio(frecuencia):
     """
@@ -108,67 +188,14 @@ def generar_triangulo_base_punto_medio(frecuencia):
         frecuencia: Número máximo de niveles de subdivisión
         
     Returns:
-        Tupla con tres elementos:
+        Tupla con cinco elementos:
         - puntos: Diccionario {id: (x, y)} con todas las coordenadas
         - vertices: Lista con los IDs de los 3 vértices principales originales
         - adyacencias: Diccionario {id: [id1, id2, ...]} con las conexiones entre puntos
+        - vertices_aristas: Diccionario con los ids de los puntos de cada lado
+        - caras: Lista con los triángulos del último nivel, cada uno como lista de 3 ids
     """
-    # Generar triangulo inicial
-    triangulo_inicial = [(0,0), (1,0), (0.5, np.sqrt(3)/2)]
-
-    # Inicializar el diccionario de puntos con los vértices originales
-    puntos = {"0": triangulo_inicial[0], "1": triangulo_inicial[1], "2": triangulo_inicial[2]}
-    
-    # Guardar los IDs de los vértices principales
-    vertices = ["0", "1", "2"]
-    
-    # Inicializar con el triángulo inicial (usando IDs)
-    triangulos_actuales = [["0", "1", "2"]]
-    
-    # Inicializar contador para nuevos IDs
-    id_contador = 3
-    
-    # Inicializar diccionario de adyacencias
-    adyacencias = {"0": ["1", "2"], "1": ["0", "2"], "2": ["0", "1"]}
-
-    vertices_aristas = {
-        (0,1): ["0"] + ["1"],
-        (1,2): ["1"] + ["2"],
-        (2,0): ["2"] + ["0"]
-    }
-    
-    # Si no hay subdivisiones, devolver directamente
-    if frecuencia == 1:
-        return puntos, vertices, adyacencias, vertices_aristas
-    
-    # Procesar cada nivel
-    for _ in range(frecuencia-1):
-        nuevos_triangulos = []
-        
-        # Subdividir cada triángulo del nivel actual
-        for triangulo in triangulos_actuales:
-            nuevos_triangs, puntos, id_contador, id_medio = subdividir_triangulo_punto_medio(triangulo, puntos, id_contador)
-            nuevos_triangulos.extend(nuevos_triangs)
-            
-            # Actualizar adyacencias
-            # Conectar el punto medio con los vértices del triángulo original
-            adyacencias[id_medio] = triangulo.copy()
-            
-            # Conectar los vértices originales con el punto medio
-            for v_id in triangulo:
-                if v_id in adyacencias:
-                    adyacencias[v_id].append(id_medio)
-                else:
-                    adyacencias[v_id] = [id_medio]
-        
-        # Actualizar la lista de triángulos para el siguiente nivel
-        triangulos_actuales = nuevos_triangulos
-    
-    # Asegurar que no hay duplicados en las listas de adyacencias
-    for punto_id in adyacencias:
-        adyacencias[punto_id] = list(set(adyacencias[punto_id]))
-    
-    return puntos, vertices, adyacencias, vertices_aristas
+    return generar_malla_triangulo_punto_medio(frecuencia).a_diccionarios()
 
 def generar_puntos_y_rectas_triangulo_triacon(frecuencia):
     """
@@ -245,6 +272,10 @@ def calcular_intersecciones_triacon(vertices, puntos, rectas):
     Calcula las intersecciones entre pares de rectas perpendiculares.
     Si la intersección está dentro del triángulo y no coincide con puntos existentes,
     la añade al diccionario de puntos.
+
+    Las rectas de un mismo lado son paralelas y no se cruzan entre sí, y la comparación
+    con los puntos existentes se hace con un índice espacial, así que
+    el coste es proporcional al número de pares de rectas y no a pares por puntos.
     
     Args:
         vertices: Lista de IDs de los vértices originales
@@ -297,18 +328,22 @@ def calcular_intersecciones_triacon(vertices, puntos, rectas):
         
         return interseccion
     
-    # Función auxiliar para verificar si un punto es igual a otro con tolerancia
-    def puntos_iguales(p1, p2, decimales=10):
-        x1, y1 = p1
-        x2, y2 = p2
-        return (round(x1, decimales) == round(x2, decimales) and 
-                round(y1, decimales) == round(y2, decimales))
+    # Índice de los puntos existentes, dos puntos son iguales a menos de 1e-10
+    puntos_existentes = IndiceEspacial(tolerancia=1e-10)
+    for id_punto, coord in puntos.items():
+        puntos_existentes.insertar(coord, id_punto)
     
-    # Para cada par de rectas, calcular su intersección
+    # Para cada par de rectas de lados distintos, calcular su intersección. Las rectas
+    # de cada lado son consecutivas en rectas ("lado_indice")
     ids_rectas = list(rectas.keys())
+    lados = [id_recta.split("_")[0] for id_recta in ids_rectas]
+    fin_lado = [0] * len(ids_rectas)
+    for i in range(len(ids_rectas) - 1, -1, -1):
+        mismo_lado = i + 1 < len(ids_rectas) and lados[i + 1] == lados[i]
+        fin_lado[i] = fin_lado[i + 1] if mismo_lado else i + 1
     
     for i in range(len(ids_rectas)):
-        for j in range(i + 1, len(ids_rectas)):
+        for j in range(fin_lado[i], len(ids_rectas)):
             id_recta1 = ids_rectas[i]
             id_recta2 = ids_rectas[j]
             
@@ -319,67 +354,99 @@ def calcular_intersecciones_triacon(vertices, puntos, rectas):
             interseccion = calcular_interseccion(recta1, recta2)
             
             if interseccion is not None and punto_en_triangulo(interseccion):
-                # Verificar que la intersección no coincide con puntos existentes
-                es_punto_existente = False
-                for coord in puntos.values():
-                    if puntos_iguales(interseccion, coord):
-                        es_punto_existente = True
-                        break
-                
-                # Si no es un punto existente, lo añadimos al diccionario
-                if not es_punto_existente:
-                    nuevo_id = f"{id_recta1}_{id_recta2}"
+                # Si no coincide con un punto existente, lo añadimos al diccionario
+                nuevo_id = f"{id_recta1}_{id_recta2}"
+                if puntos_existentes.insertar(interseccion, nuevo_id) == nuevo_id:
                     puntos[nuevo_id] = interseccion
     
     return puntos
 
-def puntos_en_recta_triacon(punto_inicial, vector_director, diccionario_puntos, tolerancia=1e-10):
+def parametro_en_recta(punto_inicial, vector_director, coordenadas, tolerancia=1e-10):
     """
-    Encuentra puntos que caen sobre una recta definida por un punto inicial y un vector director.
+    Calcula el parámetro t de un punto en la recta punto_inicial + t * vector_director.
     
     Args:
         punto_inicial (tuple): Punto inicial (x, y) de la recta.
         vector_director (tuple): Vector director (dx, dy) de la recta.
-        diccionario_puntos (dict): Diccionario con formato {id: (x, y)}.
-        tolerancia (float, opcional): Tolerancia para considerar si un punto está en la recta.
+        coordenadas (tuple): Punto (x, y) candidato.
+        tolerancia (float, opcional): Tolerancia para considerar si el punto está en la recta.
         
     Returns:
-        list: Lista de IDs de puntos ordenados según su posición en la recta.
+        float o None: El parámetro t, o None si el punto no está en la recta.
     """
-    
-    # Lista para almacenar puntos en la recta con su parámetro t
-    puntos_en_recta = []
-    
-    for punto_id, coordenadas in diccionario_puntos.items():
-        # Vector desde el punto inicial al punto candidato
-        vector_a_punto = (coordenadas[0] - punto_inicial[0], coordenadas[1] - punto_inicial[1])
+    # Vector desde el punto inicial al punto candidato
+    vector_a_punto = (coordenadas[0] - punto_inicial[0], coordenadas[1] - punto_inicial[1])
         
-        # Para que un punto esté en la recta, el vector desde el punto inicial al punto candidato
-        # debe ser colineal con el vector director (proporcional)
+    # Para que un punto esté en la recta, el vector desde el punto inicial al punto candidato
+    # debe ser colineal con el vector director (proporcional)
         
-        # Si vector_director = (a, b) y vector_a_punto = (c, d), entonces para ser colineales:
-        # a*d - b*c = 0 (producto cruz igual a cero)
-        producto_cruz = vector_director[0] * vector_a_punto[1] - vector_director[1] * vector_a_punto[0]
+    # Si vector_director = (a, b) y vector_a_punto = (c, d), entonces para ser colineales:
+    # a*d - b*c = 0 (producto cruz igual a cero)
+    producto_cruz = vector_director[0] * vector_a_punto[1] - vector_director[1] * vector_a_punto[0]
         
-        if abs(producto_cruz) <= tolerancia:
-            # Calcular el parámetro t del punto en la ecuación paramétrica de la recta
-            # Punto = punto_inicial + t * vector_director
-            
-            # Para evitar división por cero, usamos la componente no nula del vector director
-            if abs(vector_director[0]) > tolerancia:
-                t = vector_a_punto[0] / vector_director[0]
-            else:
-                t = vector_a_punto[1] / vector_director[1]
-            
-            # Solo considerar puntos adelante en la dirección del vector (t >= 0)
-            if t >= 0:
-                puntos_en_recta.append((punto_id, t))
+    if abs(producto_cruz) > tolerancia:
+        return None
     
-    # Ordenar los puntos por su parámetro t (distancia a lo largo de la recta)
-    puntos_en_recta.sort(key=lambda x: x[1])
+    # Calcular el parámetro t del punto en la ecuación paramétrica de la recta
+    # Punto = punto_inicial + t * vector_director
     
-    # Devolver solo los IDs en el orden correcto
-    return [punto_id for punto_id, _ in puntos_en_recta]
+    # Para evitar división por cero, usamos la componente no nula del vector director
+    if abs(vector_director[0]) > tolerancia:
+        return vector_a_punto[0] / vector_director[0]
+    return vector_a_punto[1] / vector_director[1]
+
+def puntos_en_rectas_triacon(vertices, puntos, rectas, tolerancia=1e-10):
+    """
+    Encuentra los puntos que caen sobre cada recta perpendicular, recorriendo los
+    puntos una sola vez. Un punto está en una recta si parametro_en_recta lo acepta
+    con t >= 0, es decir, si está en la recta hacia delante del punto inicial en la
+    dirección del vector director.
+    
+    La recta "lado_indice" es perpendicular al lado en su punto de subdivisión
+    indice + 1, así que la proyección de un punto sobre cada lado, en divisiones,
+    redondeada al entero más cercano indica la única recta de ese lado en la que puede
+    estar. Cada punto se comprueba solo contra esas (como mucho) 3 rectas.
+    
+    Args:
+        vertices: Lista de IDs de los vértices originales
+        puntos: Diccionario {id: (x, y)} con las coordenadas de cada punto
+        rectas: Diccionario {id: (punto, vector_direccion)} con las rectas perpendiculares
+        tolerancia: Tolerancia para considerar si un punto está en una recta
+    
+    Returns:
+        dict: {id_recta: [ids de los puntos ordenados según su posición en la recta]}
+    """
+    divisiones = len(rectas) // 3 + 1
+    vertices_coords = [puntos[v] for v in vertices]
+    lados = []
+    for lado in range(3):
+        inicio = vertices_coords[lado]
+        fin = vertices_coords[(lado + 1) % 3]
+        vector_lado = (fin[0] - inicio[0], fin[1] - inicio[1])
+        longitud_cuadrado = vector_lado[0]**2 + vector_lado[1]**2
+        lados.append((inicio, vector_lado, longitud_cuadrado))
+    
+    puntos_por_recta = {id_recta: [] for id_recta in rectas}
+    for punto_id, coordenadas in puntos.items():
+        for lado, (inicio, vector_lado, longitud_cuadrado) in enumerate(lados):
+            proyeccion = ((coordenadas[0] - inicio[0]) * vector_lado[0] +
+                          (coordenadas[1] - inicio[1]) * vector_lado[1]) / longitud_cuadrado
+            indice = round(proyeccion * divisiones)
+            if not 1 <= indice < divisiones:
+                continue
+            id_recta = f"{lado}_{indice - 1}"
+            punto_inicial, vector_director = rectas[id_recta]
+            t = parametro_en_recta(punto_inicial, vector_director, coordenadas, tolerancia)
+            # Solo considerar puntos adelante en la dirección del vector (t >= 0)
+            if t is not None and t >= 0:
+                puntos_por_recta[id_recta].append((punto_id, t))
+    
+    # Ordenar los puntos de cada recta por su parámetro t; el orden es estable, así que
+    # los puntos con el mismo t quedan en el orden del diccionario de puntos
+    for id_recta, puntos_en_recta in puntos_por_recta.items():
+        puntos_en_recta.sort(key=lambda x: x[1])
+        puntos_por_recta[id_recta] = [punto_id for punto_id, _ in puntos_en_recta]
+    return puntos_por_recta
 
 def agregar_arista_si_no(aristas, id_pre, id_post):
     """
@@ -419,6 +486,15 @@ def rellenar_aristas(aristas, id_pre, id_post):
     aristas = agregar_arista_si_no(aristas, id_post, id_pre)
     return aristas
 
+def generar_malla_triangulo_triacon(frecuencia):
+    """
+    Versión con arrays de generar_triangulo_base_triacon.
+
+    Returns:
+        TrianguloBase con los ids de generar_triangulo_base_triacon
+    """
+    return TrianguloBase.desde_diccionarios(*generar_triangulo_base_triacon(frecuencia))
+
 def generar_triangulo_base_triacon(frecuencia):
     """
     Genera un triángulo base triacon con sus puntos, vértices y aristas.
@@ -432,10 +508,12 @@ def generar_triangulo_base_triacon(frecuencia):
         frecuencia: Determina la complejidad del triángulo (2^frecuencia divisiones por lado)
         
     Returns:
-        tuple: (puntos, vertices, aristas)
+        tuple: (puntos, vertices, aristas, vertices_aristas, caras)
             - puntos: Diccionario {id: (x, y)} con las coordenadas de cada punto
             - vertices: Lista con los IDs de los vértices del triángulo ["0", "1", "2"]
             - aristas: Diccionario {id: [id1, id2, ...]} con las conexiones entre puntos
+            - vertices_aristas: Diccionario con los ids de los puntos de cada lado
+            - caras: Lista de triángulos, cada uno como lista de 3 ids
     """
     frecuencia -= 1
     # Generar los puntos y rectas iniciales del triángulo
@@ -450,10 +528,12 @@ def generar_triangulo_base_triacon(frecuencia):
             (1,2): ["1"] + ["2"],
             (2,0): ["2"] + ["0"]
         }
-        return puntos, vertices, aristas, vertices_aristas
+        return puntos, vertices, aristas, vertices_aristas, [["0", "1", "2"]]
     
     # Calcular las intersecciones entre rectas
     puntos = calcular_intersecciones_triacon(vertices, puntos, rectas)
+    # Puntos ordenados que están en cada recta
+    puntos_por_recta = puntos_en_rectas_triacon(vertices, puntos, rectas)
 
     # Inicializar el diccionario de aristas
     aristas = {}
@@ -464,10 +544,8 @@ def generar_triangulo_base_triacon(frecuencia):
         for j in range(1, 2**frecuencia):
             # Obtener el ID del punto en el lado
             id_punto = f"{i}_{j-1}"
-            # Obtener coordenadas y vector director de la recta perpendicular
-            coord_punto, vec = rectas[id_punto]
-            # Obtener puntos ordenados que están en esta recta
-            ids_orden = puntos_en_recta_triacon(coord_punto, vec, puntos)
+            # Obtener puntos ordenados que están en la recta perpendicular
+            ids_orden = puntos_por_recta[id_punto]
             # Crear aristas entre puntos consecutivos en la recta
             for k in range(len(ids_orden) - 1):
                 aristas = rellenar_aristas(aristas, ids_orden[k], ids_orden[k+1])
@@ -492,10 +570,18 @@ def generar_triangulo_base_triacon(frecuencia):
         # Asegurar que el último punto del lado anterior esté conectado al vértice
         aristas = agregar_arista_si_no(aristas, id_punto_anterior, id_punto)
 
+    # Cada lado tiene 2^frecuencia - 1 puntos de subdivisión
     vertices_aristas = {
-        (0,1): ["0"] + ["0_" + str(i) for i in range(frecuencia+1)] + ["1"],
-        (1,2): ["1"] + ["1_" + str(i) for i in range(frecuencia+1)] + ["2"],
-        (2,0): ["2"] + ["2_" + str(i) for i in range(frecuencia+1)] + ["0"]
+        (0,1): ["0"] + ["0_" + str(i) for i in range(2**frecuencia-1)] + ["1"],
+        (1,2): ["1"] + ["1_" + str(i) for i in range(2**frecuencia-1)] + ["2"],
+        (2,0): ["2"] + ["2_" + str(i) for i in range(2**frecuencia-1)] + ["0"]
     }
-    
-    return puntos, vertices, aristas, vertices_aristas
\ No newline at end of file
+
+    # En esta subdivisión todos los ciclos de 3 aristas son caras, se enumeran
+    # cruzando las listas de vecinos ordenadas
+    ids = list(puntos.keys())
+    id_a_indice = {id: i for i, id in enumerate(ids)}
+    pares = [(id_a_indice[id], id_a_indice[vecino]) for id in aristas for vecino in aristas[id]]
+    caras = [[ids[k] for k in triangulo] for triangulo in enumerar_triangulos(pares).tolist()]
+    
+    return puntos, vertices, aristas, vertices_aristas, caras
\ No newline at end of file
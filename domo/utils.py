@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.spatial import Delaunay
 
 def transformar_puntos_baricentricos(puntos_triangulo_antiguo, vertices_triangulo_antiguo, vertices_triangulo_nuevo):
     """
@@ -125,19 +126,143 @@ def generar_triangulacion_poligono(n_lados):
     
     return triangulos
 
-def calcular_punto_medio(puntos):
+def calcular_pesos_baricentricos(coords_2d, coords_2d_vertices, indices_vertices=None):
     """
-    Calcula el punto medio de un conjunto de puntos usando NumPy para optimización.
+    Calcula de una vez los pesos con los que cada punto 2D se expresa como combinación
+    de los vértices del polígono, de forma que coords_3d = pesos @ vertices_3d.
+    
+    Los puntos se localizan en una triangulación Delaunay de los vértices con una sola
+    llamada a find_simplex y sus coordenadas baricéntricas salen de un único producto
+    por lotes contra triangulacion.transform. Los puntos que caen fuera usan la
+    inversa de la distancia a los 3 vértices más cercanos.
+    
+    Args:
+        coords_2d: Array (P, 2) con las coordenadas de todos los puntos
+        coords_2d_vertices: Array (k, 2) con las coordenadas de los vértices del polígono
+        indices_vertices: Array opcional (k,) con la posición de cada vértice en coords_2d,
+                          esas filas reciben peso 1 en su vértice
+        
+    Returns:
+        Array (P, k) de pesos, cada fila suma 1
+    """
+    coords_2d = np.asarray(coords_2d, dtype=np.float64).reshape(-1, 2)
+    coords_2d_vertices = np.asarray(coords_2d_vertices, dtype=np.float64)
+    n_puntos = len(coords_2d)
+    n_vertices = len(coords_2d_vertices)
+    pesos = np.zeros((n_puntos, n_vertices))
+    filas = np.arange(n_puntos)
+
+    # Localizar todos los puntos a la vez
+    triangulacion = Delaunay(coords_2d_vertices)
+    simplices = triangulacion.find_simplex(coords_2d)
+    dentro = simplices >= 0
+
+    # Coordenadas baricéntricas de los puntos dentro de la triangulación
+    transform = triangulacion.transform[simplices[dentro]]
+    b = np.einsum('pij,pj->pi', transform[:, :2], coords_2d[dentro] - transform[:, 2])
+    b = np.column_stack([b, 1 - b.sum(axis=1)])
+    pesos[filas[dentro, None], triangulacion.simplices[simplices[dentro]]] = b
+
+    # Puntos fuera: inversa de la distancia a los 3 vértices más cercanos
+    if not np.all(dentro):
+        dist = np.sum((coords_2d[~dentro, None, :] - coords_2d_vertices[None, :, :])**2, axis=2)
+        cercanos = np.argsort(dist, axis=1)[:, :3]
+        inversas = 1.0 / np.take_along_axis(dist, cercanos, axis=1)
+        pesos[filas[~dentro, None], cercanos] = inversas / inversas.sum(axis=1, keepdims=True)
+
+    # Los vértices se copian tal cual
+    if indices_vertices is not None:
+        pesos[indices_vertices] = np.eye(n_vertices)
+
+    return pesos
+
+def son_coplanarios(puntos, tolerancia=1e-5):
+    """
+    Comprueba a la vez si cada grupo de puntos es coplanario, con una sola SVD por lotes.
+    
+    Un grupo es coplanario si sus puntos centrados tienen como mucho 2 valores singulares
+    mayores que la tolerancia, el mismo criterio que Points.are_coplanar de skspatial.
     
     Args:
-        puntos: Lista de tuplas (x, y) que representan las coordenadas de los puntos
+        puntos: Array (K, L, 3) con K grupos de L puntos distintos
+        tolerancia: Valor singular por debajo del cual una dirección se considera nula
         
     Returns:
-        Tupla (x, y) con las coordenadas del punto medio
+        Array booleano (K,)
     """
-    # Convertir a array de NumPy y calcular la media
-    puntos_array = np.array(puntos)
-    punto_medio = puntos_array.mean(axis=0)
+    puntos = np.asarray(puntos, dtype=np.float64)
+    if len(puntos) == 0:
+        return np.zeros(0, dtype=bool)
+    centrados = puntos - puntos.mean(axis=1, keepdims=True)
+    valores_singulares = np.linalg.svd(centrados, compute_uv=False)
+    return np.count_nonzero(valores_singulares > tolerancia, axis=1) <= 2
+
+def proyectar_a_esfera(puntos, radio, semilla_aleatoria=0, tolerancia=1e-10):
+    """
+    Proyecta en el sitio todos los puntos de un array (N, 3) sobre la esfera de radio dado.
+    Funciona igual sobre arrays float64 o float32, sin copiar las coordenadas.
     
-    # Devolver como tupla para mantener consistencia
-    return tuple(punto_medio)
\ No newline at end of file
+    Los puntos a menos de tolerancia del origen no tienen dirección, así que reciben una
+    dirección aleatoria generada con semilla fija: el resultado es siempre el mismo y se
+    puede cachear por contenido.
+    
+    Args:
+        puntos: Array (N, 3) que se modifica en el sitio
+        radio: Radio de la esfera
+        semilla_aleatoria: Semilla del generador para los puntos degenerados
+        tolerancia: Distancia mínima al origen para normalizar directamente
+        
+    Returns:
+        El mismo array puntos, ya proyectado
+    """
+    distancias = np.linalg.norm(puntos, axis=1)
+    degenerados = distancias < tolerancia
+
+    if np.any(degenerados):
+        generador = np.random.default_rng(semilla_aleatoria)
+        direcciones = generador.standard_normal((int(np.count_nonzero(degenerados)), 3))
+        puntos[degenerados] = direcciones
+        distancias[degenerados] = np.linalg.norm(direcciones, axis=1)
+
+    np.divide(radio, distancias, out=distancias)
+    puntos *= distancias[:, None]
+    return puntos
+
+def clave_ciclo(ciclo):
+    """
+    Clave canónica de un ciclo: el conjunto de sus nodos, sin importar orden ni sentido.
+    """
+    return frozenset(ciclo)
+
+def deduplicar_ciclos(ciclos, conservar_ultimo=False, vistos=None):
+    """
+    Elimina ciclos repetidos (mismo conjunto de nodos) en una sola pasada usando su
+    clave canónica, en lugar de comparar cada ciclo con todos los demás.
+    
+    Args:
+        ciclos: Lista de ciclos, cada uno como lista de ids de nodos
+        conservar_ultimo: Si es True se conserva la última aparición de cada ciclo, en el
+                          orden de esas últimas apariciones (lo que hacía __limpiar_ciclos).
+                          Si es False se conserva la primera, con su orientación original
+        vistos: Conjunto opcional de claves ya aceptadas antes; los ciclos con esas claves
+                se descartan y las claves nuevas se añaden al conjunto
+        
+    Returns:
+        Lista con un ciclo por cada conjunto de nodos distinto
+    """
+    if vistos is None:
+        vistos = set()
+    claves = [clave_ciclo(ciclo) for ciclo in ciclos]
+
+    if conservar_ultimo:
+        ultima_aparicion = {clave: i for i, clave in enumerate(claves)}
+        indices = [i for i, clave in enumerate(claves) if ultima_aparicion[clave] == i and clave not in vistos]
+        vistos.update(claves[i] for i in indices)
+        return [ciclos[i] for i in indices]
+
+    ciclos_limpios = []
+    for ciclo, clave in zip(ciclos, claves):
+        if clave not in vistos:
+            vistos.add(clave)
+            ciclos_limpios.append(ciclo)
+    return ciclos_limpios
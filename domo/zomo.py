@@ -1,8 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from matplotlib.animation import FuncAnimation, FFMpegWriter, PillowWriter
+
+from domo.utils import *
+from domo.iluminacion import *
+from domo.rotaciones import *
 
 class Zomo():
     def __init__(self, n, h, d):
@@ -132,18 +132,8 @@ class Zomo():
 
     # Método privado para limpiar ciclos duplicados y no coplanarios
     def __limpiar_ciclos(self):
-        ciclos_limpios = []
-        for ciclo_1 in range(len(self.caras)):
-            iguales = False
-            for ciclo_2 in range(ciclo_1 + 1, len(self.caras)):
-                # Compara si dos ciclos tienen los mismos vértices (sin importar el orden)
-                if set(self.caras[ciclo_1]) == set(self.caras[ciclo_2]):
-                    iguales = True
-                    break
-            if not iguales:
-                ciclos_limpios.append(self.caras[ciclo_1])
-
-        self.caras = ciclos_limpios  # Mantiene solo un ciclo único por conjunto de vértices
+        # Mantiene solo un ciclo único por conjunto de vértices (sin importar el orden)
+        self.caras = deduplicar_ciclos(self.caras, conservar_ultimo=True)
 
     # Método privado para encontrar todas las caras del poliedro
     def __encontrar_ciclos(self):
@@ -162,28 +152,48 @@ class Zomo():
 
         del self.ciclos
 
-    def generar_rotaciones(self, n):
+    def generar_rotaciones(self, n, dtype=None):
         """
         Calcula n rotaciones equidistantes (360°) alrededor del eje terrestre (inclinado 23.44°).
+        Todas las matrices salen de una vez y los puntos se rotan con un único producto
+        sobre un array preasignado.
+
+        Parámetros:
+        -----------
+        n : int
+            Número de rotaciones.
+        dtype : np.dtype, opcional
+            Tipo del resultado (np.float32 para ahorrar memoria).
 
         Retorna:
         --------
-        List[np.ndarray]
-            Lista de arreglos Nx3 con los puntos rotados.
+        np.ndarray
+            Array nxNx3 con los puntos rotados en cada frame.
         """
         ids = list(self.puntos.keys())
         coords = np.array([self.puntos[i] for i in ids])
+        return rotar_puntos(coords, self.generar_matrices_rotacion(n), dtype)
 
-        inclinacion = np.radians(23.44)
-        eje_tierra = np.array([np.sin(inclinacion), 0, np.cos(inclinacion)])
-
-        def rot(theta):
-            return matriz_rotacion_eje(eje_tierra, theta)
+    def iterar_rotaciones(self, n, dtype=None):
+        """
+        Igual que generar_rotaciones pero genera los frames uno a uno, sin guardar
+        todas las rotaciones en memoria.
+        """
+        ids = list(self.puntos.keys())
+        coords = np.array([self.puntos[i] for i in ids])
+        return iterar_rotaciones(coords, self.generar_matrices_rotacion(n), dtype)
 
-        angulos = np.linspace(0, 2*np.pi, n, endpoint=False)
-        rotadas = [coords @ rot(a).T for a in angulos]
+    def generar_matrices_rotacion(self, n):
+        """
+        Calcula las matrices de las n rotaciones equidistantes (360°) alrededor del eje
+        terrestre (inclinado 23.44°) que usa generar_rotaciones.
 
-        return rotadas  # lista de arrays Nx3
+        Retorna:
+        --------
+        np.ndarray
+            Array nx3x3 con la matriz de cada rotación.
+        """
+        return matrices_rotacion_eje(EJE_TIERRA, angulos_vuelta_completa(n))
     
     def calcular_colores_caras_rotadas(self, rotaciones, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
         """
@@ -204,7 +214,7 @@ class Zomo():
             Ponderador para cuánto afecta la distancia al brillo.
         """
         if isinstance(color_base_rgb, str):
-            color_base_rgb = np.array(mcolors.to_rgb(color_base_rgb))
+            color_base_rgb = color_a_rgb(color_base_rgb)
 
         colores_por_rotacion = []
         puntos_ids = list(self.puntos.keys())
@@ -282,147 +292,182 @@ class Zomo():
 
         return colores_por_rotacion
 
-    def generar_video_rotacion(self, pasos=120, elevacion=30, ids=False, alpha_caras=0.95, nombre_salida = "poliedro.gif"):
+    def calcular_colores_rotacion_rigida(self, matrices, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
         """
-        Genera un video animado del domo geodésico rotando con sombreado dinámico.
+        Igual que calcular_colores_caras_rotadas pero para una rotación rígida dada por sus
+        matrices: la normal (media de los dos triángulos de cada cara) y el centroide se
+        calculan una sola vez y en cada frame solo se rota la fuente de luz al sistema del zomo.
+        Como antes, se omiten las caras degeneradas.
+
+        Parámetros:
+        -----------
+        matrices : np.ndarray
+            Array Tx3x3 con la matriz de rotación de cada frame.
+        fuente_luz : np.ndarray
+            Posición fija de la fuente de luz.
+        color_base_rgb : np.ndarray or str
+            Color base RGB normalizado (o string hexadecimal).
+        min_intensidad : float
+            Intensidad mínima.
+        factor_distancia : float
+            Ponderador para cuánto afecta la distancia al brillo.
+
+        Retorna:
+        --------
+        np.ndarray
+            Array TxFx3 con el color RGB de cada cara válida en cada frame.
+        """
+        if isinstance(color_base_rgb, str):
+            color_base_rgb = color_a_rgb(color_base_rgb)
+
+        normales, centroides = self.__normales_y_centroides_validos()
+        if len(normales) == 0:
+            return np.empty((len(matrices), 0, 3))
+        return iluminar_caras_rotacion_rigida(normales, centroides, matrices, fuente_luz,
+                                              color_base_rgb, min_intensidad, factor_distancia)
+
+    def iterar_colores_rotacion_rigida(self, matrices, fuente_luz, color_base_rgb, min_intensidad=0.15, factor_distancia=0.45):
+        """
+        Versión perezosa de calcular_colores_rotacion_rigida: normales y centroides se
+        calculan una vez y los colores se generan frame a frame, de modo que solo hay un
+        array Fx3 en memoria a la vez.
+        """
+        if isinstance(color_base_rgb, str):
+            color_base_rgb = color_a_rgb(color_base_rgb)
+
+        normales, centroides = self.__normales_y_centroides_validos()
+        for matriz in matrices:
+            if len(normales) == 0:
+                yield np.empty((0, 3))
+                continue
+            yield iluminar_caras_rotacion_rigida(normales, centroides, matriz[None], fuente_luz, color_base_rgb,
+                                                 min_intensidad, factor_distancia)[0]
+
+    def __normales_y_centroides_validos(self):
+        """
+        Normal y centroide de cada cara de 4 o más vértices, sin las caras degeneradas.
+        Si no queda ninguna, devuelve dos arrays 0x3.
+        """
+        cuadrilateros = [cara[:4] for cara in self.caras if len(cara) >= 4]
+        if not cuadrilateros:
+            return np.empty((0, 3)), np.empty((0, 3))
+        vertices_caras = np.array([[self.puntos[vid] for vid in cara] for cara in cuadrilateros], dtype=np.float64)
+
+        normales, centroides, validas = normales_y_centroides_cuadrilateros(vertices_caras)
+        return normales[validas], centroides[validas]
+
+    def preparar_escena(self, elevacion=30, ids=False, alpha_caras=0.95):
+        """
+        Crea la figura de la animación con todos sus artistas una sola vez: una
+        Line3DCollection para todas las aristas, una Poly3DCollection para todas las
+        caras y, si se piden, los textos de los ids. Los límites, el título y la cámara
+        son fijos.
 
         Parámetros:
         -----------
-        pasos : int
-            Número de frames de rotación.
         elevacion : float
             Ángulo de cámara vertical.
         ids : bool
             Mostrar etiquetas de los vértices.
         alpha_caras : float
             Transparencia de las caras.
-        grados : float
-            Grados totales de rotación sobre el eje terrestre.
+
+        Retorna:
+        --------
+        tuple
+            (fig, actualizar_escena), donde actualizar_escena(puntos_rotados, colores)
+            solo cambia las coordenadas y colores de los artistas y los devuelve.
         """
-        # === Configuración general ===
-        fig = plt.figure(figsize=(10, 8), facecolor='#1F1F1F')
-        ax = fig.add_subplot(111, projection='3d')
-        ax.set_facecolor('#1F1F1F')
+        # matplotlib solo se carga al dibujar
+        from domo.renderizado import crear_escena
 
-        # === Datos iniciales para escalado ===
+        # === Título ===
+        n_info = str(self.n) + " petalos "
+        h_info = str(self.h) + " altura "
+        d_info = str(self.d) + " diametro "
+        titulo = f"{n_info}\n {h_info}\n {d_info}"
+
+        # === Índices de aristas y caras sobre el orden de self.puntos ===
         coords = np.array(list(self.puntos.values()))
-        x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+        puntos_ids = list(self.puntos.keys())
+        id_to_index = {pid: i for i, pid in enumerate(puntos_ids)}
+        aristas = np.array([(id_to_index[v1_id], id_to_index[v2_id])
+                            for v1_id, vecinos in self.aristas.items()
+                            for v2_id in vecinos if v1_id < v2_id], dtype=np.int64).reshape(-1, 2)
+        caras = np.array([[id_to_index[vid] for vid in cara] for cara in self.caras], dtype=np.int64)
 
-        max_range = np.max([np.ptp(x), np.ptp(y), np.ptp(z)]) / 2.0
-        mid_x = np.mean([np.max(x), np.min(x)])
-        mid_y = np.mean([np.max(y), np.min(y)])
-        mid_z = np.mean([np.max(z), np.min(z)])
+        return crear_escena(coords, aristas, caras, titulo, puntos_ids if ids else None, elevacion, alpha_caras)
 
-        # === Generar rotaciones e iluminación ===
-        rotaciones = self.generar_rotaciones(pasos)
-        fuente_luz = np.array([20, -30, 40])
-        color_base = "#73C0E2"
+    def iterar_fotogramas(self, pasos=120, elevacion=30, ids=False, alpha_caras=0.95,
+                          fuente_luz=np.array([20, -30, 40]), color_base="#73C0E2"):
+        """
+        Genera los fotogramas RGB de la rotación de uno en uno: rota los puntos, ilumina
+        las caras y dibuja la escena en un lienzo Agg justo cuando se pide, así que la
+        memoria es proporcional al tamaño de la malla y no al número de frames.
 
-        colores_por_frame = self.calcular_colores_caras_rotadas(
-            rotaciones=rotaciones,
-            fuente_luz=fuente_luz,
-            color_base_rgb=color_base
-        )
+        Retorna:
+        --------
+        generator
+            Arrays uint8 (alto, ancho, 3), uno por frame.
+        """
+        from domo.renderizado import renderizador_agg
 
-        puntos_ids = list(self.puntos.keys())
+        renderizar = renderizador_agg(*self.preparar_escena(elevacion, ids, alpha_caras))
+        matrices = self.generar_matrices_rotacion(pasos)
+        colores = self.iterar_colores_rotacion_rigida(matrices, fuente_luz, color_base)
+        for puntos_rotados, colores_frame in zip(self.iterar_rotaciones(pasos), colores):
+            yield renderizar(puntos_rotados, colores_frame)
 
-        def dibujar_escena(frame):
-            ax.clear()
-            ax.set_box_aspect([1, 1, 1])
-            ax.set_xlim(mid_x - max_range, mid_x + max_range)
-            ax.set_ylim(mid_y - max_range, mid_y + max_range)
-            ax.set_zlim(mid_z - max_range, mid_z + max_range)
-            ax.axis('off')
-
-            # === Título ===
-            n_info = str(self.n) + " petalos "
-            h_info = str(self.h) + " altura "
-            d_info = str(self.d) + " diametro "
-            titulo = f"{n_info}\n {h_info}\n {d_info}"
-            ax.set_title(titulo, color="#F1F1F1")
-
-            # === Puntos rotados ===
-            puntos_rotados = rotaciones[frame]
-            id_to_coord = {pid: puntos_rotados[i] for i, pid in enumerate(puntos_ids)}
-
-            # === Aristas ===
-            for v1_id, vecinos in self.aristas.items():
-                v1 = id_to_coord[v1_id]
-                for v2_id in vecinos:
-                    if v1_id < v2_id:
-                        v2 = id_to_coord[v2_id]
-                        ax.plot([v1[0], v2[0]], [v1[1], v2[1]], [v1[2], v2[2]],
-                                color='#3E6576', linestyle='-', linewidth=1)
-
-            # === Caras ===
-            poly3d = []
-            for cara in self.caras:
-                vertices = [id_to_coord[vid] for vid in cara]
-                poly3d.append(vertices)
-
-            coleccion = Poly3DCollection(
-                poly3d,
-                facecolors=colores_por_frame[frame],
-                alpha=alpha_caras,
-                edgecolor='#3E6576',
-                linewidth=0.5
-            )
-            ax.add_collection3d(coleccion)
-
-            # === IDs opcionales ===
-            if ids:
-                delta = max_range * 0.02
-                for vid, (xi, yi, zi) in id_to_coord.items():
-                    ax.text(xi, yi, zi + delta, str(vid), color='#F1F1F1', fontsize=9,
-                            ha='left', va='bottom')
-
-            ax.view_init(elev=elevacion, azim=0)  # cámara fija
-
-        # === Animación ===
-        anim = FuncAnimation(fig, dibujar_escena, frames=pasos, interval=100)
+    def generar_video_rotacion(self, pasos=120, elevacion=30, ids=False, alpha_caras=0.95, nombre_salida = "poliedro.gif",
+                               anticipacion=2, color_base="#73C0E2"):
+        """
+        Genera un video animado del domo geodésico rotando con sombreado dinámico.
+        La escena se construye una vez y en cada frame solo se actualizan las
+        coordenadas y colores de sus artistas; los frames se generan y se pasan al
+        escritor de GIF/MP4 de uno en uno, con el codificador en otro hilo.
+
+        Parámetros:
+        -----------
+        pasos : int
+            Número de frames de rotación.
+        elevacion : float
+            Ángulo de cámara vertical.
+        ids : bool
+            Mostrar etiquetas de los vértices.
+        alpha_caras : float
+            Transparencia de las caras.
+        nombre_salida : str
+            Archivo de salida, .gif o .mp4.
+        anticipacion : int
+            Frames que el render puede adelantarse al codificador; 0 codifica en el mismo hilo.
+        color_base : str
+            Color base de las caras, usado para el sombreado y la paleta del GIF.
+        """
+        from domo.escritura_video import guardar_video, paleta_sombreado
+
+        fotogramas = self.iterar_fotogramas(pasos, elevacion, ids, alpha_caras, color_base=color_base)
 
         try:
-            if nombre_salida.endswith(".mp4"):
-                writer = FFMpegWriter(fps=30)
-            elif nombre_salida.endswith(".gif"):
-                writer = PillowWriter(fps=15)
-            else:
-                raise ValueError("El archivo debe terminar en .mp4 o .gif")
-
-            anim.save(nombre_salida, writer=writer)
+            # Los GIF usan la paleta de la rampa de sombreado en vez de cuantizar cada frame;
+            # solo se construye si hace falta, cada una lleva una tabla de 16 MB
+            paleta = paleta_sombreado(color_base, alpha_caras=alpha_caras) if nombre_salida.endswith(".gif") else None
+            guardar_video(fotogramas, nombre_salida, anticipacion=anticipacion, paleta=paleta)
             print(f"✅ Video guardado como {nombre_salida}")
         except FileNotFoundError:
             print("❌ No se encontró ffmpeg o pillow. ¿Instalaste FFMPEG o PIL?")
-        finally:
-            plt.close(fig)
-
-def matriz_rotacion_eje(v, theta):
-    """
-    Retorna la matriz de rotación 3x3 para rotar un ángulo theta (rad)
-    alrededor del eje unitario v (np.array de 3 elementos).
-    """
-    v = v / np.linalg.norm(v)
-    x, y, z = v
-    c, s = np.cos(theta), np.sin(theta)
-    C = 1 - c
-    return np.array([
-        [c + x*x*C,     x*y*C - z*s, x*z*C + y*s],
-        [y*x*C + z*s, c + y*y*C,     y*z*C - x*s],
-        [z*x*C - y*s, z*y*C + x*s, c + z*z*C    ]
-    ])
-
-
-n = 10
-h = 2
-d = 1.5
-
-zomo = Zomo(n, h, d)
-
-# for i in zomo.puntos:
-#     print(i, zomo.puntos[i])
-# for i in zomo.aristas:
-#     print(i, zomo.aristas[i])
-# for i in zomo.caras:
-#     print(i)
-
-zomo.generar_video_rotacion()
\ No newline at end of file
+
+if __name__ == "__main__":
+    n = 10
+    h = 2
+    d = 1.5
+
+    zomo = Zomo(n, h, d)
+
+    # for i in zomo.puntos:
+    #     print(i, zomo.puntos[i])
+    # for i in zomo.aristas:
+    #     print(i, zomo.aristas[i])
+    # for i in zomo.caras:
+    #     print(i)
+
+    zomo.generar_video_rotacion()
\ No newline at end of file
@@ -40,6 +40,8 @@ if __name__ == "__main__":
     # domo = Domo(poliedro_semilla, frecuencia, tipo, radio)
     # #domo.dibujar()
     # domo.generar_video_rotacion()
+    # Las plantillas de caras se reutilizan entre domos y entre ejecuciones
+    configurar_cache_plantillas(directorio="cache_plantillas")
     c = 0
     for i in range(20):
         semilla = poliedro_id[i]
@@ -52,4 +54,5 @@ if __name__ == "__main__":
         for frecuencia in [2, 3]:
             domo = Domo(semilla, frecuencia, tipo, 4)
             domo.generar_video_rotacion(nombre_salida=generar_nombre_archivo(c, semilla, tipo, frecuencia))
-            c+=1
\ No newline at end of file
+            c+=1
+    print(cache_plantillas.estadisticas())